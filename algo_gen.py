@@ -3,47 +3,67 @@
 """
 Generate N mutated parameter sets based on parameter_schema.json
 Each set is placed in its own folder inside `children/` as params.json
+(the batch is bred as one genome.py array: distinct, none equal to a parent)
+
+With several parents (survivors.json from select_survivors.py, i.e. the
+Pareto front) every child is a uniform crossover of two of them, mutated.
+
+--proposer surrogate instead fits a TPE model (surrogate.py) on every
+back-test in the results warehouse (RESULTS_SOURCE) and proposes the batch
+by expected improvement (random exploration until the history is large
+enough to model).
 """
 
 from __future__ import annotations
-import argparse, hashlib, json, os, pathlib, random
+import argparse, hashlib, json, os, pathlib
+
+import telemetry
+from genome import Genome
 
 ROOT   = pathlib.Path(__file__).resolve().parent
-SCHEMA = json.load(open(ROOT / "parameter_schema.json"))
-
-def random_value(field: str):
-    spec = SCHEMA[field]
-    if spec["type"] == "choice":
-        return random.choice(spec["values"])
-    if spec["type"] == "int":
-        return random.randint(spec["min"], spec["max"])
-    return round(random.uniform(spec["min"], spec["max"]), 4)
-
-def mutate(parent: dict[str, object]) -> dict[str, object]:
-    child = parent.copy()
-    fields = random.sample(list(SCHEMA), k=max(1, int(0.3 * len(SCHEMA))))
-    for f in fields:
-        child[f] = random_value(f)
-    return child
+GENOME = Genome.load(ROOT / "parameter_schema.json")
+SCHEMA = GENOME.schema
+
+def load_parents(path: pathlib.Path) -> list[dict[str, object]]:
+    if not path.exists():
+        return []
+    return [s["params"] for s in json.load(open(path)) if s.get("params")]
+
+def propose(proposer: str, parents: list[dict[str, object]], n: int) -> list[dict[str, object]]:
+    if proposer == "surrogate":
+        import surrogate
+        history = list(surrogate.load_history(os.getenv("RESULTS_SOURCE", "warehouse"),
+                                               os.getenv("FITNESS", "fitness")))
+        print(f"🔮  TPE proposals from {len(history)} past back-tests")
+        return surrogate.TPE(SCHEMA).fit(history).propose(n, base=parents[0])
+    children = GENOME.breed(GENOME.from_dicts(parents), n)
+    return [{**parents[0], **child} for child in GENOME.to_dicts(children)]
 
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--parent", default="parent_params.json")
+    ap.add_argument("--parents", default="survivors.json",
+                    help="multi-parent pool; falls back to --parent when missing")
     ap.add_argument("--num", type=int, default=int(os.getenv("NUM_CHILDREN", 5)))
     ap.add_argument("--outdir", default="children")
+    ap.add_argument("--proposer", choices=("mutate", "surrogate"),
+                    default=os.getenv("PROPOSER", "mutate"))
     args = ap.parse_args()
 
     # load parent or create one if it doesn't exist
     parent_path = ROOT / args.parent
-    parent = (json.load(open(parent_path))
-              if parent_path.exists()
-              else {f: random_value(f) for f in SCHEMA})
+    parents = load_parents(ROOT / args.parents)
+    if not parents:
+        parents = ([json.load(open(parent_path))]
+                   if parent_path.exists()
+                   else GENOME.to_dicts(GENOME.sample(1)))
 
     outdir = ROOT / args.outdir
     outdir.mkdir(exist_ok=True)
 
-    for i in range(args.num):
-        child = mutate(parent)
+    with telemetry.span("breed", proposer=args.proposer):
+        children = propose(args.proposer, parents, args.num)
+    for i, child in enumerate(children):
         hash8 = hashlib.md5(json.dumps(child, sort_keys=True)
                             .encode()).hexdigest()[:8]
         d = outdir / f"child_{i}_{hash8}"
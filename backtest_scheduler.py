@@ -0,0 +1,110 @@
+"""
+Bounded-concurrency scheduler for `lean cloud backtest` submissions.
+
+Keeps at most MAX_IN_FLIGHT lean processes alive (set it to the cloud node
+allocation), starts queued jobs in priority order (lowest value first) as
+soon as a slot frees up, and re-queues submissions that fail with a
+transient error (rate limit, no free node, network) with jittered backoff.
+
+Env vars:
+    MAX_IN_FLIGHT   – concurrent lean processes / cloud nodes (default 4)
+    SUBMIT_RETRIES  – retries for transient failures          (default 2)
+"""
+
+from __future__ import annotations
+import heapq, itertools, os, random, re, subprocess, tempfile, time
+from dataclasses import dataclass, field
+
+import telemetry
+
+MAX_IN_FLIGHT = int(os.getenv("MAX_IN_FLIGHT", 4))
+MAX_RETRIES   = int(os.getenv("SUBMIT_RETRIES", 2))
+RETRY_DELAY   = 15.0
+TRANSIENT_RE  = re.compile(
+    r"429|too many requests|rate limit|timed? ?out|temporar|try again|"
+    r"50[234]|connection (reset|aborted|refused)|no spare nodes|node.*busy",
+    re.I,
+)
+
+
+@dataclass(order=True)
+class Job:
+    priority: float
+    seq: int
+    child_id: str = field(compare=False)
+    cmd: list[str] = field(compare=False)
+    attempts: int = field(default=0, compare=False)
+    started: float = field(default=0.0, compare=False)
+
+
+@dataclass
+class Result:
+    returncode: int
+    stdout: str
+    stderr: str
+    attempts: int
+
+
+class Scheduler:
+    def __init__(self, max_in_flight: int = MAX_IN_FLIGHT,
+                 max_retries: int = MAX_RETRIES, poll_interval: float = 0.5):
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_retries = max_retries
+        self.poll_interval = poll_interval
+        self._queue: list[Job] = []
+        self._delayed: list[tuple[float, Job]] = []
+        self._seq = itertools.count()
+        self.results: dict[str, Result] = {}
+        self.retries = 0
+
+    def submit(self, child_id: str, cmd: list[str], priority: float = 0.0) -> None:
+        heapq.heappush(self._queue, Job(priority, next(self._seq), child_id, cmd))
+
+    @staticmethod
+    def is_transient(stdout: str, stderr: str) -> bool:
+        return bool(TRANSIENT_RE.search(stderr) or TRANSIENT_RE.search(stdout))
+
+    def _start(self, job: Job):
+        # spool output to files so a chatty process can never block on a full pipe
+        out, err = tempfile.TemporaryFile("w+"), tempfile.TemporaryFile("w+")
+        job.attempts += 1
+        job.started = time.time()
+        print(f"  -> Launching: {job.child_id} (attempt {job.attempts})")
+        return job, subprocess.Popen(job.cmd, text=True, stdout=out, stderr=err), out, err
+
+    def run(self) -> dict[str, Result]:
+        """Block until every submitted job has finished or exhausted its retries."""
+        running = []
+        while self._queue or self._delayed or running:
+            now = time.monotonic()
+            for ready_at, job in [d for d in self._delayed if d[0] <= now]:
+                self._delayed.remove((ready_at, job))
+                heapq.heappush(self._queue, job)
+
+            while self._queue and len(running) < self.max_in_flight:
+                running.append(self._start(heapq.heappop(self._queue)))
+
+            still_running = []
+            for job, proc, out, err in running:
+                if proc.poll() is None:
+                    still_running.append((job, proc, out, err))
+                    continue
+                telemetry.record_span("lean_submit", job.started, time.time(),
+                                      child=job.child_id, attempt=job.attempts)
+                out.seek(0); err.seek(0)
+                stdout, stderr = out.read(), err.read()
+                out.close(); err.close()
+                if (proc.returncode and job.attempts <= self.max_retries
+                        and self.is_transient(stdout, stderr)):
+                    self.retries += 1
+                    telemetry.count("submit_retries")
+                    delay = RETRY_DELAY * 2 ** (job.attempts - 1) * random.uniform(0.5, 1.5)
+                    print(f"  ↻ {job.child_id} transient failure, retrying in {delay:.0f}s")
+                    self._delayed.append((time.monotonic() + delay, job))
+                    continue
+                self.results[job.child_id] = Result(proc.returncode, stdout, stderr, job.attempts)
+            running = still_running
+
+            if running or self._delayed:
+                time.sleep(self.poll_interval)
+        return self.results
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Memory-mapped columnar store for Lean daily bars.
+
+Lean ships daily equity data as zipped CSV (data/equity/usa/daily/<sym>.zip,
+rows "YYYYMMDD 00:00,open,high,low,close,volume" with prices in
+deci-cents). Parsing that text on every evaluation dominates local
+back-tests, so each symbol is ingested once into one .npy file per column:
+
+    BAR_STORE_DIR/<symbol>/date.npy    datetime64[D], sorted – the index
+                           open.npy … close.npy   float64 dollars
+                           volume.npy  int64
+                           meta.json   source path, size and mtime
+
+<symbol> is a symlink to a versioned directory <symbol>.<version>. A
+re-ingest writes a new version and swaps the link with os.replace, so a
+reader in another process (walk_forward's pool, prescreen) always sees a
+complete store; readers resolve the link once, so every column comes from
+the same version. The previous version is kept for readers that resolved
+the old link just before the swap; older ones are removed.
+
+bars() opens the columns with np.load(mmap_mode="r") and returns
+read-only views sliced by binary search on the date index: no copy, the
+OS page cache shares the pages between worker processes, and repeated
+calls in one process are served from an in-memory handle table in
+microseconds. A store whose source zip changed is re-ingested on first
+use.
+
+Usage:
+    python bar_store.py ingest [SYMBOL ...]   # default: schema SYMBOL values
+    python bar_store.py info
+
+Env vars:
+    LEAN_DATA_DIR  – Lean data root (default ./data)
+    BAR_STORE_DIR  – store location (default ./.bars)
+"""
+
+from __future__ import annotations
+import io, json, os, pathlib, shutil, sys, time, zipfile
+from typing import NamedTuple
+
+import numpy as np
+
+ROOT      = pathlib.Path(__file__).resolve().parent
+DATA_DIR  = pathlib.Path(os.getenv("LEAN_DATA_DIR", ROOT / "data"))
+STORE_DIR = pathlib.Path(os.getenv("BAR_STORE_DIR", ROOT / ".bars"))
+COLUMNS   = ("open", "high", "low", "close", "volume")
+
+
+class Bars(NamedTuple):
+    dates: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+
+_open: dict[tuple[pathlib.Path, str], Bars] = {}
+
+
+def source_path(symbol: str, data_dir: pathlib.Path = DATA_DIR) -> pathlib.Path:
+    base = data_dir / "equity" / "usa" / "daily" / symbol.lower()
+    zipped = base.with_suffix(".zip")
+    return zipped if zipped.exists() else base.with_suffix(".csv")
+
+
+def parse_lean(path: pathlib.Path) -> Bars:
+    """Parse a Lean daily zip/CSV into in-memory columns."""
+    if path.suffix == ".zip":
+        with zipfile.ZipFile(path) as zf:
+            raw = zf.read(zf.namelist()[0]).decode()
+    else:
+        raw = path.read_text()
+    rows = np.loadtxt(io.StringIO(raw.replace(" 00:00", "")), delimiter=",",
+                      dtype=np.int64, ndmin=2)
+    day = rows[:, 0]
+    dates = (np.array(day // 10000 - 1970, dtype="datetime64[Y]").astype("datetime64[M]")
+             + (day // 100 % 100 - 1)).astype("datetime64[D]") + (day % 100 - 1)
+    order = np.argsort(dates, kind="stable")
+    prices = rows[order, 1:5] / 10_000.0          # Lean stores deci-cents
+    return Bars(dates[order], *prices.T.copy(), rows[order, 5].copy())
+
+
+def _signature(path: pathlib.Path) -> dict:
+    st = path.stat()
+    return {"source": str(path), "size": st.st_size, "mtime": st.st_mtime}
+
+
+def ingest(symbol: str, store_dir: pathlib.Path = STORE_DIR,
+           data_dir: pathlib.Path = DATA_DIR) -> pathlib.Path:
+    """(Re)write the columnar store for `symbol`; returns its directory."""
+    src = source_path(symbol, data_dir)
+    bars = parse_lean(src)
+    sym = symbol.upper()
+    final = store_dir / sym
+    version = store_dir / f"{sym}.{time.time_ns()}-{os.getpid()}"
+    version.mkdir(parents=True)
+    np.save(version / "date.npy", bars.dates)
+    for col in COLUMNS:
+        np.save(version / f"{col}.npy", getattr(bars, col))
+    (version / "meta.json").write_text(json.dumps({**_signature(src), "rows": len(bars.dates)}))
+
+    previous = final.resolve() if final.is_symlink() else None
+    if final.is_dir() and not final.is_symlink():  # pre-versioning layout: adopt it as a version
+        previous = store_dir / f"{sym}.0-legacy"
+        final.rename(previous)
+    link = store_dir / f".{sym}.link.{os.getpid()}"
+    link.unlink(missing_ok=True)
+    link.symlink_to(version.name)
+    os.replace(link, final)                         # atomic pointer swap
+    for old in store_dir.glob(f"{sym}.*"):
+        if old.is_dir() and old.name not in (version.name, previous and previous.name):
+            shutil.rmtree(old, ignore_errors=True)
+    _open.pop((store_dir, sym), None)
+    return final
+
+
+def _fresh(path: pathlib.Path, data_dir: pathlib.Path, symbol: str) -> bool:
+    try:
+        meta = json.loads((path / "meta.json").read_text())
+    except (FileNotFoundError, ValueError):
+        return False
+    try:
+        current = _signature(source_path(symbol, data_dir))
+    except FileNotFoundError:
+        return True                                # source gone: keep serving the store
+    return all(meta.get(k) == v for k, v in current.items())
+
+
+def _load(symbol: str, store_dir: pathlib.Path, data_dir: pathlib.Path) -> Bars:
+    key = (store_dir, symbol.upper())
+    full = _open.get(key)
+    if full is None:
+        path = store_dir / symbol.upper()
+        if not _fresh(path, data_dir, symbol):
+            path = ingest(symbol, store_dir, data_dir)
+        path = path.resolve()                      # pin one version for every column
+        full = Bars(np.load(path / "date.npy", mmap_mode="r"),
+                    *(np.load(path / f"{col}.npy", mmap_mode="r") for col in COLUMNS))
+        _open[key] = full
+    return full
+
+
+def bars(symbol: str, start=None, end=None, store_dir: pathlib.Path = STORE_DIR,
+         data_dir: pathlib.Path = DATA_DIR) -> Bars:
+    """Zero-copy read-only views of `symbol`'s bars with start ≤ date ≤ end."""
+    full = _load(symbol, store_dir, data_dir)
+    lo = 0 if start is None else int(np.searchsorted(full.dates, np.datetime64(start, "D")))
+    hi = (len(full.dates) if end is None
+          else int(np.searchsorted(full.dates, np.datetime64(end, "D"), side="right")))
+    return Bars(*(col[lo:hi] for col in full))
+
+
+def main(argv: list[str]):
+    cmd = argv[0] if argv else "info"
+    if cmd == "ingest":
+        symbols = argv[1:]
+        if not symbols:
+            from genome import load_schema
+            symbols = load_schema()["SYMBOL"]["values"]
+        for symbol in symbols:
+            path = ingest(symbol)
+            print(f"📦  {symbol}: {json.loads((path / 'meta.json').read_text())['rows']} bars → {path}")
+    elif cmd == "info":
+        for path in sorted(p for p in STORE_DIR.glob("*/meta.json") if "." not in p.parent.name):
+            meta = json.loads(path.read_text())
+            b = bars(path.parent.name)
+            print(f"{path.parent.name:>6}  {meta['rows']:>6} bars  {b.dates[0]} → {b.dates[-1]}")
+    else:
+        sys.exit(f"unknown command {cmd!r} (ingest | info)")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
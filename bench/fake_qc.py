@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Local fake of the QuantConnect REST endpoints the pipeline calls.
+
+    POST /backtests/create   {"projectId", "name", "params"} → {"backtestId"}
+    POST /backtests/read     in-progress until its run time has elapsed,
+                             then Completed with statistics + charts
+    POST /backtests/delete   cancels a back-test
+    GET  /_stats             call counts per endpoint, as JSON
+
+Every back-test is queued for QUEUE seconds and then runs for RUNTIME
+seconds (± JITTER fraction); statistics are a deterministic function of
+the params so selectors see a stable ranking. LATENCY adds a delay to
+every response and FAILURE_RATE answers that share of calls with HTTP 503
+to exercise the client's retries. CHART_POINTS sizes the equity chart so
+downloads weigh something.
+
+The `lean` shim in bench/bin submits through /backtests/create, so
+run_parallel_backtests.py works unchanged with bench/bin first on PATH and
+QC_API_URL pointing here.
+
+Usage:
+    python bench/fake_qc.py [--port 8765]
+
+Env vars:
+    FAKE_QC_LATENCY       – seconds added to each response (default 0.005)
+    FAKE_QC_FAILURE_RATE  – share of calls answered 503 (default 0.01)
+    FAKE_QC_QUEUE         – seconds before a back-test starts (default 0.2)
+    FAKE_QC_RUNTIME       – mean back-test run time, seconds (default 2)
+    FAKE_QC_JITTER        – ± fraction of run time (default 0.5)
+    FAKE_QC_CHART_POINTS  – equity chart points per result (default 2000)
+"""
+
+from __future__ import annotations
+import argparse, collections, hashlib, json, os, random, threading, time, uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+LATENCY      = float(os.getenv("FAKE_QC_LATENCY", 0.005))
+FAILURE_RATE = float(os.getenv("FAKE_QC_FAILURE_RATE", 0.01))
+QUEUE        = float(os.getenv("FAKE_QC_QUEUE", 0.2))
+RUNTIME      = float(os.getenv("FAKE_QC_RUNTIME", 2))
+JITTER       = float(os.getenv("FAKE_QC_JITTER", 0.5))
+CHART_POINTS = int(os.getenv("FAKE_QC_CHART_POINTS", 2000))
+
+
+class Backtests:
+    def __init__(self, seed: int = 0):
+        self.lock = threading.Lock()
+        self.items: dict[str, dict] = {}
+        self.calls: collections.Counter = collections.Counter()
+        self.rng = random.Random(seed)
+
+    def create(self, body: dict) -> dict:
+        bt_id = uuid.uuid4().hex
+        with self.lock:
+            runtime = RUNTIME * (1 + self.rng.uniform(-JITTER, JITTER))
+        self.items[bt_id] = {"name": body.get("name", bt_id), "params": body.get("params") or {},
+                             "start": time.monotonic() + QUEUE, "runtime": runtime,
+                             "deleted": False}
+        return {"success": True, "backtestId": bt_id}
+
+    def delete(self, body: dict) -> dict:
+        bt = self.items.get(body.get("backtestId"))
+        if bt is None:
+            return {"success": False, "errors": ["No backtest found"]}
+        bt["deleted"] = True
+        return {"success": True}
+
+    def read(self, body: dict) -> dict:
+        bt_id = body.get("backtestId")
+        bt = self.items.get(bt_id)
+        if bt is None or bt["deleted"]:
+            return {"success": False, "errors": ["No backtest found"]}
+        progress = min(1.0, max(0.0, (time.monotonic() - bt["start"]) / bt["runtime"]))
+        stats = statistics(bt["params"])
+        backtest = {"backtestId": bt_id, "name": bt["name"], "progress": progress,
+                    "runtimeStatistics": {"Return": f"{stats['ret'] * progress * 100:.2f} %"}}
+        if progress < 1.0:
+            backtest["status"] = "In Queue..." if progress == 0 else "In Progress..."
+        else:
+            backtest.update(
+                status="Completed",
+                statistics={"Sharpe Ratio": f"{stats['sharpe']:.3f}",
+                            "Drawdown": f"{stats['drawdown'] * 100:.1f}%",
+                            "Net Profit": f"{stats['ret'] * 100:.2f}%"},
+                portfolioStatistics={"sharpeRatio": stats["sharpe"], "drawdown": stats["drawdown"],
+                                     "totalNetProfit": stats["ret"]},
+                runtimeStatistics={"Return": f"{stats['ret'] * 100:.2f} %",
+                                   "OOS Net Profit": f"{stats['ret'] * 2000:.2f}"},
+                charts={"Strategy Equity": {"series": {"Equity": {"values": [
+                    {"x": 1_700_000_000 + 86_400 * i, "y": round(100_000 * (1 + stats["ret"] * i / CHART_POINTS), 2)}
+                    for i in range(CHART_POINTS)]}}}},
+            )
+        return {"success": True, "backtest": backtest}
+
+
+def statistics(params: dict) -> dict[str, float]:
+    """Deterministic pseudo-statistics per params."""
+    h = int(hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()[:12], 16)
+    u = [(h >> (16 * i) & 0xFFFF) / 0xFFFF for i in range(3)]
+    return {"sharpe": round(3 * u[0] - 1, 4), "drawdown": round(0.02 + 0.3 * u[1], 4),
+            "ret": round(0.6 * u[2] - 0.2, 4)}
+
+
+def handler(store: Backtests):
+    routes = {"backtests/create": store.create, "backtests/read": store.read,
+              "backtests/delete": store.delete}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"               # keep-alive, like the real API
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, code: int, body: dict) -> None:
+            data = json.dumps(body).encode()
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path.rstrip("/") == "/_stats":
+                with store.lock:
+                    self._send(200, {"calls": dict(store.calls), "backtests": len(store.items)})
+            else:
+                self._send(404, {"success": False})
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            body = json.loads(self.rfile.read(length) or b"{}")
+            endpoint = self.path.strip("/").split("/", 2)[-2:]
+            route = routes.get("/".join(endpoint))
+            with store.lock:
+                store.calls["/".join(endpoint)] += 1
+                fail = store.rng.random() < FAILURE_RATE
+            time.sleep(LATENCY)
+            if route is None:
+                self._send(404, {"success": False, "errors": [f"unknown endpoint {self.path}"]})
+            elif fail:
+                self._send(503, {"success": False, "errors": ["injected failure"]})
+            else:
+                self._send(200, route(body))
+
+    return Handler
+
+
+def serve(port: int = 0) -> ThreadingHTTPServer:
+    """Start the fake in a daemon thread; returns the server (server_port is bound)."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler(Backtests()))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--port", type=int, default=8765)
+    args = ap.parse_args()
+    server = serve(args.port)
+    print(f"🧪 fake QuantConnect API on http://127.0.0.1:{server.server_port}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Pipeline throughput benchmark against local fakes – no cloud back-tests.
+
+For each size N it builds a scratch copy of the repo with N children,
+starts bench/fake_qc.py in-process, puts the bench/bin `lean` shim first on
+PATH, points Firestore at fake_firestore (FIRESTORE_FAKE=<file>) and runs
+the real pipeline scripts in order as subprocesses:
+
+    scripts/run_parallel_backtests.py → wait_backtests.py →
+    store_results.py → select_survivors.py → select_champion.py
+
+Per stage it records wall time, peak RSS of the stage process, QC API
+calls (from the fake's /_stats) and Firestore reads / writes (from the
+fake's ops file). Results are compared with bench/baselines.json; any
+metric over baseline × (1 + tolerance) + slack is a regression and the
+suite exits 1. --update-baselines rewrites the file from this run.
+
+Usage:
+    python bench/pipeline.py [--sizes 10,100,1000] [--update-baselines] [--keep]
+
+Env vars:
+    BENCH_TOLERANCE  – allowed relative growth of wall time (default 0.5);
+                       memory and call counts allow half of it
+    BENCH_IN_FLIGHT  – MAX_IN_FLIGHT for the submission stage (default 32)
+    FAKE_QC_*        – fake API behaviour, see bench/fake_qc.py
+"""
+
+from __future__ import annotations
+import argparse, json, os, pathlib, shutil, subprocess, sys, tempfile, time, urllib.request
+
+BENCH = pathlib.Path(__file__).resolve().parent
+ROOT = BENCH.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(BENCH))
+
+import fake_qc
+from genome import Genome
+
+BASELINES = BENCH / "baselines.json"
+TOLERANCE = float(os.getenv("BENCH_TOLERANCE", 0.5))
+IN_FLIGHT = int(os.getenv("BENCH_IN_FLIGHT", 32))
+STAGES = [
+    ("submit", ["scripts/run_parallel_backtests.py"]),
+    ("wait", ["wait_backtests.py"]),
+    ("store", ["store_results.py"]),
+    ("survivors", ["select_survivors.py"]),
+    ("champion", ["select_champion.py"]),
+]
+# metric → (relative tolerance, absolute slack)
+LIMITS = {"wall_s": (TOLERANCE, 1.0), "peak_mb": (TOLERANCE / 2, 5.0),
+          "api_calls": (TOLERANCE / 2, 5), "fs_reads": (TOLERANCE / 2, 5),
+          "fs_writes": (TOLERANCE / 2, 5)}
+COPY = ("*.py", "parameter_schema.json", "lean.json", "scripts", "strategies")
+# Runs a stage script and records its own peak RSS (VmHWM) at exit. A
+# forked child's ru_maxrss starts at the parent's RSS, so wait4() alone
+# would charge the bench process's memory to every stage.
+MEASURE = (
+    "import atexit, runpy, sys\n"
+    "out = sys.argv.pop(1); sys.argv.pop(0)\n"
+    "def hwm():\n"
+    "    kb = next(l.split()[1] for l in open('/proc/self/status') if l.startswith('VmHWM'))\n"
+    "    open(out, 'w').write(kb)\n"
+    "atexit.register(hwm)\n"
+    "runpy.run_path(sys.argv[0], run_name='__main__')\n"
+)
+
+
+def workspace(n: int) -> pathlib.Path:
+    ws = pathlib.Path(tempfile.mkdtemp(prefix=f"bench{n}_"))
+    for pattern in COPY:
+        for src in ROOT.glob(pattern):
+            if src.is_dir():
+                shutil.copytree(src, ws / src.name, ignore=shutil.ignore_patterns("__pycache__"))
+            else:
+                shutil.copy2(src, ws / src.name)
+    genome = Genome.load(ws / "parameter_schema.json")
+    pop = genome.unique(genome.sample(2 * n))[:n]
+    children = ws / "children"
+    children.mkdir()
+    for i, params in enumerate(genome.to_dicts(pop)):
+        params = {"STRATEGY_MODULE": "ema_cross_strategy", **params}
+        (children / f"child_{i:05d}.json").write_text(json.dumps(params))
+    return ws
+
+
+def api_calls(url: str) -> int:
+    with urllib.request.urlopen(f"{url}/_stats") as r:
+        return sum(json.load(r)["calls"].values())
+
+
+def fs_ops(ws: pathlib.Path) -> dict[str, int]:
+    path = ws / "firestore.pkl.ops.json"
+    return json.loads(path.read_text()) if path.exists() else {}
+
+
+def run_stage(cmd: list[str], ws: pathlib.Path, env: dict) -> tuple[float, float, int]:
+    """(wall seconds, peak RSS MB, exit code) of one stage process."""
+    hwm = ws / ".hwm"
+    hwm.unlink(missing_ok=True)
+    with open(ws / "bench.log", "a") as log:
+        log.write(f"\n$ {' '.join(cmd)}\n")
+        log.flush()
+        t0 = time.perf_counter()
+        code = subprocess.run([sys.executable, "-c", MEASURE, str(hwm), *cmd], cwd=ws, env=env,
+                              stdout=log, stderr=subprocess.STDOUT).returncode
+        wall = time.perf_counter() - t0
+    peak_kb = int(hwm.read_text()) if hwm.exists() else 0
+    return wall, peak_kb / 1024, code
+
+
+def bench(n: int, keep: bool = False) -> dict[str, dict]:
+    server = fake_qc.serve(0)
+    url = f"http://127.0.0.1:{server.server_port}"
+    ws = workspace(n)
+    env = {**os.environ,
+           "PATH": f"{BENCH / 'bin'}{os.pathsep}{os.environ.get('PATH', '')}",
+           "QC_API_URL": url, "QC_USER_ID": "bench", "QC_API_TOKEN": "bench",
+           "QC_PROJECT_ID": "bench", "QC_RATE_LIMIT": "1000",
+           "MAX_IN_FLIGHT": str(IN_FLIGHT), "POLL_MIN_INTERVAL": "0.25",
+           "POLL_MAX_INTERVAL": "2", "EXPECTED_RUNTIME": str(fake_qc.QUEUE + fake_qc.RUNTIME),
+           "FIRESTORE_FAKE": str(ws / "firestore.pkl"), "GENERATION": "bench",
+           "FITNESS_CACHE_DIR": str(ws / ".fitness_cache"), "TELEMETRY_DIR": str(ws / ".telemetry"),
+           "RESPONSE_CACHE_DIR": str(ws / ".response_cache"),
+           "EARLY_CANCEL": "0", "PYTHONDONTWRITEBYTECODE": "1"}
+    out = {}
+    try:
+        for name, cmd in STAGES:
+            calls, ops = api_calls(url), fs_ops(ws)
+            wall, peak, code = run_stage(cmd, ws, env)
+            after = fs_ops(ws)
+            out[name] = {"wall_s": round(wall, 2), "peak_mb": round(peak, 1),
+                         "api_calls": api_calls(url) - calls,
+                         "fs_reads": after.get("reads", 0) - ops.get("reads", 0),
+                         "fs_writes": after.get("writes", 0) - ops.get("writes", 0)}
+            if code:
+                tail = (ws / "bench.log").read_text().splitlines()[-15:]
+                raise RuntimeError(f"{name} exited {code} at N={n}:\n" + "\n".join(tail))
+    finally:
+        server.shutdown()
+        if keep:
+            print(f"   workspace kept at {ws}")
+        else:
+            shutil.rmtree(ws, ignore_errors=True)
+    return out
+
+
+def regressions(size: str, results: dict, baselines: dict) -> list[str]:
+    found = []
+    for stage, metrics in results.items():
+        base = baselines.get(size, {}).get(stage)
+        if not base:
+            continue
+        for metric, value in metrics.items():
+            rel, slack = LIMITS[metric]
+            limit = base.get(metric, 0) * (1 + rel) + slack
+            if value > limit:
+                found.append(f"N={size} {stage}.{metric}: {value} > {limit:.1f} "
+                             f"(baseline {base.get(metric)})")
+    return found
+
+
+def main(argv: list[str]):
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", default="10,100,1000")
+    ap.add_argument("--update-baselines", action="store_true")
+    ap.add_argument("--keep", action="store_true", help="keep the scratch workspaces")
+    args = ap.parse_args(argv)
+
+    baselines = json.loads(BASELINES.read_text()) if BASELINES.exists() else {}
+    report, failed = {}, []
+    for n in (int(s) for s in args.sizes.split(",")):
+        print(f"🏋️  N={n}")
+        report[str(n)] = results = bench(n, args.keep)
+        for stage, m in results.items():
+            print(f"   {stage:<10} {m['wall_s']:8.2f}s  {m['peak_mb']:7.1f} MB  "
+                  f"{m['api_calls']:6d} API  {m['fs_reads']:6d} reads  {m['fs_writes']:6d} writes")
+        total = sum(m["wall_s"] for m in results.values())
+        print(f"   {'total':<10} {total:8.2f}s")
+        failed += regressions(str(n), results, baselines)
+
+    if args.update_baselines:
+        BASELINES.write_text(json.dumps({**baselines, **report}, indent=2) + "\n")
+        print(f"📝 Baselines written to {BASELINES.relative_to(ROOT)}")
+        return
+    if failed:
+        print("❌ Regressions against baselines:")
+        for line in failed:
+            print(f"   {line}")
+        sys.exit(1)
+    print("✅ Within baselines" if baselines else "ℹ️  No baselines yet – run with --update-baselines")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,319 @@
+"""
+In-memory stand-in for the subset of google.cloud.firestore the pipeline uses.
+
+Supports collection/document get/set/add/delete, where / order_by / limit /
+start_after / select / stream, batches and a BulkWriter look-alike, with
+dotted field paths ("metrics.fitness") and SERVER_TIMESTAMP resolved at
+write time. Point firestore_db.client() at it with FIRESTORE_FAKE=1, or
+FIRESTORE_FAKE=<file> to persist the data across processes (pickled at
+exit). Read / write / delete counters make it usable for benchmarks; with
+a file they are also accumulated across processes in <file>.ops.json.
+"""
+
+from __future__ import annotations
+import atexit, copy, datetime as dt, json, operator, os, pathlib, pickle, threading, uuid
+
+DESCENDING = "DESCENDING"
+ASCENDING = "ASCENDING"
+
+
+class _Sentinel:
+    def __repr__(self):
+        return "SERVER_TIMESTAMP"
+
+
+SERVER_TIMESTAMP = _Sentinel()
+
+_OPS = {
+    "==": operator.eq, "!=": operator.ne, "<": operator.lt, "<=": operator.le,
+    ">": operator.gt, ">=": operator.ge,
+    "in": lambda a, b: a in b, "not-in": lambda a, b: a not in b,
+    "array_contains": lambda a, b: isinstance(a, list) and b in a,
+}
+_MISSING = object()
+
+
+def _lookup(data: dict, path: str):
+    node = data
+    for part in path.split("."):
+        if not isinstance(node, dict) or part not in node:
+            return _MISSING
+        node = node[part]
+    return node
+
+
+def _resolve(value, now):
+    if isinstance(value, dict):
+        return {k: _resolve(v, now) for k, v in value.items()}
+    if value is SERVER_TIMESTAMP or type(value).__name__ == "Sentinel":
+        return now
+    return value
+
+
+class DocumentSnapshot:
+    def __init__(self, reference, data):
+        self.reference, self._data = reference, data
+
+    @property
+    def id(self):
+        return self.reference.id
+
+    @property
+    def exists(self):
+        return self._data is not None
+
+    def to_dict(self):
+        return copy.deepcopy(self._data)
+
+    def get(self, field):
+        value = _lookup(self._data or {}, field)
+        if value is _MISSING:
+            raise KeyError(field)
+        return value
+
+
+class DocumentReference:
+    def __init__(self, client, coll: str, doc_id: str):
+        self._client, self._coll, self.id = client, coll, doc_id
+
+    @property
+    def path(self):
+        return f"{self._coll}/{self.id}"
+
+    def get(self):
+        self._client.reads += 1
+        data = self._client._store.get(self._coll, {}).get(self.id)
+        return DocumentSnapshot(self, copy.deepcopy(data))
+
+    def set(self, data: dict, merge: bool = False):
+        self._client._write(self._coll, self.id, data, merge)
+
+    def update(self, data: dict):
+        self._client._write(self._coll, self.id, data, True)
+
+    def delete(self):
+        self._client._delete(self._coll, self.id)
+
+
+class Query:
+    DESCENDING, ASCENDING = DESCENDING, ASCENDING
+
+    def __init__(self, client, coll, filters=(), orders=(), limit_=None,
+                 cursor=None, fields=None, offset_=0):
+        self._client, self._coll = client, coll
+        self._filters, self._orders = tuple(filters), tuple(orders)
+        self._limit, self._cursor, self._fields, self._offset = limit_, cursor, fields, offset_
+
+    def _copy(self, **kw):
+        args = dict(filters=self._filters, orders=self._orders, limit_=self._limit,
+                    cursor=self._cursor, fields=self._fields, offset_=self._offset)
+        args.update(kw)
+        return Query(self._client, self._coll, **args)
+
+    def where(self, field, op=None, value=None, *, filter=None):
+        if filter is not None:                      # FieldFilter(field, op, value)
+            field, op, value = filter.field_path, filter.op_string, filter.value
+        if not isinstance(field, str):              # FieldPath.document_id()
+            field = "__name__"
+        return self._copy(filters=self._filters + ((field, op, value),))
+
+    def order_by(self, field, direction=ASCENDING):
+        return self._copy(orders=self._orders + ((field, direction),))
+
+    def limit(self, n):
+        return self._copy(limit_=n)
+
+    def offset(self, n):
+        return self._copy(offset_=n)
+
+    def start_after(self, cursor):
+        return self._copy(cursor=cursor)
+
+    def select(self, fields):
+        return self._copy(fields=list(fields))
+
+    def stream(self):
+        with self._client._lock:
+            items = list(self._client._store.get(self._coll, {}).items())
+        rows = []
+        for doc_id, data in items:
+            ok = True
+            for field, op, value in self._filters:
+                v = doc_id if field == "__name__" else _lookup(data, field)
+                if v is _MISSING or not _OPS[op](v, value):
+                    ok = False
+                    break
+            # like Firestore, ordering on a field excludes docs without it
+            if ok and all(f == "__name__" or _lookup(data, f) is not _MISSING
+                          for f, _ in self._orders):
+                rows.append((doc_id, data))
+
+        for field, direction in reversed(self._orders + (("__name__", ASCENDING),)):
+            rows.sort(key=lambda r: r[0] if field == "__name__" else _lookup(r[1], field),
+                      reverse=direction == DESCENDING)
+
+        if self._cursor is not None:
+            cur_id = self._cursor.id if isinstance(self._cursor, DocumentSnapshot) else None
+            if cur_id is not None:
+                idx = next((i for i, r in enumerate(rows) if r[0] == cur_id), None)
+                rows = rows[idx + 1:] if idx is not None else rows
+            else:                                    # dict of field values
+                def after(r):
+                    for field, direction in self._orders:
+                        a, b = _lookup(r[1], field), self._cursor[field]
+                        if a != b:
+                            return a < b if direction == DESCENDING else a > b
+                    return False
+                rows = [r for r in rows if after(r)]
+
+        rows = rows[self._offset:]
+        if self._limit is not None:
+            rows = rows[:self._limit]
+        for doc_id, data in rows:
+            self._client.reads += 1
+            if self._fields is not None:
+                proj = {}
+                for f in self._fields:
+                    v = _lookup(data, f)
+                    if v is not _MISSING:
+                        node = proj
+                        parts = f.split(".")
+                        for p in parts[:-1]:
+                            node = node.setdefault(p, {})
+                        node[parts[-1]] = v
+                data = proj
+            yield DocumentSnapshot(DocumentReference(self._client, self._coll, doc_id),
+                                   copy.deepcopy(data))
+
+    def get(self):
+        return list(self.stream())
+
+
+class CollectionReference(Query):
+    def __init__(self, client, name):
+        super().__init__(client, name)
+        self.id = name
+
+    def document(self, doc_id: str | None = None):
+        return DocumentReference(self._client, self._coll, doc_id or uuid.uuid4().hex[:20])
+
+    def add(self, data: dict):
+        ref = self.document()
+        ref.set(data)
+        return dt.datetime.now(dt.timezone.utc), ref
+
+
+class WriteBatch:
+    LIMIT = 500                                     # Firestore's per-batch cap
+
+    def __init__(self, client):
+        self._client, self._ops = client, []
+
+    def _add(self, op):
+        if len(self._ops) >= self.LIMIT:
+            raise ValueError("maximum 500 writes allowed per request")
+        self._ops.append(op)
+
+    def set(self, ref, data, merge=False):
+        self._add(lambda: ref.set(data, merge))
+
+    def delete(self, ref):
+        self._add(ref.delete)
+
+    def commit(self):
+        for op in self._ops:
+            op()
+        self._ops = []
+
+
+class BulkWriter:
+    """Applies writes immediately; callbacks mirror the real BulkWriter."""
+
+    def __init__(self, client):
+        self._client = client
+        self._on_result = self._on_error = None
+
+    def on_write_result(self, cb):
+        self._on_result = cb
+
+    def on_write_error(self, cb):
+        self._on_error = cb
+
+    def _apply(self, ref, fn):
+        fn()
+        if self._on_result:
+            self._on_result(ref, None, self)
+
+    def set(self, ref, data, merge=False):
+        self._apply(ref, lambda: ref.set(data, merge))
+
+    def delete(self, ref):
+        self._apply(ref, ref.delete)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class Client:
+    def __init__(self, path: str | os.PathLike | None = None):
+        self._store: dict[str, dict[str, dict]] = {}
+        self._lock = threading.RLock()
+        self._last = dt.datetime.min.replace(tzinfo=dt.timezone.utc)
+        self.reads = self.writes = self.deletes = 0
+        self._path = pathlib.Path(path) if path else None
+        if self._path and self._path.exists():
+            with open(self._path, "rb") as fh:
+                self._store = pickle.load(fh)
+        if self._path:
+            atexit.register(self.save)
+
+    def save(self):
+        with self._lock, open(self._path, "wb") as fh:
+            pickle.dump(self._store, fh)
+        ops_path = self._path.with_name(self._path.name + ".ops.json")
+        ops = json.loads(ops_path.read_text()) if ops_path.exists() else {}
+        for name in ("reads", "writes", "deletes"):
+            ops[name] = ops.get(name, 0) + getattr(self, name)
+        ops_path.write_text(json.dumps(ops))
+        self.reads = self.writes = self.deletes = 0       # a second save() must not double-count
+
+    def collection(self, name: str):
+        return CollectionReference(self, name)
+
+    def document(self, path: str):
+        coll, doc_id = path.split("/", 1)
+        return DocumentReference(self, coll, doc_id)
+
+    def batch(self):
+        return WriteBatch(self)
+
+    def bulk_writer(self):
+        return BulkWriter(self)
+
+    def get_all(self, refs):
+        return [ref.get() for ref in refs]
+
+    def _now(self):
+        # strictly increasing so createdAt ordering is deterministic
+        with self._lock:
+            now = dt.datetime.now(dt.timezone.utc)
+            self._last = max(now, self._last + dt.timedelta(microseconds=1))
+            return self._last
+
+    def _write(self, coll, doc_id, data, merge):
+        data = copy.deepcopy(_resolve(data, self._now()))
+        with self._lock:
+            docs = self._store.setdefault(coll, {})
+            if merge and doc_id in docs:
+                docs[doc_id] = {**docs[doc_id], **data}
+            else:
+                docs[doc_id] = data
+            self.writes += 1
+
+    def _delete(self, coll, doc_id):
+        with self._lock:
+            self._store.get(coll, {}).pop(doc_id, None)
+            self.deletes += 1
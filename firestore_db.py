@@ -0,0 +1,35 @@
+"""
+Firestore client factory shared by every pipeline script.
+
+Writes the GCP_SA_KEY service-account JSON (GitHub secret) to gcp_key.json
+and points GOOGLE_APPLICATION_CREDENTIALS at it; without the secret the
+default application credentials are used. FIRESTORE_FAKE=1 (or =<file> to
+persist between processes) swaps in the in-memory fake_firestore client.
+"""
+
+from __future__ import annotations
+import os
+
+
+def client():
+    fake = os.getenv("FIRESTORE_FAKE")
+    if fake:
+        import fake_firestore
+        return fake_firestore.Client(None if fake == "1" else fake)
+
+    from google.cloud import firestore
+    key = os.getenv("GCP_SA_KEY")
+    if key:
+        with open("gcp_key.json", "w") as fh:
+            fh.write(key)
+        os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = "gcp_key.json"
+    return firestore.Client()
+
+
+def server_timestamp():
+    """SERVER_TIMESTAMP sentinel matching whichever client client() returns."""
+    if os.getenv("FIRESTORE_FAKE"):
+        import fake_firestore
+        return fake_firestore.SERVER_TIMESTAMP
+    from google.cloud import firestore
+    return firestore.SERVER_TIMESTAMP
@@ -0,0 +1,95 @@
+"""
+Typed fitness fields and generation tags written with every back-test doc.
+
+QuantConnect reports statistics as display strings ("9.2%", "$1,234.56"),
+so ranking on them means parsing every document client-side. Ingestion
+stores numeric copies instead:
+
+    fitness            sharpeRatio − 2·drawdown (score_population.py's formula)
+    metrics.<name>     sharpeRatio, drawdown, netProfit, oosNetProfit as floats
+    generation, runId  tags every selector filters on
+
+so selectors can run `where(generation) + order_by(...) + limit(k)` against
+the composite indexes in firestore.indexes.json and read O(k) documents
+(see ranking.py).
+"""
+
+from __future__ import annotations
+import datetime as dt, math, os
+
+COLL = "backtest_results"
+
+# metric name → statistic labels QuantConnect uses for it (first match wins)
+STAT_KEYS = {
+    "sharpeRatio":  ("sharpeRatio", "Sharpe Ratio"),
+    "drawdown":     ("drawdown", "Drawdown"),
+    "netProfit":    ("netProfit", "Net Profit", "totalNetProfit"),
+    "oosNetProfit": ("OOS Net Profit",),
+}
+FALLBACK = {"sharpeRatio": 0.0, "drawdown": 1.0, "netProfit": 0.0, "oosNetProfit": 0.0}
+
+# selector fields every ranking query projects onto
+PROJECTION = ["name", "generation", "runId", "fitness", "metrics", "statistics", "params"]
+
+RUN_ID = os.getenv("RUN_ID") or os.getenv("GITHUB_RUN_ID") or ""
+
+
+def current_generation() -> str:
+    """GENERATION env var, else one generation per UTC day."""
+    return os.getenv("GENERATION") or f"evolve-{dt.datetime.utcnow():%Y%m%d}"
+
+
+def parse_stat(value) -> float | None:
+    """'9.2%' → 0.092, '$1,234.5' → 1234.5, '1.3' → 1.3; None if unparseable."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if not isinstance(value, str):
+        return None
+    text = value.strip().replace(",", "").replace("$", "").replace(" ", "")
+    scale = 1.0
+    if text.endswith("%"):
+        text, scale = text[:-1], 0.01
+    try:
+        num = float(text) * scale
+    except ValueError:
+        return None
+    return num if math.isfinite(num) else None
+
+
+def extract_statistics(result: dict) -> dict:
+    """Statistics dict from a backtests/read response (flat or nested shape) or a
+    result_store summary. Every scorer goes through this so a back-test gets the
+    same fitness whichever copy of its result is read."""
+    backtest = result.get("backtest") or {}
+    stats = dict(result.get("statistics") or backtest.get("statistics")
+                 or backtest.get("portfolioStatistics") or {})
+    # custom SetStatistics values (e.g. "OOS Net Profit") land in runtimeStatistics
+    for key, val in (backtest.get("runtimeStatistics") or {}).items():
+        stats.setdefault(key, val)
+    return stats
+
+
+def metrics(stats: dict) -> dict[str, float]:
+    out = {}
+    for name, labels in STAT_KEYS.items():
+        val = next((v for v in (parse_stat(stats.get(k)) for k in labels) if v is not None),
+                   FALLBACK[name])
+        out[name] = val
+    return out
+
+
+def score(m: dict[str, float]) -> float:
+    """Higher is better."""
+    return m["sharpeRatio"] - 2.0 * m["drawdown"]
+
+
+def fitness_fields(stats: dict, generation: str | None = None) -> dict:
+    """Fields to merge into a back-test document at write time."""
+    m = metrics(stats)
+    return {
+        "fitness": score(m),
+        "metrics": m,
+        "generation": generation or current_generation(),
+        "runId": RUN_ID,
+    }
+
@@ -0,0 +1,80 @@
+"""
+Content-addressed fitness cache keyed on the canonical params hash.
+
+The key is md5(json.dumps(params, sort_keys=True)) – the digest algo_gen.py
+and scripts/evaluate.py already put in child folder names. Each entry holds
+the backtestId and statistics of a finished run and lives on disk under
+FITNESS_CACHE_DIR/<2-char prefix>/<hash>.json. Set FITNESS_CACHE_FIRESTORE=1
+to mirror entries into the `fitness_cache` collection so every runner
+shares hits.
+"""
+
+from __future__ import annotations
+import hashlib, json, os, pathlib
+
+ROOT      = pathlib.Path(__file__).resolve().parent
+CACHE_DIR = pathlib.Path(os.getenv("FITNESS_CACHE_DIR", ROOT / ".fitness_cache"))
+MIRROR    = os.getenv("FITNESS_CACHE_FIRESTORE", "0") == "1"
+COLL      = "fitness_cache"
+
+
+def param_hash(params: dict) -> str:
+    """Canonical digest of a params dict (folder names use the first 8 chars)."""
+    return hashlib.md5(json.dumps(params, sort_keys=True).encode()).hexdigest()
+
+
+class FitnessCache:
+    def __init__(self, root: pathlib.Path = CACHE_DIR, mirror: bool = MIRROR):
+        self.root = pathlib.Path(root)
+        self.hits = self.misses = self.stores = 0
+        self._submitted: dict[str, dict] = {}
+        self._coll = None
+        if mirror:
+            from google.cloud import firestore
+            self._coll = firestore.Client().collection(COLL)
+
+    def _path(self, key: str) -> pathlib.Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def get(self, params: dict) -> dict | None:
+        """Cached {backtestId, statistics, params} for `params`, or None."""
+        key = param_hash(params)
+        path = self._path(key)
+        entry = self._submitted.get(key)
+        if entry is None and path.exists():
+            entry = json.loads(path.read_text())
+        elif entry is None and self._coll is not None:
+            snap = self._coll.document(key).get()
+            if snap.exists:
+                entry = snap.to_dict()
+                self._write_local(key, entry)
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    def remember(self, params: dict, backtest_id: str) -> None:
+        """Record an in-flight submission so duplicates in the same run reuse it."""
+        self._submitted[param_hash(params)] = {"backtestId": backtest_id, "params": params}
+
+    def put(self, params: dict, backtest_id: str, statistics: dict) -> None:
+        key = param_hash(params)
+        entry = {"backtestId": backtest_id, "statistics": statistics, "params": params}
+        self._write_local(key, entry)
+        if self._coll is not None:
+            self._coll.document(key).set(entry)
+        self.stores += 1
+
+    def _write_local(self, key: str, entry: dict) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(entry))
+        tmp.replace(path)              # atomic so concurrent runners never see half a file
+
+    def report(self) -> str:
+        total = self.hits + self.misses
+        rate = 100.0 * self.hits / total if total else 0.0
+        return (f"💾  fitness cache: {self.hits} hits, {self.misses} misses "
+                f"({rate:.0f}% hit rate), {self.stores} stored")
@@ -8,8 +8,9 @@ can feed them into Lean Cloud back-tests.
 How it works
 ------------
 • You tell it how many sets you want (POP_SIZE env-var, default 10)
-• It draws integers within the bounds you define in PARAM_BOUNDS
-• It tags each set with a uuid and a generation number
+• It samples the whole population at once from parameter_schema.json
+  (genome.py) and drops duplicates
+• It tags each set with a uuid and the generation tag (fitness.py)
 • It writes everything to param_candidates.json
 """
 
@@ -18,31 +19,26 @@ import os
 import random
 import uuid
 
+import numpy as np
+
+from fitness import current_generation
+from genome import Genome
+
 # ── CONFIG ────────────────────────────────────────────────────────────────
 POP_SIZE = int(os.getenv("POP_SIZE", 10))       # how many variants to make
-GENERATION = int(os.getenv("GENERATION", 1))    # which “cycle” is this?
+GENERATION = current_generation()                # which “cycle” is this? (e.g. evolve-42)
 SEED = int(os.getenv("SEED", random.randrange(1_000_000)))  # reproducible runs
-
-# Parameter names and their (low, high) integer bounds
-PARAM_BOUNDS = {
-    "fast": (5, 40),          # e.g. fast EMA length
-    "slow": (20, 200),        # slow EMA length
-    "rsi":  (5, 30),          # RSI period
-}
+SCHEMA_FILE = os.getenv("SCHEMA_FILE", "parameter_schema.json")
 
 # ── LOGIC ─────────────────────────────────────────────────────────────────
-random.seed(SEED)
-param_sets = []
-
-for _ in range(POP_SIZE):
-    param = {
-        "id": str(uuid.uuid4()),
-        "generation": GENERATION,
-    }
-    # pick a random integer in each bound range
-    for name, (lo, hi) in PARAM_BOUNDS.items():
-        param[name] = random.randint(lo, hi)
-    param_sets.append(param)
+rng = np.random.default_rng(SEED)
+genome = Genome.load(SCHEMA_FILE)
+pop = genome.unique(genome.sample(POP_SIZE, rng))
+
+param_sets = [
+    {"id": str(uuid.uuid4()), "generation": GENERATION, **params}
+    for params in genome.to_dicts(pop)
+]
 
 outfile = "param_candidates.json"
 with open(outfile, "w") as fp:
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Successive halving over back-test window length.
+
+A flat generation gives every child main.py's full one-year window, so a
+hopeless child costs as much as the eventual champion. Halving runs every
+child on a short window first, promotes the best 1/η to the next, longer
+rung and only gives the final rung the full year with its 60-day OOS split:
+
+    rung r:  [TRAINING_END − HALVING_RUNGS[r] days, TRAINING_END]   in-sample only
+    last:    main.py's own window (START → TODAY, OOS from TRAINING_END)
+
+The short rungs end at TRAINING_END so the OOS days stay unseen until the
+last rung. Windows reach main.py through params.json (START_DATE /
+END_DATE / TRAINING_END, as for walk_forward.py folds).
+
+Local mode replays ema_cross_strategy children with prescreen's simulator
+across the whole ladder. Cloud mode is stepwise around the usual
+submit → wait → store cycle:
+
+    python halving.py start      # rung 0 window into every child's params.json
+    ... run_parallel_backtests.py / wait_backtests.py ...
+    python halving.py promote    # score rung, cull to culled/, write next window
+    ... repeat until promote reports the final rung ...
+
+Both report simulated bar-days against the flat all-children-full-window
+cost. Progress lives in halving_state.json between cloud steps.
+
+Env vars:
+    HALVING_RUNGS   – window days per rung, ascending (default "60,150,365";
+                      the last rung is always main.py's full window)
+    HALVING_ETA     – keep the top 1/η of each rung (default 3)
+    HALVING_BUDGET  – max children entering rung 0 (default all)
+    HALVING_MIN     – never promote fewer than this many (default 1)
+"""
+
+from __future__ import annotations
+import argparse, json, math, os, pathlib, shutil, sys
+from datetime import date, timedelta
+
+import numpy as np
+
+import prescreen
+
+ROOT       = pathlib.Path(__file__).resolve().parent
+RUNGS      = [int(d) for d in os.getenv("HALVING_RUNGS", "60,150,365").split(",")]
+ETA        = float(os.getenv("HALVING_ETA", 3))
+BUDGET     = int(os.getenv("HALVING_BUDGET", 0)) or None
+MIN_KEEP   = int(os.getenv("HALVING_MIN", 1))
+STATE_FILE = ROOT / "halving_state.json"
+OUT_FILE   = ROOT / "halving.json"
+BACKTESTS_FILE = ROOT / "backtests.json"
+WINDOW_KEYS = ("START_DATE", "END_DATE", "TRAINING_END")
+
+
+def windows(rungs: list[int] = RUNGS) -> list[tuple[date, date, date]]:
+    """(start, training_end, end) per rung; the last one is main.py's split."""
+    out = [(prescreen.TRAINING_END - timedelta(days=d), prescreen.TRAINING_END,
+            prescreen.TRAINING_END) for d in rungs[:-1]]
+    return out + [(prescreen.START, prescreen.TRAINING_END, prescreen.TODAY)]
+
+
+def bar_days(window: tuple[date, date, date]) -> int:
+    """Trading days one back-test simulates over `window`."""
+    start, _, end = window
+    return int(np.busday_count(start, end + timedelta(days=1)))
+
+
+def n_keep(n: int, eta: float = ETA, floor: int = MIN_KEEP) -> int:
+    return min(n, max(floor, math.ceil(n / eta)))
+
+
+def window_params(window: tuple[date, date, date], final: bool) -> dict[str, str]:
+    """params.json overrides for a rung; the final rung uses main.py's defaults."""
+    if final:
+        return {}
+    start, training_end, end = window
+    return {"START_DATE": start.isoformat(), "END_DATE": end.isoformat(),
+            "TRAINING_END": training_end.isoformat()}
+
+
+def cost_report(sizes: list[int], ladder: list[tuple[date, date, date]]) -> dict:
+    spent = sum(n * bar_days(w) for n, w in zip(sizes, ladder))
+    flat = sizes[0] * bar_days(ladder[-1]) if sizes else 0
+    return {"rungs": [{"window": [w[0].isoformat(), w[2].isoformat()], "children": n,
+                       "barDays": n * bar_days(w)} for n, w in zip(sizes, ladder)],
+            "barDays": spent, "flatBarDays": flat,
+            "saving": round(1 - spent / flat, 4) if flat else 0.0}
+
+
+def print_report(report: dict) -> None:
+    for r, rung in enumerate(report["rungs"]):
+        print(f"  🪜  rung {r}: {rung['children']:>5} × {rung['window'][0]} → "
+              f"{rung['window'][1]}  = {rung['barDays']:,} bar-days")
+    print(f"📉  {report['barDays']:,} bar-days vs {report['flatBarDays']:,} flat "
+          f"({report['saving']:.0%} saved)")
+
+
+def _cull(entries: list[pathlib.Path], culled: pathlib.Path) -> None:
+    culled.mkdir(exist_ok=True)
+    for src in entries:
+        target = culled / src.name
+        if target.exists():
+            shutil.rmtree(target) if target.is_dir() else target.unlink()
+        shutil.move(str(src), target)
+
+
+# ── local ladder ───────────────────────────────────────────────────────────
+def local(params: list[dict], ladder: list[tuple[date, date, date]],
+          eta: float = ETA) -> tuple[np.ndarray, np.ndarray, list[int]]:
+    """Run the whole ladder locally → (survivor indices, their final fitness,
+    children per rung). Children prescreen can't replay are dropped."""
+    by_symbol: dict[str, list[int]] = {}
+    for i, p in enumerate(params):
+        if p.get("STRATEGY_MODULE", prescreen.STRATEGY) == prescreen.STRATEGY:
+            by_symbol.setdefault(p.get("SYMBOL", "SPY"), []).append(i)
+    fast = np.array([int(p.get("FAST_PERIOD", 0)) for p in params])
+    slow = np.array([int(p.get("SLOW_PERIOD", 0)) for p in params])
+
+    # EMAs are computed once over all bars; each rung only re-slices the window
+    tables: dict[str, tuple] = {}
+    for symbol, rows in by_symbol.items():
+        try:
+            dates, close = prescreen.load_daily_bars(symbol)
+        except (FileNotFoundError, KeyError, ValueError) as exc:
+            print(f"⚠️  no daily bars for {symbol} ({exc}); dropping its children")
+            continue
+        periods = np.unique(np.concatenate([fast[rows], slow[rows]]))
+        tables[symbol] = (dates, close, periods, prescreen.ema_table(close, periods))
+
+    alive = np.array([i for s in tables for i in by_symbol[s]], dtype=np.int64)
+    symbol_of = np.array([p.get("SYMBOL", "SPY") for p in params])
+    sizes, scores = [], np.full(len(params), np.nan)
+    for r, (start, training_end, end) in enumerate(ladder):
+        sizes.append(alive.size)
+        for symbol, (dates, close, periods, table) in tables.items():
+            rows = alive[symbol_of[alive] == symbol]
+            if not rows.size:
+                continue
+            stats = prescreen.simulate(dates, close,
+                                       table[np.searchsorted(periods, fast[rows])],
+                                       table[np.searchsorted(periods, slow[rows])],
+                                       start, training_end, end)
+            scores[rows] = prescreen.fitness(stats)
+        ranked = alive[np.argsort(-scores[alive], kind="stable")]
+        if r < len(ladder) - 1:
+            alive = ranked[:n_keep(ranked.size, eta)]
+        else:
+            alive = ranked
+    return alive, scores[alive], sizes
+
+
+# ── cloud steps ────────────────────────────────────────────────────────────
+def start(children: pathlib.Path, culled: pathlib.Path, ladder: list, budget: int | None) -> dict:
+    entries = prescreen.discover(children)
+    if budget and len(entries) > budget:
+        _cull([e for e, _ in entries[budget:]], culled)
+        entries = entries[:budget]
+    for _, p in entries:
+        params = {k: v for k, v in json.loads(p.read_text()).items() if k not in WINDOW_KEYS}
+        p.write_text(json.dumps({**params, **window_params(ladder[0], len(ladder) == 1)}, indent=2))
+    return {"rung": 0, "sizes": [len(entries)]}
+
+
+def promote(children: pathlib.Path, culled: pathlib.Path, ladder: list, state: dict,
+            eta: float = ETA, backtests: pathlib.Path = BACKTESTS_FILE) -> dict:
+    """Score the current rung's stored results, cull, write the next window."""
+    import result_store
+    from fitness import extract_statistics, metrics, score
+    rung = state["rung"]
+    if rung >= len(ladder) - 1:
+        print("🏁  Final rung already reached; nothing to promote.")
+        return state
+    entries = prescreen.discover(children)
+    names = {entry: entry.name.removesuffix(".json") for entry, _ in entries}
+    results = result_store.result_dirs(children, names.values(), backtests)
+    scored = []
+    for entry, _ in entries:
+        result_dir = results.get(names[entry])
+        summary = result_store.summary(result_dir) if result_dir else None
+        if not summary:
+            continue
+        scored.append((score(metrics(extract_statistics(summary))), entry))
+    if not scored:
+        sys.exit("❌ No results for this rung – run and wait for the back-tests first.")
+
+    scored.sort(key=lambda t: -t[0])
+    keep = {e for _, e in scored[:n_keep(len(scored), eta)]}
+    params_files = dict(entries)
+    _cull([e for e, _ in entries if e not in keep], culled)
+    nxt = rung + 1
+    for result_dir in results.values():             # next rung must not see this rung's results
+        result_store.remove(result_dir)
+        if result_dir not in names:
+            shutil.rmtree(result_dir, ignore_errors=True)
+    for entry in keep:
+        p = params_files[entry]
+        params = {k: v for k, v in json.loads(p.read_text()).items() if k not in WINDOW_KEYS}
+        p.write_text(json.dumps({**params, **window_params(ladder[nxt], nxt == len(ladder) - 1)},
+                                indent=2))
+    print(f"🪜  rung {rung}: {len(scored)} scored → promoting {len(keep)} to rung {nxt}")
+    return {"rung": nxt, "sizes": state["sizes"] + [len(keep)]}
+
+
+def main(argv: list[str]):
+    ap = argparse.ArgumentParser()
+    ap.add_argument("cmd", nargs="?", default="local", choices=("local", "start", "promote"))
+    ap.add_argument("--children", default="children")
+    ap.add_argument("--culled", default="culled")
+    ap.add_argument("--eta", type=float, default=ETA)
+    ap.add_argument("--budget", type=int, default=BUDGET)
+    args = ap.parse_args(argv)
+
+    if sorted(RUNGS) != RUNGS:
+        sys.exit(f"❌ HALVING_RUNGS must be ascending, got {RUNGS}")
+    children, culled = ROOT / args.children, ROOT / args.culled
+    ladder = windows()
+
+    if args.cmd == "local":
+        entries = prescreen.discover(children)[:args.budget]
+        params = [json.load(open(p)) for _, p in entries]
+        survivors, scores, sizes = local(params, ladder, args.eta)
+        report = cost_report(sizes, ladder)
+        report["survivors"] = {entries[i][0].stem: round(float(s), 6)
+                               for i, s in zip(survivors, scores)}
+        OUT_FILE.write_text(json.dumps(report, indent=2))
+        print_report(report)
+        print(f"🏁  {len(survivors)} survivors written to {OUT_FILE.name}")
+        return
+
+    if args.cmd == "start":
+        state = start(children, culled, ladder, args.budget)
+        print(f"🪜  rung 0: {state['sizes'][0]} children on {ladder[0][0]} → {ladder[0][2]}")
+    else:
+        state = promote(children, culled, ladder, json.loads(STATE_FILE.read_text()), args.eta)
+        if state["rung"] == len(ladder) - 1:
+            print_report(cost_report(state["sizes"], ladder))
+    STATE_FILE.write_text(json.dumps(state, indent=2))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Island-model GA: M sub-populations evolving concurrently, with migration.
+
+The CI loop (algo_gen → back-test → selector → next parent) evolves one
+population a generation at a time. Here every island keeps its own parent
+set and mutation settings and runs its own (μ + λ) loop; every
+MIGRATE_EVERY generations each island sends its MIGRANTS best individuals
+to the next island on a ring and replaces its worst with whatever arrived.
+Islands exchange migrants only through a MigrationStore, so they can be
+processes on one host or separate machines:
+
+    FileStore   <MIGRATION_DIR>/to_<island>/gen<g>_from_<src>.json, written
+                tmp + rename, so a directory shared between hosts is enough
+    QueueStore  one multiprocessing queue per island, for a single host
+
+An island waits at most MIGRATION_TIMEOUT seconds for its migrants and
+carries on without them, so a slow or lost island never stalls the rest.
+Islands started by hand on several nodes should share a fresh
+MIGRATION_DIR per run (`run` clears its own).
+Children are scored with prescreen's local simulator (fitness = sharpe −
+2·drawdown); at the end the best individuals across all islands go to
+survivors.json, which algo_gen.py breeds the next cloud batch from.
+
+Usage:
+    python islands.py run [--islands M] [--store DIR|queue]   # all islands here
+    python islands.py island --id I [--islands M] [--store DIR]  # one island (e.g. on another node)
+
+Env vars:
+    ISLANDS            – number of islands M (default 4)
+    ISLAND_GENERATIONS – generations per island (default 20)
+    ISLAND_POP         – individuals per island (default 32)
+    ISLAND_RATES       – mutation rates, cycled over islands (default "0.2,0.4,0.6")
+    ISLAND_MODES       – mutation modes, cycled (default "uniform,gauss")
+    ISLAND_SEED        – base RNG seed; island i uses seed + i (default 0)
+    MIGRATE_EVERY      – generations between migrations k (default 5)
+    MIGRANTS           – individuals sent per migration (default 2)
+    MIGRATION_DIR      – FileStore root (default ./.islands)
+    MIGRATION_TIMEOUT  – seconds to wait for incoming migrants (default 60)
+    NUM_SURVIVORS      – individuals written to survivors.json (default 2)
+"""
+
+from __future__ import annotations
+import argparse, json, multiprocessing, os, pathlib, queue, sys, time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+
+import prescreen, ranking
+from genome import Genome, MUTATION_RATE
+
+ROOT          = pathlib.Path(__file__).resolve().parent
+GENOME        = Genome.load(ROOT / "parameter_schema.json")
+ISLANDS       = int(os.getenv("ISLANDS", 4))
+GENERATIONS   = int(os.getenv("ISLAND_GENERATIONS", 20))
+POP           = int(os.getenv("ISLAND_POP", 32))
+RATES         = [float(r) for r in os.getenv("ISLAND_RATES", "0.2,0.4,0.6").split(",")]
+MODES         = os.getenv("ISLAND_MODES", "uniform,gauss").split(",")
+SEED          = int(os.getenv("ISLAND_SEED", 0))
+MIGRATE_EVERY = int(os.getenv("MIGRATE_EVERY", 5))
+MIGRANTS      = int(os.getenv("MIGRANTS", 2))
+MIGRATION_DIR = pathlib.Path(os.getenv("MIGRATION_DIR", ROOT / ".islands"))
+TIMEOUT       = float(os.getenv("MIGRATION_TIMEOUT", 60))
+NUM_SURVIVORS = int(os.getenv("NUM_SURVIVORS", 2))
+POLL          = 0.2               # FileStore directory poll interval, seconds
+
+
+@dataclass(frozen=True)
+class IslandConfig:
+    id: int
+    rate: float = MUTATION_RATE
+    mode: str = "uniform"
+    sigma: float = 0.15
+    seed: int = 0
+
+    @classmethod
+    def default(cls, island: int) -> "IslandConfig":
+        return cls(island, RATES[island % len(RATES)], MODES[island % len(MODES)],
+                   seed=SEED + island)
+
+
+# ── migration stores ───────────────────────────────────────────────────────
+class FileStore:
+    """Migrants as JSON files under a (possibly shared) directory."""
+
+    def __init__(self, root: pathlib.Path = MIGRATION_DIR):
+        self.root = pathlib.Path(root)
+
+    def send(self, src: int, dest: int, generation: int, migrants: list[dict]) -> None:
+        box = self.root / f"to_{dest}"
+        box.mkdir(parents=True, exist_ok=True)
+        tmp = box / f".gen{generation}_from_{src}.{os.getpid()}"
+        tmp.write_text(json.dumps(migrants))
+        tmp.rename(box / f"gen{generation}_from_{src}.json")
+
+    def receive(self, island: int, generation: int, timeout: float = TIMEOUT) -> list[dict]:
+        box = self.root / f"to_{island}"
+        deadline = time.monotonic() + timeout
+        while True:
+            found = sorted(box.glob(f"gen{generation}_from_*.json"))
+            if found or time.monotonic() >= deadline:
+                return [m for f in found for m in json.loads(f.read_text())]
+            time.sleep(POLL)
+
+
+class QueueStore:
+    """One inbox queue per island; picklable into pool workers via a Manager."""
+
+    def __init__(self, n: int, manager=None):
+        make = manager.Queue if manager is not None else multiprocessing.Queue
+        self.inboxes = [make() for _ in range(n)]
+        self.pending: dict[int, list] = {}         # per-process: early arrivals
+
+    def send(self, src: int, dest: int, generation: int, migrants: list[dict]) -> None:
+        self.inboxes[dest].put((generation, src, migrants))
+
+    def receive(self, island: int, generation: int, timeout: float = TIMEOUT) -> list[dict]:
+        held = self.pending.setdefault(island, [])
+        deadline = time.monotonic() + timeout
+        while not any(g == generation for g, _, _ in held):
+            try:
+                held.append(self.inboxes[island].get(timeout=max(0.0, deadline - time.monotonic())))
+            except queue.Empty:
+                break
+        now = [m for g, _, ms in held if g == generation for m in ms]
+        self.pending[island] = [h for h in held if h[0] > generation]
+        return now
+
+
+# ── one island ─────────────────────────────────────────────────────────────
+class Evaluator:
+    """prescreen fitness with a per-island cache keyed on the genome hash."""
+
+    def __init__(self, base: dict):
+        self.base, self.cache = base, {}
+
+    def __call__(self, pop: np.ndarray) -> np.ndarray:
+        keys = GENOME.hash(pop).tolist()
+        todo = [i for i, k in enumerate(keys) if k not in self.cache]
+        if todo:
+            params = [{**self.base, **p} for p in GENOME.to_dicts(pop[todo])]
+            for i, f in zip(todo, prescreen.evaluate(params)):
+                self.cache[keys[i]] = f
+        return np.array([self.cache[k] for k in keys], dtype=float)
+
+
+def _best(pop: np.ndarray, fit: np.ndarray, n: int) -> tuple[np.ndarray, np.ndarray]:
+    order = np.argsort(-np.nan_to_num(fit, nan=-np.inf), kind="stable")[:n]
+    return pop[order], fit[order]
+
+
+def run_island(cfg: IslandConfig, store, n_islands: int, parents: list[dict],
+               generations: int = GENERATIONS, pop_size: int = POP,
+               migrate_every: int = MIGRATE_EVERY, migrants: int = MIGRANTS,
+               timeout: float = TIMEOUT) -> dict:
+    """Evolve one island; returns its final population and fitness history."""
+    rng = np.random.default_rng(cfg.seed)
+    base = parents[0] if parents else {}
+    evaluate = Evaluator(base)
+    pop = GENOME.unique(np.concatenate([GENOME.from_dicts(parents) if parents
+                                        else np.empty(0, GENOME.dtype),
+                                        GENOME.sample(pop_size, rng)]))[:pop_size]
+    fit = evaluate(pop)
+    history = []
+    for g in range(1, generations + 1):
+        kids = GENOME.breed(pop, pop_size, rng, rate=cfg.rate, mode=cfg.mode, sigma=cfg.sigma)
+        pool = GENOME.unique(np.concatenate([pop, kids]))
+        pop, fit = _best(pool, evaluate(pool), pop_size)
+
+        if n_islands > 1 and g % migrate_every == 0:
+            out, out_fit = _best(pop, fit, migrants)
+            store.send(cfg.id, (cfg.id + 1) % n_islands, g,
+                       [{"params": p, "fitness": float(f)}
+                        for p, f in zip(GENOME.to_dicts(out), out_fit)])
+            incoming = store.receive(cfg.id, g, timeout)
+            if incoming:
+                arrivals = GENOME.from_dicts([m["params"] for m in incoming])
+                arrivals = arrivals[~np.isin(GENOME.hash(arrivals), GENOME.hash(pop))]
+                if arrivals.size:                   # migrants replace the worst
+                    pop = np.concatenate([pop[:pop_size - arrivals.size], arrivals])
+                    pop, fit = _best(pop, evaluate(pop), pop_size)
+            print(f"🏝️  island {cfg.id} gen {g}: sent {len(out)}, received {len(incoming)}")
+        history.append(float(np.nanmax(fit)) if np.isfinite(fit).any() else None)
+
+    return {"island": cfg.id, "rate": cfg.rate, "mode": cfg.mode, "history": history,
+            "population": [{"params": {**base, **p}, "fitness": None if np.isnan(f) else float(f)}
+                           for p, f in zip(GENOME.to_dicts(pop), fit)],
+            "evaluations": len(evaluate.cache)}
+
+
+# ── driver ─────────────────────────────────────────────────────────────────
+def parent_sets(n_islands: int, path: pathlib.Path = ROOT / "survivors.json") -> list[list[dict]]:
+    """survivors.json params dealt round-robin, one parent set per island."""
+    from algo_gen import load_parents
+    parents = load_parents(path)
+    return [parents[i::n_islands] for i in range(n_islands)]
+
+
+def _peak(history: list[float | None]) -> float:
+    return max((h for h in history if h is not None), default=float("nan"))
+
+
+def write_survivors(results: list[dict], k: int = NUM_SURVIVORS) -> list[ranking.Candidate]:
+    pool = [ranking.Candidate(f"island{r['island']}_{i}", {"fitness": ind["fitness"]},
+                              params=ind["params"], score=ind["fitness"])
+            for r in results for i, ind in enumerate(r["population"])
+            if ind["fitness"] is not None]
+    ranked = ranking.top_k(pool, "fitness", k)
+    ranking.write_survivors(ranked)
+    return ranked
+
+
+def main(argv: list[str]):
+    ap = argparse.ArgumentParser()
+    ap.add_argument("cmd", choices=("run", "island"))
+    ap.add_argument("--islands", type=int, default=ISLANDS)
+    ap.add_argument("--id", type=int, help="island to run (island command)")
+    ap.add_argument("--generations", type=int, default=GENERATIONS)
+    ap.add_argument("--pop", type=int, default=POP)
+    ap.add_argument("--migrate-every", type=int, default=MIGRATE_EVERY)
+    ap.add_argument("--migrants", type=int, default=MIGRANTS)
+    ap.add_argument("--store", default=str(MIGRATION_DIR),
+                    help="FileStore directory, or 'queue' for in-host queues (run only)")
+    args = ap.parse_args(argv)
+
+    sets = parent_sets(args.islands)
+    opts = dict(generations=args.generations, pop_size=args.pop,
+                migrate_every=args.migrate_every, migrants=args.migrants)
+
+    if args.cmd == "island":
+        if args.id is None or args.store == "queue":
+            sys.exit("❌ island needs --id and a FileStore --store directory")
+        store = FileStore(pathlib.Path(args.store))
+        result = run_island(IslandConfig.default(args.id), store, args.islands,
+                            sets[args.id], **opts)
+        out = store.root / f"island_{args.id}.json"
+        out.write_text(json.dumps(result, indent=2))
+        print(f"🏁  island {args.id} best {_peak(result['history']):.3f} → {out}")
+        return
+
+    t0 = time.perf_counter()
+    with multiprocessing.Manager() as manager:
+        if args.store == "queue":
+            store = QueueStore(args.islands, manager)
+        else:                                       # drop migrants of a previous run
+            store = FileStore(pathlib.Path(args.store))
+            for stale in store.root.glob("to_*/*.json"):
+                stale.unlink()
+        with ProcessPoolExecutor(max_workers=args.islands) as pool:
+            futures = [pool.submit(run_island, IslandConfig.default(i), store, args.islands,
+                                   sets[i], **opts) for i in range(args.islands)]
+            results = [f.result() for f in futures]
+    elapsed = time.perf_counter() - t0
+
+    for r in results:
+        print(f"🏝️  island {r['island']} (rate {r['rate']}, {r['mode']}): best {_peak(r['history']):.3f} "
+              f"after {r['evaluations']} evaluations")
+    (ROOT / "islands.json").write_text(json.dumps(results, indent=2))
+    ranked = write_survivors(results)
+    print(f"🏆  {len(ranked)} survivors from {args.islands} islands in {elapsed:.1f}s: "
+          f"{[round(c.score, 3) for c in ranked]}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -10,14 +10,6 @@ class DynamicStrategyLoader(QCAlgorithm):
     START  = TODAY - timedelta(days=365)
 
     def Initialize(self):
-        # ----- date window -----
-        self.SetStartDate(self.START.year,  self.START.month,  self.START.day)
-        self.SetEndDate  (self.TODAY.year,  self.TODAY.month,  self.TODAY.day)
-        self.SetCash(100_000)
-
-        # Out-of-sample: final 60 days
-        self.training_end = self.TODAY - timedelta(days=60)
-
         # ----- load params.json -----
         try:
             with open("params.json") as fh:
@@ -31,6 +23,16 @@ class DynamicStrategyLoader(QCAlgorithm):
                 "SLOW_PERIOD": 100,
             }
 
+        # ----- date window (walk_forward.py folds / halving.py rungs override it via params) -----
+        start = self._param_date("START_DATE", self.START)
+        end   = self._param_date("END_DATE", self.TODAY)
+        self.SetStartDate(start.year, start.month, start.day)
+        self.SetEndDate  (end.year,   end.month,   end.day)
+        self.SetCash(100_000)
+
+        # Out-of-sample: final 60 days
+        self.training_end = self._param_date("TRAINING_END", end - timedelta(days=60))
+
         # dynamic import of the chosen strategy
         mod_name = self.params["STRATEGY_MODULE"]
         strat_mod  = importlib.import_module(f"strategies.{mod_name}")
@@ -42,6 +44,12 @@ class DynamicStrategyLoader(QCAlgorithm):
                               (DynamicStrategyLoader, strat_cls), {})
         strat_cls.Initialize(self)
 
+    def _param_date(self, key, default):
+        value = self.params.get(key)
+        if not value:
+            return default
+        return datetime.fromisoformat(value).replace(tzinfo=timezone.utc)
+
     def OnEndOfAlgorithm(self):
         oos_trades = [t for t in self.TradeBuilder.ClosedTrades
                       if t.ExitTime >= self.training_end]
@@ -8,9 +8,15 @@ Usage (from repo root):
 
 Env vars:
     MUTATION_SIGMA  - % of each value to use as std-dev (default 0.15 = ±15 %)
+
+Keys described by parameter_schema.json go through genome.py's Gaussian
+mutation (clipped to the schema range, ints kept on their grid); any other
+numeric leaf is perturbed in place as before.
 """
 import json, os, random, sys, pathlib, shutil, math, subprocess
 
+from genome import Genome
+
 SIGMA = float(os.getenv("MUTATION_SIGMA", 0.15))
 
 if len(sys.argv) != 3:
@@ -32,7 +38,16 @@ if not src_file.exists():
 with open(src_file) as f:
     params = json.load(f)
 
-# --- mutate numeric leaf values
+# --- mutate numeric schema fields as a genome, clipped to their bounds
+genome = Genome.load(pathlib.Path(__file__).resolve().parent / "parameter_schema.json")
+numeric = {k: v for k, v in params.items()
+           if genome.schema.get(k, {}).get("type") in ("int", "float")}
+schema_values = {}
+if numeric:
+    child = genome.mutate(genome.from_dicts([numeric]), rate=1.0, mode="gauss", sigma=SIGMA)
+    schema_values = {k: v for k, v in genome.to_dicts(child)[0].items() if k in numeric}
+
+# --- mutate remaining numeric leaf values
 def mutate(val):
     if isinstance(val, (int, float)):
         delta = random.gauss(0, SIGMA) * val
@@ -47,6 +62,7 @@ def walk(obj):
     return mutate(obj)
 
 mutated = walk(params)
+mutated.update(schema_values)
 
 # --- write to child folder
 with open(child_path / "parameters.json", "w") as f:
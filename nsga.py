@@ -0,0 +1,130 @@
+"""
+NSGA-II non-dominated sorting and crowding distance, vectorised with numpy.
+
+Ranks a population on several objectives at once instead of collapsing
+them into one scalar, so trade-offs (high Sharpe vs. low drawdown vs. OOS
+profit) survive selection rather than being rediscovered generation after
+generation. Every objective is maximised; pass minimised ones negated.
+
+    F = objectives(candidates)          # (N, M) float array
+    ranks = non_dominated_sort(F)       # 0 = Pareto front
+    keep = select(F, k)                 # NSGA-II survivor indices
+
+The domination matrix is built in row blocks and stored bit-packed
+(N × N/8 bytes, 12.5 MB for N=10k), so archives of 10k results sort in a
+fraction of a second.
+"""
+
+from __future__ import annotations
+import numpy as np
+
+# metric name → sign (+1 maximise, −1 minimise)
+OBJECTIVES = {"sharpeRatio": 1.0, "drawdown": -1.0, "oosNetProfit": 1.0}
+BLOCK = 1024
+
+
+def objectives(candidates, spec: dict[str, float] = OBJECTIVES) -> np.ndarray:
+    """(N, M) maximisation matrix from candidates' typed metrics."""
+    F = np.array([[c.metrics.get(name, np.nan) for name in spec] for c in candidates],
+                 dtype=float).reshape(-1, len(spec))
+    return F * np.fromiter(spec.values(), float)
+
+
+def _fill_missing(F: np.ndarray) -> np.ndarray:
+    """Replace NaN (missing metric) with a value worse than any observed one."""
+    F = np.asarray(F, dtype=float)
+    if not np.isnan(F).any():
+        return F
+    low = np.where(np.isnan(F), np.inf, F).min(axis=0)
+    floor = np.where(np.isfinite(low), low, 0.0) - 1.0
+    return np.where(np.isnan(F), floor, F)
+
+
+def dominated_by(F: np.ndarray) -> np.ndarray:
+    """Packed bits D[j] with bit i set when solution i dominates solution j."""
+    n, m = F.shape
+    cols = [np.ascontiguousarray(F[:, k]) for k in range(m)]
+    D = np.empty((n, (n + 7) // 8), np.uint8)
+    for lo in range(0, n, BLOCK):
+        hi = min(lo + BLOCK, n)
+        ge = np.ones((hi - lo, n), bool)              # i no worse than j everywhere
+        gt = np.zeros((hi - lo, n), bool)             # … and strictly better somewhere
+        for col in cols:                              # 2-D per objective beats 3-D reductions
+            row = col[None, :]
+            fj = col[lo:hi, None]
+            ge &= row >= fj
+            gt |= row > fj
+        D[lo:hi] = np.packbits(ge & gt, axis=1)
+    return D
+
+
+def non_dominated_sort(F: np.ndarray, stop_after: int | None = None) -> np.ndarray:
+    """Front index per solution (0 = Pareto front); −1 where never reached.
+
+    `stop_after` ends the peeling once that many solutions are ranked, which
+    is all survivor selection needs.
+    """
+    F = _fill_missing(F)                              # missing metrics rank last
+    n = len(F)
+    ranks = np.full(n, -1, dtype=np.int64)
+    if n == 0:
+        return ranks
+    D = dominated_by(F)
+    alive = np.packbits(np.ones(n, bool))            # unranked solutions as dominators
+    remaining = np.arange(n)
+    front = 0
+    while remaining.size:
+        blocked = (D[remaining] & alive).any(axis=1)
+        current = remaining[~blocked]
+        ranks[current] = front
+        bits = np.unpackbits(alive, count=n).astype(bool)
+        bits[current] = False
+        alive = np.packbits(bits)
+        remaining = remaining[blocked]
+        front += 1
+        if stop_after is not None and n - remaining.size >= stop_after:
+            break
+    return ranks
+
+
+def crowding_distance(F: np.ndarray) -> np.ndarray:
+    """Crowding distance of each row within one front (boundaries get inf)."""
+    n, m = F.shape
+    dist = np.zeros(n)
+    if n <= 2:
+        dist[:] = np.inf
+        return dist
+    order = np.argsort(F, axis=0, kind="stable")
+    sorted_f = np.take_along_axis(F, order, axis=0)
+    span = sorted_f[-1] - sorted_f[0]
+    span[span == 0] = 1.0
+    gaps = (sorted_f[2:] - sorted_f[:-2]) / span
+    for k in range(m):
+        dist[order[1:-1, k]] += gaps[:, k]
+        dist[order[[0, -1], k]] = np.inf
+    return dist
+
+
+def select(F: np.ndarray, k: int, ranks: np.ndarray | None = None) -> np.ndarray:
+    """Indices of k survivors: whole fronts first, crowding breaks the last one.
+
+    Pass `ranks` from non_dominated_sort(F, stop_after=k) to reuse a sort.
+    """
+    F = _fill_missing(F)
+    k = min(k, len(F))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if ranks is None:
+        ranks = non_dominated_sort(F, stop_after=k)
+    keep: list[np.ndarray] = []
+    taken = 0
+    for front in range(ranks.max() + 1):
+        idx = np.flatnonzero(ranks == front)
+        if taken + idx.size > k:
+            crowd = crowding_distance(F[idx])
+            idx = idx[np.argsort(-crowd, kind="stable")[:k - taken]]
+        keep.append(idx)
+        taken += idx.size
+        if taken >= k:
+            break
+    return np.concatenate(keep)
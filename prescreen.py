@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Local NumPy pre-screen for ema_cross_strategy children.
+
+Replays the EMA fast/slow cross-over of strategies/ema_cross_strategy.py on
+cached Lean daily bars, using the same window as main.py (one year ending
+DynamicStrategyLoader.TODAY, trading frozen for the final 60 OOS days).
+Every child is scored in one vectorised pass; anything outside the top
+KEEP_FRACTION is moved to culled/ so only promising children reach
+run_backtest.py / scripts/run_parallel_backtests.py.
+
+Env vars:
+    LEAN_DATA_DIR   – Lean data root (default ./data)
+    BAR_STORE_DIR   – memory-mapped bar cache (default ./.bars, see bar_store.py)
+    PRESCREEN_KEEP  – fraction of scored children to forward (default 0.25)
+    COST_BPS        – round-trip cost per position change in bps (default 1)
+"""
+
+from __future__ import annotations
+import argparse, json, os, pathlib, shutil, sys
+from datetime import date, timedelta
+
+import numpy as np
+
+import bar_store, telemetry
+
+ROOT      = pathlib.Path(__file__).resolve().parent
+DATA_DIR  = pathlib.Path(os.getenv("LEAN_DATA_DIR", ROOT / "data"))
+KEEP      = float(os.getenv("PRESCREEN_KEEP", 0.25))
+COST_BPS  = float(os.getenv("COST_BPS", 1.0))
+CASH      = 100_000
+
+# mirror DynamicStrategyLoader in main.py
+TODAY        = date(2025, 7, 4)
+START        = TODAY - timedelta(days=365)
+TRAINING_END = TODAY - timedelta(days=60)
+
+STRATEGY = "ema_cross_strategy"
+SCORES_FILE = ROOT / "prescreen.json"
+
+
+# ── data ───────────────────────────────────────────────────────────────────
+def load_daily_bars(symbol: str) -> tuple[np.ndarray, np.ndarray]:
+    """Return (dates as datetime64[D], close) – mmap views from bar_store."""
+    b = bar_store.bars(symbol, data_dir=DATA_DIR)
+    return b.dates, b.close
+
+
+# ── indicators ─────────────────────────────────────────────────────────────
+def ema_table(close: np.ndarray, periods: np.ndarray) -> np.ndarray:
+    """EMA for every period at once → shape (len(periods), T).
+
+    Seeded with the SMA of the first `period` bars like Lean's EMA; values
+    before the indicator is ready are NaN.
+    """
+    periods = np.asarray(periods, dtype=np.int64)
+    T = close.shape[0]
+    out = np.full((periods.size, T), np.nan)
+    k = 2.0 / (periods + 1.0)
+    csum = np.concatenate(([0.0], np.cumsum(close)))
+    cur = np.full(periods.size, np.nan)
+    for t in range(T):
+        seed = periods == t + 1
+        if seed.any():
+            cur[seed] = csum[t + 1] / periods[seed]
+        live = periods < t + 1
+        cur[live] = close[t] * k[live] + cur[live] * (1.0 - k[live])
+        out[:, t] = cur
+    return out
+
+
+# ── simulation ─────────────────────────────────────────────────────────────
+def simulate(dates: np.ndarray, close: np.ndarray,
+             fast_ema: np.ndarray, slow_ema: np.ndarray,
+             start=START, training_end=TRAINING_END, end=TODAY) -> dict[str, np.ndarray]:
+    """Vectorised cross-over back-test for N parameter sets.
+
+    fast_ema / slow_ema are (N, T) rows aligned with `dates`. Orders are
+    placed on the bar close and earn the following bar's return; new
+    signals are ignored from `training_end` onward (the OOS window).
+    Returns per-row arrays of Lean-style statistics.
+    """
+    start, training_end, end = (np.datetime64(x, "D") for x in (start, training_end, end))
+    in_window = (dates >= start) & (dates <= end)
+    dates, close = dates[in_window], close[in_window]
+    fast_ema, slow_ema = fast_ema[:, in_window], slow_ema[:, in_window]
+
+    # +1 → go long, -1 → liquidate, 0 → keep the current state
+    signal = np.sign(fast_ema - slow_ema)
+    signal[np.isnan(signal)] = 0
+    signal[:, dates >= training_end] = 0
+
+    # forward-fill the last non-zero signal → position held after each close
+    T = dates.size
+    idx = np.where(signal != 0, np.arange(T), -1)
+    np.maximum.accumulate(idx, axis=1, out=idx)
+    last = np.take_along_axis(signal, np.maximum(idx, 0), axis=1)
+    pos = np.where(idx >= 0, last > 0, False).astype(np.float64)
+
+    rets = np.zeros(T)
+    rets[1:] = close[1:] / close[:-1] - 1.0
+    held = np.zeros_like(pos)
+    held[:, 1:] = pos[:, :-1]
+    turnover = np.abs(np.diff(held, axis=1, prepend=0.0))
+    daily = held * rets - turnover * COST_BPS / 10_000.0
+
+    equity = CASH * np.cumprod(1.0 + daily, axis=1)
+    peak = np.maximum.accumulate(equity, axis=1)
+    drawdown = (1.0 - equity / peak).max(axis=1)
+    split = max(np.searchsorted(dates, training_end) - 1, 0)
+    return {
+        "sharpeRatio": _sharpe(daily[:, 1:]),
+        "drawdown": drawdown,
+        "netProfit": equity[:, -1] / CASH - 1.0,
+        "isSharpeRatio": _sharpe(daily[:, 1:split + 1]),
+        "isNetProfit": equity[:, split] / CASH - 1.0,
+        "oosNetProfit": equity[:, -1] - equity[:, split],
+        "trades": (turnover > 0).sum(axis=1) // 2,
+    }
+
+
+def _sharpe(daily: np.ndarray) -> np.ndarray:
+    """Annualised Sharpe of each row of daily returns (0 where flat)."""
+    if daily.shape[1] == 0:
+        return np.zeros(daily.shape[0])
+    std = daily.std(axis=1)
+    return np.divide(daily.mean(axis=1) * np.sqrt(252), std,
+                     out=np.zeros_like(std), where=std > 0)
+
+
+def fitness(stats: dict[str, np.ndarray]) -> np.ndarray:
+    """Same objective as score_population.py: sharpe − 2·drawdown."""
+    return stats["sharpeRatio"] - 2.0 * stats["drawdown"]
+
+
+def evaluate(params: list[dict]) -> np.ndarray:
+    """Fitness for each params dict; NaN where the child can't be screened."""
+    scores = np.full(len(params), np.nan)
+    by_symbol: dict[str, list[int]] = {}
+    for i, p in enumerate(params):
+        if p.get("STRATEGY_MODULE", STRATEGY) == STRATEGY:
+            by_symbol.setdefault(p.get("SYMBOL", "SPY"), []).append(i)
+
+    for symbol, rows in by_symbol.items():
+        try:
+            dates, close = load_daily_bars(symbol)
+        except (FileNotFoundError, KeyError, ValueError) as exc:
+            print(f"⚠️  no daily bars for {symbol} ({exc}); passing through")
+            continue
+        fast = np.array([int(params[i]["FAST_PERIOD"]) for i in rows])
+        slow = np.array([int(params[i]["SLOW_PERIOD"]) for i in rows])
+        periods, inv = np.unique(np.concatenate([fast, slow]), return_inverse=True)
+        table = ema_table(close, periods)
+        stats = simulate(dates, close, table[inv[:len(rows)]], table[inv[len(rows):]])
+        scores[rows] = fitness(stats)
+    return scores
+
+
+# ── children ───────────────────────────────────────────────────────────────
+def discover(children: pathlib.Path) -> list[tuple[pathlib.Path, pathlib.Path]]:
+    """(entry to move, params file) for both algo_gen dirs and evaluate.py files."""
+    found = []
+    for entry in sorted(children.iterdir()):
+        if entry.is_dir() and (entry / "params.json").exists():
+            found.append((entry, entry / "params.json"))
+        elif entry.suffix == ".json":
+            found.append((entry, entry))
+    return found
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--children", default="children")
+    ap.add_argument("--keep", type=float, default=KEEP)
+    ap.add_argument("--culled", default="culled")
+    ap.add_argument("--dry-run", action="store_true")
+    args = ap.parse_args()
+
+    children = ROOT / args.children
+    entries = discover(children)
+    if not entries:
+        print("🤷 No children to pre-screen.")
+        return
+
+    params = [json.load(open(p)) for _, p in entries]
+    with telemetry.span("simulate"):
+        scores = evaluate(params)
+    scored = np.flatnonzero(~np.isnan(scores))
+    n_keep = max(1, int(np.ceil(args.keep * scored.size))) if scored.size else 0
+    ranked = scored[np.argsort(-scores[scored], kind="stable")]
+    culled = ranked[n_keep:]
+
+    SCORES_FILE.write_text(json.dumps(
+        {entries[i][0].stem: round(float(scores[i]), 6) for i in ranked}, indent=2))
+    print(f"🔬  Scored {scored.size}/{len(entries)} children; forwarding "
+          f"{len(entries) - culled.size}, culling {culled.size}")
+
+    if args.dry_run or not culled.size:
+        return
+    dest = ROOT / args.culled
+    dest.mkdir(exist_ok=True)
+    for i in culled:
+        src = entries[i][0]
+        target = dest / src.name
+        if target.exists():
+            shutil.rmtree(target) if target.is_dir() else target.unlink()
+        shutil.move(str(src), target)
+        print(f"  ✂️  {src.name}  fitness={scores[i]:.3f}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,204 @@
+"""
+Shared QuantConnect REST client.
+
+One keep-alive connection pool per process, the timestamp + sha256
+signature reused within the same second, a thread-safe token-bucket rate
+limiter and jittered exponential retry on 429 / 5xx / any requests
+exception (connection, timeout, truncated body, …). Whatever still fails
+surfaces as QCApiError, the one exception callers handle.
+Latency and retry counters live on the client; `report()` prints them.
+Every request is also recorded in telemetry.py (latency histogram, retries,
+failures and bytes downloaded per endpoint).
+
+read_backtest() reads through response_cache: a completed back-test is
+fetched from the network once and served from disk afterwards.
+
+Env vars:
+    QC_USER_ID, QC_API_TOKEN – credentials
+    QC_API_URL               – API root (default https://www.quantconnect.com/api/v2)
+    QC_RATE_LIMIT            – max requests per second  (default 8)
+    QC_POOL_SIZE             – pooled connections       (default 32)
+    QC_MAX_RETRIES           – retries per request      (default 5)
+"""
+
+from __future__ import annotations
+import hashlib, os, random, threading, time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import telemetry
+from response_cache import ResponseCache, default_cache
+
+QC_API_URL  = os.getenv("QC_API_URL", "https://www.quantconnect.com/api/v2")
+RATE_LIMIT  = float(os.getenv("QC_RATE_LIMIT", 8))
+POOL_SIZE   = int(os.getenv("QC_POOL_SIZE", 32))
+MAX_RETRIES = int(os.getenv("QC_MAX_RETRIES", 5))
+TIMEOUT     = 30
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class QCApiError(RuntimeError):
+    """Raised when the API keeps failing or answers success: false."""
+
+
+class RateLimiter:
+    """Blocking token bucket shared by every thread using the client."""
+
+    def __init__(self, rate: float, burst: float | None = None):
+        self.rate, self.capacity = rate, burst or max(1.0, rate)
+        self.tokens, self.stamp = self.capacity, time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.stamp) * self.rate)
+                self.stamp = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class QCClient:
+    def __init__(self, user_id: str | None = None, api_token: str | None = None,
+                 base_url: str = QC_API_URL, rate: float = RATE_LIMIT,
+                 pool_size: int = POOL_SIZE, max_retries: int = MAX_RETRIES,
+                 cache: ResponseCache | None = None):
+        self.user_id   = user_id or os.environ["QC_USER_ID"]
+        self.api_token = api_token or os.environ["QC_API_TOKEN"]
+        self.base_url  = base_url.rstrip("/")
+        self.max_retries = max_retries
+        self.limiter = RateLimiter(rate)
+        self.cache = cache if cache is not None else default_cache()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers["Accept"] = "application/json"
+
+        self._sig_lock = threading.Lock()
+        self._sig: tuple[str, str] = ("", "")
+        self._stats_lock = threading.Lock()
+        self.requests = self.retries = self.failures = 0
+        self.latency_total = self.latency_max = 0.0
+
+    # ── auth ──────────────────────────────────────────────────────────────
+    def _signature(self) -> tuple[str, str]:
+        """(timestamp, sha256(token:timestamp)) – recomputed once per second."""
+        timestamp = str(int(time.time()))
+        with self._sig_lock:
+            if self._sig[0] != timestamp:
+                digest = hashlib.sha256(f"{self.api_token}:{timestamp}".encode()).hexdigest()
+                self._sig = (timestamp, digest)
+            return self._sig
+
+    # ── transport ─────────────────────────────────────────────────────────
+    def post(self, endpoint: str, payload: dict | None = None) -> dict:
+        """POST to /<endpoint>, retrying transient failures; returns the JSON body."""
+        url = f"{self.base_url}/{endpoint.lstrip('/')}"
+        for attempt in range(self.max_retries + 1):
+            self.limiter.acquire()
+            timestamp, signature = self._signature()
+            started = time.monotonic()
+            retry_after = None
+            try:
+                resp = self.session.post(url, json=payload or {}, timeout=TIMEOUT,
+                                         headers={"Timestamp": timestamp},
+                                         auth=(self.user_id, signature))
+                error = None if resp.status_code not in RETRY_STATUS else f"HTTP {resp.status_code}"
+                retry_after = resp.headers.get("Retry-After")
+            except requests.RequestException as exc:
+                resp, error = None, f"{type(exc).__name__}: {exc}"
+            self._record(time.monotonic() - started)
+            telemetry.observe("qc_api_latency_seconds", time.monotonic() - started,
+                              endpoint=endpoint)
+
+            if error is None:
+                telemetry.count("qc_api_bytes", len(resp.content), endpoint=endpoint)
+                if resp.status_code != 200:
+                    self._count("failures")
+                    telemetry.count("qc_api_failures", endpoint=endpoint)
+                    raise QCApiError(f"{endpoint}: HTTP {resp.status_code} {resp.text[:200]}")
+                try:
+                    return resp.json()
+                except ValueError as exc:
+                    self._count("failures")
+                    telemetry.count("qc_api_failures", endpoint=endpoint)
+                    raise QCApiError(f"{endpoint}: invalid JSON ({exc}): {resp.text[:200]}") from exc
+            if attempt == self.max_retries:
+                break
+            self._count("retries")
+            telemetry.count("qc_api_retries", endpoint=endpoint)
+            delay = min(30.0, 0.5 * 2 ** attempt) * random.uniform(0.5, 1.5)
+            if retry_after and retry_after.isdigit():
+                delay = max(delay, float(retry_after))
+            time.sleep(delay)
+
+        self._count("failures")
+        telemetry.count("qc_api_failures", endpoint=endpoint)
+        raise QCApiError(f"{endpoint}: giving up after {self.max_retries} retries ({error})")
+
+    def read_backtest(self, backtest_id: str, project_id: str | None = None) -> dict:
+        """backtests/read, served from the response cache once the back-test completed."""
+        if self.cache is not None:
+            cached = self.cache.get(backtest_id)
+            if cached is not None:
+                return cached
+        payload = {"backtestId": backtest_id}
+        project_id = project_id or os.getenv("QC_PROJECT_ID")
+        if project_id:
+            payload["projectId"] = project_id
+        data = self.post("backtests/read", payload)
+        if self.cache is not None:
+            self.cache.put(backtest_id, data)
+        return data
+
+    def delete_backtest(self, backtest_id: str, project_id: str | None = None) -> dict:
+        """Cancel (and delete) a back-test; stops a running one on its node."""
+        payload = {"backtestId": backtest_id}
+        project_id = project_id or os.getenv("QC_PROJECT_ID")
+        if project_id:
+            payload["projectId"] = project_id
+        return self.post("backtests/delete", payload)
+
+    # ── counters ──────────────────────────────────────────────────────────
+    def _record(self, seconds: float) -> None:
+        with self._stats_lock:
+            self.requests += 1
+            self.latency_total += seconds
+            self.latency_max = max(self.latency_max, seconds)
+
+    def _count(self, name: str) -> None:
+        with self._stats_lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def stats(self) -> dict[str, float]:
+        mean = self.latency_total / self.requests if self.requests else 0.0
+        return {"requests": self.requests, "retries": self.retries,
+                "failures": self.failures, "latency_mean": mean,
+                "latency_max": self.latency_max}
+
+    def report(self) -> str:
+        s = self.stats()
+        line = (f"🌐  QC API: {s['requests']} requests, {s['retries']} retries, "
+                f"{s['failures']} failures, latency mean {s['latency_mean'] * 1000:.0f} ms "
+                f"/ max {s['latency_max'] * 1000:.0f} ms")
+        if self.cache is not None and self.cache.hits + self.cache.stores:
+            line += "\n" + self.cache.report()
+        return line
+
+
+_default: QCClient | None = None
+
+
+def default_client() -> QCClient:
+    """Process-wide client so every caller shares one pool and one rate limit."""
+    global _default
+    if _default is None:
+        _default = QCClient()
+    return _default
@@ -0,0 +1,243 @@
+"""
+Unified ranking engine behind every selector script.
+
+    source   → iterable of Candidates (Firestore, local warehouse, child results)
+    fitness  → pluggable scorer over the typed metrics of fitness.py
+    top_k    → bounded heap, O(k) memory however many candidates stream by
+    outputs  → one contract for champion / survivors / winners / state doc
+
+Fitness can be a registered name (see FITNESS) or an arithmetic expression
+over metric names, e.g. "sharpeRatio - 2*drawdown + oosNetProfit/1e5".
+`pareto()` is the multi-objective alternative: NSGA-II survivors over
+Sharpe, drawdown and OOS profit (see nsga.py) instead of one scalar.
+When the fitness is a field ingestion already stores (`fitness`,
+`metrics.*`) the Firestore source uses the indexed top-k query and reads
+only k documents; anything else streams the generation through the heap.
+
+Output contract (the write_* helpers):
+    champion.json       {backtestId, metric, score, statistics, params}
+    parent_params.json  champion params – algo_gen.py's default --parent
+    survivors.json      [{id, score, params}] best first
+    parents.txt         survivor ids, one per line
+    winners.json        [{id, <metric>: score}] best first
+    evolve_state/parent {winner_doc, metric, params, updatedAt} in Firestore
+"""
+
+from __future__ import annotations
+import ast, heapq, itertools, json, math, operator, pathlib
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Iterator
+
+import telemetry
+from fitness import (COLL, PROJECTION, current_generation, extract_statistics,
+                     metrics as parse_metrics, score)
+
+STATE_DOC_PATH = "evolve_state/parent"
+
+
+@dataclass
+class Candidate:
+    id: str
+    metrics: dict[str, float]
+    statistics: dict = field(default_factory=dict)
+    params: dict = field(default_factory=dict)
+    doc: dict = field(default_factory=dict)        # remaining source fields
+    score: float = -math.inf
+
+    @classmethod
+    def from_doc(cls, doc_id: str, data: dict) -> "Candidate":
+        stats = data.get("statistics") or data.get("stats") or {}
+        m = data.get("metrics") or parse_metrics(stats)
+        if "fitness" in data:
+            m = {**m, "fitness": data["fitness"]}
+        return cls(doc_id, m, stats, data.get("params") or {}, data)
+
+
+# ── fitness expressions ────────────────────────────────────────────────────
+FITNESS: dict[str, Callable[[dict[str, float]], float]] = {}
+
+
+def register(name: str):
+    def deco(fn):
+        FITNESS[name] = fn
+        return fn
+    return deco
+
+
+register("fitness")(lambda m: m["fitness"] if "fitness" in m else score(m))
+register("sharpe_dd")(score)
+register("sharpeRatio")(lambda m: m["sharpeRatio"])
+register("netProfit")(lambda m: m["netProfit"])
+register("oosNetProfit")(lambda m: m["oosNetProfit"])
+register("drawdown")(lambda m: -m["drawdown"])           # lower drawdown ranks higher
+
+_BINOPS = {ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul,
+           ast.Div: operator.truediv, ast.Pow: operator.pow}
+_FUNCS = {"abs": abs, "min": min, "max": max, "log": math.log, "sqrt": math.sqrt}
+
+
+def expression(text: str) -> Callable[[dict[str, float]], float]:
+    """Compile a whitelisted arithmetic expression over metric names."""
+    tree = ast.parse(text, mode="eval").body
+
+    def ev(node, m):
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+            return node.value
+        if isinstance(node, ast.Name):
+            return m[node.id]
+        if isinstance(node, ast.BinOp) and type(node.op) in _BINOPS:
+            return _BINOPS[type(node.op)](ev(node.left, m), ev(node.right, m))
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+            v = ev(node.operand, m)
+            return -v if isinstance(node.op, ast.USub) else v
+        if (isinstance(node, ast.Call) and isinstance(node.func, ast.Name)
+                and node.func.id in _FUNCS and not node.keywords):
+            return _FUNCS[node.func.id](*(ev(a, m) for a in node.args))
+        raise ValueError(f"unsupported fitness expression element: {ast.dump(node)}")
+
+    return lambda m: float(ev(tree, m))
+
+
+def resolve(fitness: str) -> Callable[[dict[str, float]], float]:
+    return FITNESS.get(fitness) or expression(fitness)
+
+
+def stored_field(fitness: str) -> str | None:
+    """Firestore field holding `fitness` precomputed at write time, if any."""
+    if fitness in ("fitness", "sharpe_dd"):
+        return "fitness"
+    if fitness in ("sharpeRatio", "netProfit", "oosNetProfit"):
+        return f"metrics.{fitness}"
+    return None
+
+
+# ── ranking ────────────────────────────────────────────────────────────────
+def top_k(candidates: Iterable[Candidate], fitness: str | Callable, k: int) -> list[Candidate]:
+    """Best `k` candidates, best first, holding at most k in memory."""
+    fn = resolve(fitness) if isinstance(fitness, str) else fitness
+    heap: list[tuple[float, int, Candidate]] = []
+    tie = itertools.count()
+    with telemetry.span("select", method="top_k"):
+        for cand in candidates:
+            try:
+                cand.score = fn(cand.metrics)
+            except (KeyError, ValueError, ZeroDivisionError, OverflowError):
+                continue
+            if math.isnan(cand.score):
+                continue
+            item = (cand.score, -next(tie), cand)       # earlier candidate wins ties
+            if len(heap) < k:
+                heapq.heappush(heap, item)
+            elif item[:2] > heap[0][:2]:
+                heapq.heapreplace(heap, item)
+    return [c for _, _, c in sorted(heap, key=lambda t: t[:2], reverse=True)]
+
+
+def pareto(candidates: Iterable[Candidate], k: int,
+           objectives: dict[str, float] | None = None) -> list[Candidate]:
+    """NSGA-II survivors, Pareto front first; score is −front index."""
+    import nsga
+    with telemetry.span("select", method="pareto"):
+        pool = list(candidates)
+        spec = objectives or nsga.OBJECTIVES
+        F = nsga.objectives(pool, spec)
+        ranks = nsga.non_dominated_sort(F, stop_after=k)
+        keep = nsga.select(F, k, ranks)
+    for i in keep:
+        pool[i].score = float(-int(ranks[i]))
+    return [pool[i] for i in keep]
+
+
+# ── sources ────────────────────────────────────────────────────────────────
+def firestore_source(db, generation: str | None = None, fitness: str = "fitness",
+                     k: int | None = None, fields: list[str] = PROJECTION) -> Iterator[Candidate]:
+    """Candidates of one generation; only k reads when `fitness` is stored."""
+    query = db.collection(COLL).where("generation", "==", generation or current_generation())
+    stored = stored_field(fitness)
+    if stored and k:
+        query = query.order_by(stored, direction="DESCENDING").limit(k)
+    for snap in query.select(fields).stream():
+        telemetry.count("firestore_reads")
+        yield Candidate.from_doc(snap.id, snap.to_dict())
+
+
+def warehouse_source(generation: str | None = None, fitness: str = "fitness",
+                     k: int | None = None) -> Iterator[Candidate]:
+    from warehouse import Warehouse
+    wh = Warehouse()
+    stored = stored_field(fitness)
+    gen = generation or current_generation()
+    if stored and k:
+        rows = wh.top_k(stored, k, gen)
+    else:
+        rows = wh.rows(gen)
+    for row in rows:
+        yield Candidate.from_doc(row.id, row.to_dict())
+
+
+def results_source(children: pathlib.Path) -> Iterator[Candidate]:
+    """Candidates from the child results wait_backtests.py stored (stats sidecars only)."""
+    import result_store
+    for child in sorted(children.iterdir()):
+        summary = result_store.summary(child) if child.is_dir() else None
+        if not summary:
+            continue
+        stats = extract_statistics(summary)
+        params_fn = child / "params.json"
+        params = json.loads(params_fn.read_text()) if params_fn.exists() else {}
+        yield Candidate.from_doc(child.name, {"statistics": stats, "params": params})
+
+
+def source(name: str, generation: str | None = None, fitness: str = "fitness",
+           k: int | None = None, db=None, children: pathlib.Path | None = None):
+    if name == "warehouse":
+        return warehouse_source(generation, fitness, k)
+    if name == "results":
+        return results_source(children or pathlib.Path("children"))
+    if db is None:
+        import firestore_db
+        db = firestore_db.client()
+    return firestore_source(db, generation, fitness, k)
+
+
+# ── outputs ────────────────────────────────────────────────────────────────
+def write_champion(best: Candidate, metric: str, path: str = "champion.json",
+                   keep_better: bool = False) -> bool:
+    """Write champion.json + parent_params.json; False if the incumbent wins."""
+    p = pathlib.Path(path)
+    if keep_better and p.exists():
+        incumbent = json.loads(p.read_text())
+        if incumbent.get("metric") == metric and incumbent.get("score", -math.inf) >= best.score:
+            return False
+    p.write_text(json.dumps({
+        "backtestId": best.id, "metric": metric, "score": best.score,
+        "statistics": best.statistics, "params": best.params,
+    }, indent=2))
+    pathlib.Path("parent_params.json").write_text(json.dumps(best.params, indent=2))
+    return True
+
+
+def write_survivors(ranked: list[Candidate]) -> None:
+    pathlib.Path("survivors.json").write_text(json.dumps(
+        [{"id": c.id, "score": c.score, "params": c.params} for c in ranked], indent=2))
+    with open("parents.txt", "w") as f:
+        f.writelines(c.id + "\n" for c in ranked)
+
+
+def write_winners(ranked: list[Candidate], metric: str) -> None:
+    pathlib.Path("winners.json").write_text(json.dumps(
+        [{"id": c.id, metric: c.score} for c in ranked], indent=2))
+
+
+def write_state(db, best: Candidate, metric: str) -> None:
+    from firestore_db import server_timestamp
+    db.document(STATE_DOC_PATH).set(
+        {
+            "winner_doc": best.id,
+            "metric":     best.score,
+            "metricName": metric,
+            "params":     best.params,
+            "updatedAt":  server_timestamp(),
+        },
+        merge=True,
+    )
@@ -0,0 +1,134 @@
+"""
+On-disk cache of completed backtests/read responses.
+
+A completed back-test never changes, yet wait_backtests.py, store_results.py
+and download_results.py each used to fetch its multi-megabyte payload.
+QCClient.read_backtest now reads through this cache: the first read that
+sees status "Completed" stores the response, and every later read of that
+backtestId in any process sharing RESPONSE_CACHE_DIR is served from disk.
+In-progress, errored and unsuccessful responses are never stored.
+
+Entries live under RESPONSE_CACHE_DIR/<2-char prefix>/<backtestId>.bin and
+use result_store's codec (msgpack + zstd, or zlib-compressed JSON). The
+cache is LRU-bounded by total size: a hit bumps the entry's mtime, and a
+store that pushes the total over RESPONSE_CACHE_MB evicts the oldest
+entries down to 90 % of the limit. Across CI jobs, persist the directory
+(e.g. actions/cache) to keep the one-fetch-per-back-test guarantee.
+
+Env vars:
+    RESPONSE_CACHE      – 0 disables the cache (default 1)
+    RESPONSE_CACHE_DIR  – cache directory (default ./.response_cache)
+    RESPONSE_CACHE_MB   – size bound in MB (default 2048)
+"""
+
+from __future__ import annotations
+import os, pathlib, threading, zlib
+
+import result_store, telemetry
+
+ROOT      = pathlib.Path(__file__).resolve().parent
+ENABLED   = os.getenv("RESPONSE_CACHE", "1") != "0"
+CACHE_DIR = pathlib.Path(os.getenv("RESPONSE_CACHE_DIR", ROOT / ".response_cache"))
+MAX_BYTES = int(float(os.getenv("RESPONSE_CACHE_MB", 2048)) * 1024 * 1024)
+LOW_WATER = 0.9                                     # evict down to this share of MAX_BYTES
+
+
+def cacheable(response: dict) -> bool:
+    """Only successful reads of completed back-tests are immutable."""
+    return bool(response.get("success")) and \
+        (response.get("backtest") or {}).get("status") == "Completed"
+
+
+class ResponseCache:
+    def __init__(self, root: pathlib.Path = CACHE_DIR, max_bytes: int = MAX_BYTES):
+        self.root = pathlib.Path(root)
+        self.max_bytes = max_bytes
+        self.hits = self.misses = self.stores = self.evictions = 0
+        self._lock = threading.Lock()
+        self._size: int | None = None               # lazily scanned total bytes
+
+    def _path(self, backtest_id: str) -> pathlib.Path:
+        return self.root / backtest_id[:2] / f"{backtest_id}.bin"
+
+    def get(self, backtest_id: str) -> dict | None:
+        """Cached completed response for `backtest_id`, or None."""
+        path = self._path(backtest_id)
+        try:
+            payload = result_store.decode(path.read_bytes())
+            os.utime(path)                          # LRU: a hit makes the entry young again
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        except (ValueError, RuntimeError, zlib.error):
+            path.unlink(missing_ok=True)            # corrupt or unreadable here: refetch it
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        telemetry.count("response_cache_hits")
+        return payload
+
+    def put(self, backtest_id: str, response: dict) -> bool:
+        """Store `response` if it is a completed read; returns whether it was stored."""
+        if not cacheable(response):
+            return False
+        path = self._path(backtest_id)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        blob = result_store.encode(response)
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(blob)
+        tmp.replace(path)                           # atomic: readers never see half an entry
+        telemetry.count("response_cache_stores")
+        with self._lock:
+            self.stores += 1
+            if self._size is None:
+                self._size = self._scan()
+            else:
+                self._size += len(blob)
+            if self._size > self.max_bytes:
+                self._evict()
+        return True
+
+    def _entries(self) -> list[tuple[float, int, pathlib.Path]]:
+        out = []
+        for path in self.root.glob("*/*.bin"):
+            try:
+                st = path.stat()
+            except FileNotFoundError:               # evicted by another process
+                continue
+            out.append((st.st_mtime, st.st_size, path))
+        return out
+
+    def _scan(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self) -> None:
+        """Caller holds _lock. Drop least recently used entries to the low-water mark."""
+        entries = sorted(self._entries())
+        size = sum(s for _, s, _ in entries)
+        for _, entry_size, path in entries:
+            if size <= self.max_bytes * LOW_WATER:
+                break
+            path.unlink(missing_ok=True)
+            size -= entry_size
+            self.evictions += 1
+        self._size = size
+
+    def report(self) -> str:
+        total = self.hits + self.misses
+        rate = 100.0 * self.hits / total if total else 0.0
+        return (f"🗄️  response cache: {self.hits} hits, {self.misses} misses "
+                f"({rate:.0f}% hit rate), {self.stores} stored, {self.evictions} evicted")
+
+
+_default: ResponseCache | None = None
+
+
+def default_cache() -> ResponseCache | None:
+    """Process-wide cache, or None when RESPONSE_CACHE=0."""
+    global _default
+    if _default is None and ENABLED:
+        _default = ResponseCache()
+    return _default
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Compact on-disk back-test results with a small statistics sidecar.
+
+A backtests/read response is megabytes of charts, orders and rolling
+windows, yet selection only needs the statistics. wait_backtests.py
+therefore stores each result as two files in the child directory:
+
+    results.bin   full response, msgpack + zstd (both in requirements.txt;
+                  zlib-compressed JSON on a build without them); a 4-byte
+                  magic records which, so either build reads both
+    stats.json    {"backtest": {name, status, portfolioStatistics,
+                  runtimeStatistics, statistics}} – a few hundred bytes
+
+Readers go through summary(), which reads the sidecar. A legacy child
+that only has results.json is parsed in full once and gets its sidecar
+written next to it, so later reads are as cheap as for new results
+(`convert` does the same for a whole directory up front).
+
+Usage:
+    python result_store.py convert [children]   # legacy results.json → results.bin + stats.json
+    python result_store.py info [children]      # disk use per format
+"""
+
+from __future__ import annotations
+import json, pathlib, re, sys, zlib
+
+try:
+    import msgpack, zstandard
+except ImportError:                                  # zlib + JSON fallback
+    msgpack = zstandard = None
+
+RESULTS_FILE = "results.bin"
+STATS_FILE   = "stats.json"
+LEGACY_FILE  = "results.json"
+SUMMARY_KEYS = ("name", "status", "portfolioStatistics", "runtimeStatistics", "statistics")
+ZSTD_MAGIC   = b"QRZ1"
+ZLIB_MAGIC   = b"QRJ1"
+ZSTD_LEVEL   = 9
+# backtests.json keys are the child name, plus -<hex6> / -cached from run_backtest.py
+RUN_SUFFIX   = re.compile(r"-(?:[0-9a-f]{6}|cached)$")
+
+
+# ── codec ──────────────────────────────────────────────────────────────────
+def encode(payload: dict) -> bytes:
+    if zstandard is not None:
+        raw = msgpack.packb(payload, use_bin_type=True)
+        return ZSTD_MAGIC + zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(raw)
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return ZLIB_MAGIC + zlib.compress(raw, 6)
+
+
+def decode(blob: bytes) -> dict:
+    magic, body = blob[:4], blob[4:]
+    if magic == ZLIB_MAGIC:
+        return json.loads(zlib.decompress(body))
+    if magic == ZSTD_MAGIC:
+        if zstandard is None:
+            raise RuntimeError("results.bin is zstd/msgpack – pip install zstandard msgpack")
+        try:
+            return msgpack.unpackb(zstandard.ZstdDecompressor().decompress(body), raw=False)
+        except zstandard.ZstdError as exc:               # corrupt like a bad zlib body: ValueError
+            raise ValueError(f"corrupt zstd result: {exc}") from exc
+    raise ValueError(f"unknown result encoding {magic!r}")
+
+
+# ── child directory API ────────────────────────────────────────────────────
+def summarise(payload: dict) -> dict:
+    backtest = payload.get("backtest") or {}
+    return {"backtest": {k: backtest[k] for k in SUMMARY_KEYS if k in backtest}}
+
+
+def write(child_dir: pathlib.Path, payload: dict) -> pathlib.Path:
+    """Store `payload` as results.bin + stats.json; returns the binary path."""
+    child_dir.mkdir(parents=True, exist_ok=True)
+    dest = child_dir / RESULTS_FILE
+    tmp = dest.with_suffix(".tmp")
+    tmp.write_bytes(encode(payload))
+    (child_dir / STATS_FILE).write_text(json.dumps(summarise(payload)))
+    tmp.replace(dest)                                # results.bin last: its presence = complete
+    (child_dir / LEGACY_FILE).unlink(missing_ok=True)
+    return dest
+
+
+def exists(child_dir: pathlib.Path) -> bool:
+    return (child_dir / RESULTS_FILE).exists() or (child_dir / LEGACY_FILE).exists()
+
+
+def read(child_dir: pathlib.Path) -> dict:
+    """Full response, from results.bin or a legacy results.json."""
+    binary = child_dir / RESULTS_FILE
+    if binary.exists():
+        return decode(binary.read_bytes())
+    return json.loads((child_dir / LEGACY_FILE).read_text())
+
+
+def summary(child_dir: pathlib.Path) -> dict | None:
+    """{"backtest": {...statistics...}} from the sidecar (written on first read for legacy results)."""
+    sidecar = child_dir / STATS_FILE
+    if sidecar.exists():
+        return json.loads(sidecar.read_text())
+    legacy = child_dir / LEGACY_FILE
+    if legacy.exists():
+        # QC nests portfolioStatistics in totalPerformance and every rolling
+        # window, so only a real parse finds the top-level objects
+        out = summarise(json.loads(legacy.read_text()))
+        sidecar.write_text(json.dumps(out))
+        return out
+    if (child_dir / RESULTS_FILE).exists():
+        return summarise(read(child_dir))
+    return None
+
+
+def result_dirs(children: pathlib.Path, names, backtests: pathlib.Path | None = None
+                ) -> dict[str, pathlib.Path]:
+    """child name → directory holding its stored result.
+
+    wait_backtests.py stores each result under children/<backtests.json key>:
+    the child's own name for scripts/run_parallel_backtests.py, the name plus
+    a run suffix for run_backtest.py. Keys are matched back to `names`; a
+    name without a key falls back to children/<name>.
+    """
+    names = set(names)
+    keys = json.loads(backtests.read_text()) if backtests and backtests.exists() else {}
+    out = {}
+    for key in keys:
+        name = key if key in names else RUN_SUFFIX.sub("", key)
+        if name in names and exists(children / key):
+            out[name] = children / key
+    for name in names - out.keys():
+        if exists(children / name):
+            out[name] = children / name
+    return out
+
+
+def remove(child_dir: pathlib.Path) -> None:
+    for name in (RESULTS_FILE, STATS_FILE, LEGACY_FILE):
+        (child_dir / name).unlink(missing_ok=True)
+
+
+def main(argv: list[str]):
+    cmd = argv[0] if argv else "info"
+    children = pathlib.Path(argv[1] if len(argv) > 1 else "children")
+    dirs = sorted(d for d in children.iterdir() if d.is_dir())
+    if cmd == "convert":
+        n = 0
+        for d in dirs:
+            if (d / LEGACY_FILE).exists():
+                write(d, json.loads((d / LEGACY_FILE).read_text()))
+                n += 1
+        print(f"🗜️  Converted {n} results to {RESULTS_FILE} + {STATS_FILE}")
+    elif cmd == "info":
+        sizes = {name: sum((d / name).stat().st_size for d in dirs if (d / name).exists())
+                 for name in (LEGACY_FILE, RESULTS_FILE, STATS_FILE)}
+        codec = "msgpack+zstd" if zstandard is not None else "json+zlib"
+        for name, size in sizes.items():
+            print(f"{name:>13}  {size / 1e6:10.2f} MB")
+        print(f"writer codec: {codec}")
+    else:
+        sys.exit(f"unknown command {cmd!r} (convert | info)")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
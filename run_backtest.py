@@ -4,7 +4,9 @@
 Launch exactly one (NUM_CHILDREN = 1) cloud back-test.
 
 Steps
+  0. reuse the backtestId of identical params from the fitness cache
   1. ensure each child folder is a self-contained Lean project
+     (shared sources hard-linked by staging.stage_child, never copied)
   2. run `lean cloud backtest` from INSIDE that folder
   3. store {run_name: backtestId} in backtests.json (best-effort)
 
@@ -12,7 +14,11 @@ Requires QC_PROJECT_ID as an env-var (set via GitHub Secret).
 """
 
 from __future__ import annotations
-import json, os, pathlib, re, shutil, subprocess, sys, uuid
+import json, os, pathlib, re, subprocess, sys, uuid
+
+import telemetry
+from fitness_cache import FitnessCache
+from staging import stage_child
 
 ROOT       = pathlib.Path(__file__).resolve().parent
 CHILD_DIR  = ROOT / "children"
@@ -22,38 +28,45 @@ PROJECT_ID = os.getenv("QC_PROJECT_ID")
 if not PROJECT_ID:
     sys.exit("QC_PROJECT_ID env var missing")
 
-ESSENTIALS = ["main.py", "strategies"]        # ⬅ lean.json removed
 BACKTEST_RE = re.compile(r"backtest.*?id.*?([0-9a-f\-]{8,})", re.I)
 
 records: dict[str, str] = {}
+cache = FitnessCache()
 
 for child in CHILD_DIR.iterdir():
     if not child.is_dir():
         continue
 
-    # 1️⃣  copy essentials so each child is a full Lean project
-    for item in ESSENTIALS:
-        src, dst = ROOT / item, child / item
-        if dst.exists():
-            shutil.rmtree(dst) if dst.is_dir() else dst.unlink()
-        shutil.copytree(src, dst) if src.is_dir() else shutil.copy2(src, dst)
+    # 0️⃣  identical params already back-tested? reuse that result
+    params_file = child / "params.json"
+    params = json.loads(params_file.read_text()) if params_file.exists() else None
+    cached = cache.get(params) if params is not None else None
+    if cached:
+        records[f"{child.name}-cached"] = cached["backtestId"]
+        print(f"💾  {child.name}  →  {cached['backtestId']} (cached)")
+        continue
 
-    # If lean.json missing, generate it on the fly
-    if not (child / "lean.json").exists():
-        subprocess.run(
-            ["lean", "init", "-y"], cwd=child, check=True, text=True
-        )
+    # 1️⃣  link main.py + the one strategy module so each child is a full Lean project
+    run_name = f"{child.name}-{uuid.uuid4().hex[:6]}"
+    with telemetry.span("child_prep", child=run_name):
+        stage_child(child, params)
+
+        # If lean.json missing, generate it on the fly
+        if not (child / "lean.json").exists():
+            subprocess.run(
+                ["lean", "init", "-y"], cwd=child, check=True, text=True
+            )
 
     # 2️⃣  start back-test (CLI 1.x ⇒ no --wait / --json flags)
-    run_name = f"{child.name}-{uuid.uuid4().hex[:6]}"
     print(f"🚀  {run_name}")
     cmd = [
         "lean", "cloud", "backtest", PROJECT_ID,
         "--push", "--name", run_name
     ]
 
-    proc = subprocess.run(cmd, cwd=child, text=True,
-                          capture_output=True, timeout=900)
+    with telemetry.span("lean_submit", child=run_name):
+        proc = subprocess.run(cmd, cwd=child, text=True,
+                              capture_output=True, timeout=900)
 
     if proc.returncode:
         print(f"❌  {run_name}:\n{proc.stderr or proc.stdout}")
@@ -63,8 +76,11 @@ for child in CHILD_DIR.iterdir():
     match = BACKTEST_RE.search(proc.stdout)
     bt_id = match.group(1) if match else "unknown"
     records[run_name] = bt_id
+    if params is not None and bt_id != "unknown":
+        cache.remember(params, bt_id)
     print(f"✔   {run_name}  →  {bt_id}")
 
 # always write something so later steps know the script ran
 OUT_FILE.write_text(json.dumps(records, indent=2))
 print(f"📝  Back-test IDs saved to {OUT_FILE.relative_to(ROOT)}")
+print(cache.report())
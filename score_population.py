@@ -3,58 +3,30 @@
 Select the best strategy out of latest back-test runs + current champion.
 
 Logic:
-  * Filter to docs in Firestore collection `backtest_results`
-      where runTimestamp >= RUN_START (passed in as env)
-  * Compute a single fitness score:
+  * Rank this GENERATION's docs in Firestore collection `backtest_results`
+      (or the local warehouse when RESULTS_SOURCE=warehouse)
+  * Compute a single fitness score (FITNESS, default the stored field):
         fitness = sharpeRatio - maxDrawdown * 2
-    (Drawdown is penalised; tune weight later).
+    (Drawdown is penalised; tune weight later.)
   * If a child beats the old champion, overwrite champion.json
 """
-import os, json, sys, datetime as dt
-from google.cloud import firestore
+import os, sys
 
-COLL = "backtest_results"
-RUN_START = os.getenv("RUN_START")            # ISO string from evolve.yml
-OUT_FILE = "champion.json"
+import ranking
+from fitness import current_generation
 
-db = firestore.Client()
-query = db.collection(COLL)
-if RUN_START:
-    ts = dt.datetime.fromisoformat(RUN_START)
-    query = query.where("createdAt", ">", ts)
+FITNESS = os.getenv("FITNESS", "fitness")
+SOURCE = os.getenv("RESULTS_SOURCE", "firestore")
+GENERATION = current_generation()
 
-docs = list(query.stream())
-if not docs:
-    print("No new back-tests found; exit.")
+best = ranking.top_k(ranking.source(SOURCE, GENERATION, FITNESS, k=1), FITNESS, 1)
+if not best:
+    print(f"No back-tests found for generation {GENERATION}; exit.")
     sys.exit(0)
 
-def fitness(stat):
-    """Higher is better."""
-    sharpe = float(stat.get("sharpeRatio", 0))
-    dd     = float(stat.get("drawdown", 1))   # 0.092 -> 9.2 %
-    return sharpe - dd * 2.0
+print(f"🏆  Top candidate {best[0].id}  {FITNESS}={best[0].score:.3f}")
 
-best_doc = max(docs, key=lambda d: fitness(d.get("statistics", {})))
-best_stat = best_doc.get("statistics", {})
-best_fit  = fitness(best_stat)
-
-print(f"🏆  Top candidate {best_doc.id}  fitness={best_fit:.3f}")
-
-# compare to current champion (if exists)
-if os.path.exists(OUT_FILE):
-    with open(OUT_FILE) as f:
-        champ = json.load(f)
-    champ_fit = fitness(champ["statistics"])
-    if champ_fit >= best_fit:
-        print("Current champion is still better. Keep it.")
-        sys.exit(0)
-
-# promote newcomer
-new_champ = {
-    "backtestId": best_doc.id,
-    "statistics": best_stat,
-    "parameters": best_doc.get("parameters", {})   # store for next gen
-}
-with open(OUT_FILE, "w") as f:
-    json.dump(new_champ, f, indent=2)
+if not ranking.write_champion(best[0], FITNESS, keep_better=True):
+    print("Current champion is still better. Keep it.")
+    sys.exit(0)
 print("🎉  New champion saved to champion.json")
@@ -1,31 +1,24 @@
 #!/usr/bin/env python3
 """
 Generate N children by mutating a parent param-dict using schema bounds.
-Reads schema from parameter_schema.json.
+Reads schema from parameter_schema.json (compiled by genome.py, so the
+batch is sampled, mutated and de-duplicated as one array).
 Outputs each child params to stdout (and writes to tmp file for Lean).
 """
 
-import json, random, os, argparse, pathlib, hashlib
+import json, os, argparse, pathlib, hashlib, sys
 
-SCHEMA = json.load(open(pathlib.Path(__file__).parent / "parameter_schema.json"))
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
 
-def random_value(field):
-    t, mn, mx = SCHEMA[field]["type"], SCHEMA[field]["min"], SCHEMA[field]["max"]
-    if t == "int":
-        return random.randint(mn, mx)
-    return round(random.uniform(mn, mx), 4)
+from genome import Genome
 
-def mutate(parent):
-    child = parent.copy()
-    # mutate 30 % of fields
-    for f in random.sample(list(SCHEMA.keys()), k=max(1, int(0.3*len(SCHEMA)))):
-        child[f] = random_value(f)
-    return child
+GENOME = Genome.load(pathlib.Path(__file__).parent / "parameter_schema.json")
 
 def load_parent(pth):
     if not os.path.exists(pth):
         # bootstrap: random parent
-        return {f: random_value(f) for f in SCHEMA}
+        return GENOME.to_dicts(GENOME.sample(1))[0]
     return json.load(open(pth))
 
 if __name__ == "__main__":
@@ -38,8 +31,9 @@ if __name__ == "__main__":
     parent = load_parent(args.parent)
     os.makedirs(args.outdir, exist_ok=True)
 
-    for i in range(args.num):
-        child = mutate(parent)
+    children = GENOME.to_dicts(GENOME.breed(GENOME.from_dicts([parent]), args.num))
+    for i, child in enumerate(children):
+        child = {**parent, **child}
         h = hashlib.md5(json.dumps(child, sort_keys=True).encode()).hexdigest()[:8]
         fn = f"{args.outdir}/child_{i}_{h}.json"
         json.dump(child, open(fn, "w"), indent=2)
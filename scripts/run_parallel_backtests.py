@@ -1,11 +1,16 @@
 #!/usr/bin/env python3
 """
 Orchestrates running multiple backtests in parallel on QuantConnect.
+Children whose params were already back-tested (see fitness_cache.py) reuse
+the cached backtest ID instead of being submitted again.
+
+Submissions go through backtest_scheduler.Scheduler: at most MAX_IN_FLIGHT
+lean processes at once, best pre-screen score (prescreen.json) first,
+transient failures retried, slots refilled as back-tests finish.
 """
 import os
 import sys
 import json
-import subprocess
 import pathlib
 import shutil
 
@@ -14,6 +19,19 @@ ROOT = pathlib.Path(__file__).parent.parent
 CHILDREN_DIR = ROOT / "children"
 TMP_DIR = ROOT / ".tmp_children"
 
+sys.path.insert(0, str(ROOT))
+from backtest_scheduler import Scheduler
+from fitness_cache import FitnessCache, param_hash
+from staging import stage_child
+
+PRESCREEN_FILE = ROOT / "prescreen.json"
+
+def load_priorities():
+    """Lower runs first: negated pre-screen fitness, unscored children last."""
+    if not PRESCREEN_FILE.exists():
+        return {}
+    return {child: -score for child, score in json.load(open(PRESCREEN_FILE)).items()}
+
 def main():
     """Main execution function."""
     lean_executable = shutil.which("lean")
@@ -37,7 +55,6 @@ def main():
         shutil.rmtree(TMP_DIR)
     TMP_DIR.mkdir()
 
-    processes = []
     child_files = list(CHILDREN_DIR.glob("*.json"))
 
     if not child_files:
@@ -46,18 +63,36 @@ def main():
 
     print(f"🚀 Found {len(child_files)} children. Preparing to launch backtests in parallel...")
 
+    cache = FitnessCache()
+    scheduler = Scheduler()
+    priorities = load_priorities()
+    backtest_ids = {}
+    launched = {}       # params hash -> child_id submitted in this run
+    duplicates = {}     # child_id -> children with identical params riding along
+
     for child_json in child_files:
         child_id = child_json.stem
         child_dir = TMP_DIR / child_id
         child_dir.mkdir()
 
-        # Copy necessary source files
-        shutil.copy(ROOT / "main.py", child_dir)
-        shutil.copy(ROOT / "parameter_schema.json", child_dir)
-        shutil.copytree(ROOT / "strategies", child_dir / "strategies")
-        shutil.copy(child_json, child_dir / "params.json")
+        # Reuse earlier results for identical params
+        params = json.load(open(child_json))
+        cached = cache.get(params)
+        key = param_hash(params)
+        if cached or key in launched:
+            shutil.copy(child_json, child_dir / "params.json")  # store_results reads it
+            if cached:
+                backtest_ids[child_id] = cached["backtestId"]
+                print(f"  💾 {child_id} -> cached Backtest ID: {cached['backtestId']}")
+            else:
+                duplicates.setdefault(launched[key], []).append(child_id)
+                print(f"  🔁 {child_id} -> duplicate of {launched[key]}, not submitted")
+            continue
+        launched[key] = child_id
+
+        # Link shared sources (only the strategy module this child uses)
+        stage_child(child_dir, params, extra=("parameter_schema.json",))
 
-        params = json.load(open(child_dir / "params.json"))
         backtest_name = f"Evolve-{child_id}-{params.get('STRATEGY_MODULE', 'n/a')}-{params.get('SYMBOL', 'n/a')}"
 
         # Build the command with the --verbose flag for detailed debugging
@@ -70,22 +105,20 @@ def main():
             "--api-token", qc_api_token,
             "--verbose"
         ]
-        
-        print(f"  -> Launching: {backtest_name}")
-        proc = subprocess.Popen(cmd, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        processes.append((child_id, proc))
+        scheduler.submit(child_id, cmd, priorities.get(child_id, float("inf")))
 
-    backtest_ids = {}
-    print("\n✅ All backtests submitted. Waiting for QuantConnect to return IDs...")
-    for child_id, proc in processes:
-        stdout, stderr = proc.communicate()
-        if proc.returncode == 0:
+    print(f"\n⏳ Running {len(launched)} backtests, at most {scheduler.max_in_flight} in flight...")
+    for child_id, result in scheduler.run().items():
+        stdout, stderr = result.stdout, result.stderr
+        if result.returncode == 0:
             try:
                 result_json = json.loads(stdout)
                 backtest_id = result_json.get("backtestId")
                 if backtest_id:
                     print(f"  ✔️ {child_id} -> Backtest ID: {backtest_id}")
                     backtest_ids[child_id] = backtest_id
+                    for dup_id in duplicates.get(child_id, []):
+                        backtest_ids[dup_id] = backtest_id
                 else:
                     print(f"  ❌ {child_id} -> Failed to get backtestId from output. STDOUT: {stdout.strip()}, STDERR: {stderr.strip()}")
             except json.JSONDecodeError:
@@ -98,6 +131,9 @@ def main():
         json.dump(backtest_ids, f, indent=2)
 
     print("\n📝 Wrote all backtest IDs to backtests.json")
+    n_dupes = sum(len(v) for v in duplicates.values())
+    print(f"{cache.report()}, {n_dupes} in-run duplicates skipped")
+    print(f"↻  {scheduler.retries} transient submission failures retried")
 
 if __name__ == "__main__":
     main()
@@ -3,51 +3,25 @@
 select_champion.py – pick the best-performing child algo
 """
 
-import os, sys, json, datetime
-from google.cloud import firestore
+import os, sys
 
-COLL = "backtest_results"          # Firestore collection
-METRIC = "Net Profit"              # ← change if you prefer Sharpe etc.
+import ranking
+from fitness import current_generation
 
-#
-# 0. secrets
-#
-try:
-    with open("gcp_key.json", "w") as fh:
-        fh.write(os.environ["GCP_SA_KEY"])
-    os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = "gcp_key.json"
-except KeyError:
-    print("missing GCP_SA_KEY"); sys.exit(1)
-
-db = firestore.Client()
-
-#
-# 1. read latestgeneration’s docs
-#
-today = datetime.date.today()
-docs = list(db.collection(COLL).where(
-            "createdAt", ">=", datetime.datetime(today.year, today.month, today.day)
-        ).stream())
-
-if not docs:
-    print("no today docs – abort"); sys.exit(0)
+FITNESS = os.getenv("FITNESS", "netProfit")   # ← "Net Profit"; change if you prefer Sharpe etc.
+SOURCE = os.getenv("RESULTS_SOURCE", "firestore")
 
 #
-# 2. pick champion
+# 1. rank this generation's docs (indexed top-1 for stored metrics)
 #
-def score(d):      # higher is better
-    return float(d["statistics"].get(METRIC, 0))
-
-champ = max(docs, key=lambda d: score(d.to_dict()))
-cdata = champ.to_dict()
+generation = current_generation()
+best = ranking.top_k(ranking.source(SOURCE, generation, FITNESS, k=1), FITNESS, 1)
 
-print("🏆  champion", champ.id, score(cdata))
+if not best:
+    print(f"no docs for generation {generation} – abort"); sys.exit(0)
 
 #
-# 3. write artefact
+# 2. write artefacts (champion.json + parent_params.json seed for algo_gen.py)
 #
-with open("champion.json", "w") as fh:
-    json.dump(cdata, fh, indent=2)
-# also overwrite parent seed
-with open("parent_algo.json", "w") as fh:
-    json.dump(cdata["algo"], fh, indent=2)     # assumes you stored algo params under 'algo'
+print("🏆  champion", best[0].id, best[0].score)
+ranking.write_champion(best[0], FITNESS)
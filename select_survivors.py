@@ -1,46 +1,45 @@
 #!/usr/bin/env python3
 """
-Load every results.json, compute Sharpe, keep top NUM_SURVIVORS,
-write their folder names into parents.txt (one per line).
-Also push summary stats to Firestore for Looker.
+Load every child's stored statistics (result_store sidecars), rank the
+children, keep top NUM_SURVIVORS, write their folder names into parents.txt
+(one per line) and their params into survivors.json (algo_gen.py breeds
+from it).
+Also push summary stats to Firestore for Looker (BACKTEST_COLLECTION, or
+SURVIVOR_COLLECTION to keep them apart). The summaries carry no
+generation, fitness or createdAt field, so the selectors' generation
+queries and the warehouse sync never pick them up as candidates.
+
+SELECTION=pareto (default) keeps the NSGA-II Pareto front over Sharpe,
+drawdown and OOS Net Profit; SELECTION=scalar ranks on FITNESS alone.
 """
-import json, os, pathlib, operator
-from google.cloud import firestore
+import os, pathlib
 
-NUM_SURVIVORS = int(os.getenv("NUM_SURVIVORS", "2"))
-COLLECTION    = os.getenv("BACKTEST_COLLECTION", "backtest_results")
-GCP_SA_KEY    = os.environ["GCP_SA_KEY"]
+import firestore_db
+import ranking
 
-# Firestore auth
-open("gcp_key.json", "w").write(GCP_SA_KEY)
-os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = "gcp_key.json"
-db = firestore.Client()
+NUM_SURVIVORS = int(os.getenv("NUM_SURVIVORS", "2"))
+COLLECTION    = os.getenv("SURVIVOR_COLLECTION") or os.getenv("BACKTEST_COLLECTION", "backtest_results")
+SELECTION     = os.getenv("SELECTION", "pareto")
+FITNESS       = os.getenv("FITNESS", "sharpeRatio")
 
 ROOT = pathlib.Path(__file__).parent / "children"
-scores = []
-
-for child in ROOT.iterdir():
-    fn = child / "results.json"
-    if not fn.exists():
-        continue
-    data = json.loads(fn.read_text())
-    stats = data["backtest"]["portfolioStatistics"]
-    sharpe = float(stats["sharpeRatio"])
-    scores.append((child.name, sharpe, stats))
 
 # pick winners
-scores.sort(key=operator.itemgetter(1), reverse=True)
-survivors   = scores[:NUM_SURVIVORS]
-with open("parents.txt", "w") as f:
-    f.writelines(name + "\n" for name, _, _ in survivors)
-print("🏆  survivors:", [s[0] for s in survivors])
+candidates = ranking.results_source(ROOT)
+if SELECTION == "pareto":
+    survivors = ranking.pareto(candidates, NUM_SURVIVORS)
+else:   # streams results, keeps only NUM_SURVIVORS in memory
+    survivors = ranking.top_k(candidates, FITNESS, NUM_SURVIVORS)
+ranking.write_survivors(survivors)
+print("🏆  survivors:", [s.id for s in survivors])
 
 # upload each to Firestore
-for name, sharpe, stats in survivors:
+db = firestore_db.client()
+for s in survivors:
     doc = {
-        "child": name,
-        "sharpe": sharpe,
-        "stats": stats
+        "child": s.id,
+        "sharpe": s.metrics["sharpeRatio"],
+        "stats": s.statistics,
     }
     db.collection(COLLECTION).add(doc)
-    print(f"☁️  pushed {name} to Firestore")
+    print(f"☁️  pushed {s.id} to Firestore")
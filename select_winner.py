@@ -1,77 +1,38 @@
 # tools/algogen/select_winner.py
 """
-Pick the highest-performing back-test from the most recent batch and
+Pick the highest-performing back-test from the current generation and
 save its doc ID so the next generation can inherit it.
 """
-import sys
 import os
-from typing import Any, Dict, List
-from google.cloud import firestore
-
-# --- ADD THIS AUTHENTICATION BLOCK ---
-try:
-    GCP_SA_KEY_JSON = os.environ["GCP_SA_KEY"]
-    with open("gcp_key.json", "w") as fh:
-        fh.write(GCP_SA_KEY_JSON)
-    os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = "gcp_key.json"
-except KeyError:
-    print("❌ GCP_SA_KEY secret not set in GitHub Secrets.")
-    sys.exit(1)
-# --- END BLOCK ---
-
+import sys
 
-COLLECTION       = "backtest_results"
-STATE_DOC_PATH   = "evolve_state/parent"
-LOOKBACK_DOCS    = 25
-METRIC_PATH      = ("statistics", "OOS Net Profit")
-FALLBACK_METRIC_VALUE  = -999999.0
+import firestore_db
+import ranking
+from fitness import COLL as COLLECTION, current_generation
 
-def pull_metric(d: Dict[str, Any]) -> float:
-    """Safely extracts a nested metric from the backtest result document."""
-    try:
-        node = d
-        for key in METRIC_PATH:
-            node = node[key]
-        return float(node)
-    except (KeyError, TypeError, ValueError):
-        return FALLBACK_METRIC_VALUE
+FITNESS = os.getenv("FITNESS", "oosNetProfit")   # typed copy of statistics -> OOS Net Profit
+SOURCE  = os.getenv("RESULTS_SOURCE", "firestore")
 
 def main():
-    db = firestore.Client()
-    print(f"Looking at last {LOOKBACK_DOCS} docs in '{COLLECTION}'…")
-    print(f"Selecting winner based on: '{' -> '.join(METRIC_PATH)}'")
+    db = firestore_db.client()
+    generation = current_generation()
+    print(f"Looking at generation '{generation}' in '{COLLECTION}'…")
+    print(f"Selecting winner based on: '{FITNESS}'")
 
-    recent: List[Any] = list(
-        db.collection(COLLECTION)
-          .order_by("createdAt", direction=firestore.Query.DESCENDING)
-          .limit(LOOKBACK_DOCS)
-          .stream()
-    )
-    if not recent:
+    best = ranking.top_k(ranking.source(SOURCE, generation, FITNESS, k=1, db=db), FITNESS, 1)
+    if not best:
         print("⚠️  No documents found; nothing to score.")
         sys.exit(0)
-
-    winner = max(recent, key=lambda d: pull_metric(d.to_dict()))
-    wdata  = winner.to_dict()
-    wscore = pull_metric(wdata)
+    winner = best[0]
 
     print(f"--- Champion Candidate ---")
     print(f"Winner doc : {winner.id}")
-    print(f"Metric Score: {wscore:.4f}")
-    print(f"Parameters    : {wdata.get('params', {})}")
+    print(f"Metric Score: {winner.score:.4f}")
+    print(f"Parameters    : {winner.params}")
     print(f"------------------------")
 
-
-    db.document(STATE_DOC_PATH).set(
-        {
-            "winner_doc": winner.id,
-            "metric":     wscore,
-            "params":     wdata.get("params", {}),
-            "updatedAt":  firestore.SERVER_TIMESTAMP
-        },
-        merge=True,
-    )
-    print(f"✅ Saved winner info to Firestore document: {STATE_DOC_PATH}")
+    ranking.write_state(db, winner, FITNESS)
+    print(f"✅ Saved winner info to Firestore document: {ranking.STATE_DOC_PATH}")
 
 if __name__ == "__main__":
     main()
@@ -7,44 +7,27 @@ Env vars expected:
     GCP_SA_KEY   – service-account JSON (already in secrets)
     GENERATION   – e.g. 'evolve-20240331-gen01'
     TOP_K        – how many winners to keep (default 2)
-    METRIC       – which stats field to sort DESC on (default 'sharpeRatio')
+    METRIC       – fitness to sort DESC on (default 'sharpeRatio'; any
+                   ranking.FITNESS name or expression over metric names)
 """
-import os, json, sys, tempfile, operator
-from google.cloud import firestore
+import os, sys
+
+import ranking
 
 GEN = os.environ.get("GENERATION")
 TOP_K = int(os.environ.get("TOP_K", 2))
 METRIC = os.environ.get("METRIC", "sharpeRatio")
+SOURCE = os.environ.get("RESULTS_SOURCE", "firestore")
 
 if not GEN:
     sys.exit("GENERATION env var missing")
 
-# ───── connect
-with tempfile.NamedTemporaryFile("w", delete=False) as f:
-    f.write(os.environ["GCP_SA_KEY"])
-    os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = f.name
-db = firestore.Client()
-
-coll = db.collection("backtest_results")
-docs = coll.where(firestore.FieldPath.document_id(), ">=", GEN) \
-           .where(firestore.FieldPath.document_id(), "<",  GEN + "~") \
-           .stream()
-
-candidates = []
-for d in docs:
-    stats = d.to_dict().get("statistics", {})
-    val = float(stats.get(METRIC, 0))
-    candidates.append((val, d.id, stats))
-if not candidates:
+winners = ranking.top_k(ranking.source(SOURCE, GEN, METRIC, k=TOP_K), METRIC, TOP_K)
+if not winners:
     sys.exit("No docs found for generation " + GEN)
 
-# sort DESC by metric
-winners = sorted(candidates, key=operator.itemgetter(0), reverse=True)[:TOP_K]
-print("🏆  Winners:", winners)
+print("🏆  Winners:", [(w.score, w.id) for w in winners])
 
 # emit a winners.json for the workflow
-with open("winners.json", "w") as f:
-    json.dump(
-        [{"id": doc_id, METRIC: val} for (val, doc_id, _) in winners],
-        f, indent=2)
+ranking.write_winners(winners, METRIC)
 print("Wrote winners.json")
@@ -0,0 +1,58 @@
+"""
+Stage child Lean projects without copying the shared sources.
+
+A child project only needs main.py, the single strategy module named by
+its STRATEGY_MODULE and its own params.json. The shared files are
+hard-linked into the child folder (falling back to a symlink, then to a
+plain copy across filesystems), so preparing N children costs a few
+metadata operations each instead of N copies of strategies/.
+"""
+
+from __future__ import annotations
+import json, os, pathlib, shutil
+
+ROOT = pathlib.Path(__file__).resolve().parent
+DEFAULT_MODULE = "ema_cross_strategy"            # main.py's fallback
+
+
+def link(src: pathlib.Path, dst: pathlib.Path) -> None:
+    """Hard-link src → dst, else symlink, else copy; replaces dst if present."""
+    if dst.is_symlink() or dst.is_file():
+        dst.unlink()
+    elif dst.is_dir():
+        shutil.rmtree(dst)
+    try:
+        os.link(src, dst)
+    except OSError:
+        try:
+            dst.symlink_to(src.resolve())
+        except OSError:
+            shutil.copy2(src, dst)
+
+
+def stage_child(child_dir: pathlib.Path, params: dict | None,
+                extra: tuple[str, ...] = ()) -> pathlib.Path:
+    """Make `child_dir` a minimal Lean project for `params`; returns the dir.
+
+    With params=None no params.json is written and main.py uses its defaults.
+    """
+    child_dir.mkdir(parents=True, exist_ok=True)
+    link(ROOT / "main.py", child_dir / "main.py")
+    for name in extra:
+        link(ROOT / name, child_dir / name)
+
+    module = (params or {}).get("STRATEGY_MODULE", DEFAULT_MODULE)
+    strat_dir = child_dir / "strategies"
+    if strat_dir.is_symlink() or strat_dir.is_file():
+        strat_dir.unlink()
+    elif strat_dir.is_dir():
+        shutil.rmtree(strat_dir)
+    strat_dir.mkdir()
+    link(ROOT / "strategies" / f"{module}.py", strat_dir / f"{module}.py")
+
+    if params is not None:
+        params_file = child_dir / "params.json"
+        if params_file.is_symlink():
+            params_file.unlink()
+        params_file.write_text(json.dumps(params, indent=2))
+    return child_dir
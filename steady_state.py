@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Steady-state evolution: one long-running driver, no generation barriers.
+
+The CI loop (algo_gen → run_parallel_backtests → wait_backtests →
+store_results → selector) waits for a generation's slowest back-test
+while the other nodes idle. This driver instead runs MAX_IN_FLIGHT slot
+coroutines, one per cloud node. Each slot loops:
+
+    breed one child from the current elites → lean cloud backtest →
+    poll (wait_backtests.Poller) → ingest → update elites → next child
+
+so a node is handed new work the moment its back-test finishes. Results
+are ingested like store_results.py does (backtest_results document with
+typed fitness fields + fitness cache); params already in the fitness cache
+are never re-submitted. A failing iteration (submission, staging, ingest)
+is logged and counted as failed, and its slot carries on with the next
+child, so the pool never silently shrinks. Every SNAPSHOT_EVERY seconds
+the elites are written out through the ranking output contract
+(champion.json, parent_params.json, survivors.json) and node utilisation
+— busy node-seconds / (slots × wall time) — is logged.
+
+SIGINT / SIGTERM stop breeding and let in-flight back-tests finish; a
+second signal abandons them. Either way a final snapshot is written.
+
+Usage:
+    python steady_state.py [--slots N] [--max-evals N] [--duration SECS]
+
+Env vars:
+    MAX_IN_FLIGHT   – concurrent back-tests / cloud nodes (default 4)
+    ELITE_SIZE      – elites kept and bred from (default 8)
+    FITNESS         – ranking fitness name or expression (default "fitness")
+    SNAPSHOT_EVERY  – seconds between champion snapshots (default 300)
+    MAX_EVALS       – stop after this many submissions (default unlimited)
+    DURATION        – stop after this many seconds (default unlimited)
+    STEADY_DIR      – staging dir for children and results (default ./.steady)
+"""
+
+from __future__ import annotations
+import argparse, asyncio, json, os, pathlib, shutil, signal, sys, time
+
+import ranking
+from algo_gen import load_parents
+from backtest_scheduler import MAX_IN_FLIGHT, MAX_RETRIES, RETRY_DELAY, Scheduler
+from fitness import COLL, extract_statistics, fitness_fields
+from fitness_cache import FitnessCache, param_hash
+from genome import Genome
+from staging import stage_child
+from wait_backtests import Poller
+
+ROOT           = pathlib.Path(__file__).resolve().parent
+GENOME         = Genome.load(ROOT / "parameter_schema.json")
+ELITE_SIZE     = int(os.getenv("ELITE_SIZE", 8))
+FITNESS        = os.getenv("FITNESS", "fitness")
+SNAPSHOT_EVERY = float(os.getenv("SNAPSHOT_EVERY", 300))
+MAX_EVALS      = int(os.getenv("MAX_EVALS", 0)) or None
+DURATION       = float(os.getenv("DURATION", 0)) or None
+WORK_DIR       = pathlib.Path(os.getenv("STEADY_DIR", ROOT / ".steady"))
+BREED_ATTEMPTS = 20
+BACKOFF        = 1.0             # seconds a slot waits after a failure or with no fresh child
+
+
+class Elites:
+    """Best `size` candidates seen so far, best first."""
+
+    def __init__(self, size: int = ELITE_SIZE, fitness: str = FITNESS):
+        self.size, self.fitness = size, fitness
+        self.items: list[ranking.Candidate] = []
+
+    def add(self, cand: ranking.Candidate) -> bool:
+        """Offer a candidate; True when it made the elite set."""
+        self.items = ranking.top_k([*self.items, cand], self.fitness, self.size)
+        return any(c is cand for c in self.items)
+
+    @property
+    def best(self) -> ranking.Candidate | None:
+        return self.items[0] if self.items else None
+
+
+class Driver:
+    def __init__(self, slots: int, elites: Elites, seeds: list[dict], lean: str,
+                 max_evals: int | None = MAX_EVALS, duration: float | None = DURATION,
+                 db=None, work_dir: pathlib.Path = WORK_DIR):
+        self.slots, self.elites, self.seeds, self.lean = slots, elites, seeds, lean
+        self.max_evals, self.duration, self.db, self.work_dir = max_evals, duration, db, work_dir
+        self.cache = FitnessCache()
+        self.payloads: dict[str, dict] = {}
+        self.poller = Poller(on_complete=lambda c, _, j: self.payloads.__setitem__(c, j),
+                             results_dir=work_dir)
+        self.in_flight: set[str] = set()
+        self.stopping = asyncio.Event()
+        self.submitted = self.completed = self.failed = 0
+        self.busy = 0.0                             # node-seconds spent on back-tests
+        self.started = time.monotonic()
+
+    # ── lifecycle ─────────────────────────────────────────────────────────
+    def budget_left(self) -> bool:
+        if self.stopping.is_set():
+            return False
+        if self.max_evals is not None and self.submitted >= self.max_evals:
+            return False
+        return self.duration is None or time.monotonic() - self.started < self.duration
+
+    def utilisation(self) -> float:
+        wall = time.monotonic() - self.started
+        return self.busy / (self.slots * wall) if wall > 0 else 0.0
+
+    # ── one slot ──────────────────────────────────────────────────────────
+    def breed(self) -> dict | None:
+        """One child of the current elites, neither in flight nor cached.
+
+        After BREED_ATTEMPTS taken children the elites' neighbourhood is
+        treated as exhausted and random samples are tried as often; None
+        when those are all taken too."""
+        parents = [c.params for c in self.elites.items] or self.seeds
+        pop = GENOME.from_dicts(parents)
+        for attempt in range(2 * BREED_ATTEMPTS):
+            kids = GENOME.breed(pop, 1) if attempt < BREED_ATTEMPTS and len(pop) else []
+            kids = kids if len(kids) else GENOME.sample(1)   # neighbourhood exhausted
+            child = {**parents[0], **GENOME.to_dicts(kids)[0]}
+            if param_hash(child) not in self.in_flight and not self.cache.get(child):
+                return child
+        return None
+
+    async def submit(self, name: str, params: dict) -> str | None:
+        child_dir = stage_child(self.work_dir / name, params, extra=("parameter_schema.json",))
+        cmd = [self.lean, "cloud", "backtest", str(child_dir),
+               "--name", f"Evolve-{name}-{params.get('STRATEGY_MODULE', 'n/a')}-{params.get('SYMBOL', 'n/a')}",
+               "--json", "--no-output",
+               "--user-id", os.environ["QC_USER_ID"], "--api-token", os.environ["QC_API_TOKEN"]]
+        for attempt in range(MAX_RETRIES + 1):
+            proc = await asyncio.create_subprocess_exec(*cmd, stdout=asyncio.subprocess.PIPE,
+                                                        stderr=asyncio.subprocess.PIPE)
+            out, err = (b.decode() for b in await proc.communicate())
+            if proc.returncode == 0:
+                try:
+                    return json.loads(out).get("backtestId")
+                except json.JSONDecodeError:
+                    break
+            if attempt < MAX_RETRIES and Scheduler.is_transient(out, err):
+                await asyncio.sleep(RETRY_DELAY * 2 ** attempt)
+                continue
+            break
+        print(f"  ❌ {name} -> submission failed. STDOUT: {out.strip()}, STDERR: {err.strip()}")
+        return None
+
+    async def ingest(self, name: str, backtest_id: str, params: dict, payload: dict) -> None:
+        stats = extract_statistics(payload)
+        fields = fitness_fields(stats)
+        if self.db is not None:
+            from firestore_db import server_timestamp
+            doc = {"name": payload.get("name", name), "createdAt": server_timestamp(),
+                   "statistics": stats, "params": params, **fields}
+            await asyncio.to_thread(self.db.collection(COLL).document(backtest_id).set, doc)
+        self.cache.put(params, backtest_id, stats)
+        cand = ranking.Candidate(backtest_id, {**fields["metrics"], "fitness": fields["fitness"]},
+                                 stats, params)
+        if self.elites.add(cand):
+            print(f"🌟 {name} joins the elites ({FITNESS} {cand.score:.3f})")
+
+    async def step(self) -> None:
+        """Breed, submit, wait for and ingest one child."""
+        params = self.breed()
+        if params is None:
+            if not self.in_flight:
+                print("🏁 No fresh child left: every candidate is already cached")
+                self.stopping.set()
+            else:                                   # an in-flight back-test may free a key
+                await asyncio.sleep(BACKOFF)
+            return
+        key = param_hash(params)
+        self.in_flight.add(key)
+        self.submitted += 1
+        name = f"ss_{self.submitted:05d}_{key[:8]}"
+        t0 = time.monotonic()
+        try:
+            backtest_id = await self.submit(name, params)
+            if backtest_id is None:
+                self.failed += 1
+                return
+            self.cache.remember(params, backtest_id)
+            await self.poller.watch(name, backtest_id)
+            payload = self.payloads.pop(name, None)
+            if self.poller.results.pop(name, None) == "Completed" and payload:
+                await self.ingest(name, backtest_id, params, payload)
+                self.completed += 1
+            else:
+                self.failed += 1
+        finally:
+            self.busy += time.monotonic() - t0
+            self.in_flight.discard(key)
+            shutil.rmtree(self.work_dir / name, ignore_errors=True)
+
+    async def slot(self) -> None:
+        while self.budget_left():
+            try:
+                await self.step()
+            except Exception as exc:                # one bad child must not take its node down
+                self.failed += 1
+                print(f"  ❌ slot iteration failed: {type(exc).__name__}: {exc}")
+                await asyncio.sleep(BACKOFF)
+
+    # ── snapshots ─────────────────────────────────────────────────────────
+    def snapshot(self) -> None:
+        if self.elites.best is not None:
+            ranking.write_champion(self.elites.best, FITNESS, keep_better=True)
+            ranking.write_survivors(self.elites.items)
+        best = f"{self.elites.best.score:.3f}" if self.elites.best else "n/a"
+        print(f"📸 {self.completed} done / {self.submitted} submitted, {self.failed} failed, "
+              f"best {best}, node utilisation {self.utilisation():.0%}")
+
+    async def snapshots(self, every: float) -> None:
+        while True:
+            await asyncio.sleep(every)
+            self.snapshot()
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        slots = [asyncio.create_task(self.slot()) for _ in range(self.slots)]
+
+        def on_signal():
+            if self.stopping.is_set():
+                print("🛑 Second signal: abandoning in-flight back-tests")
+                for t in slots:
+                    t.cancel()
+            else:
+                print("🛑 Stopping: no new submissions, waiting for in-flight back-tests")
+                self.stopping.set()
+
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, on_signal)
+        ticker = asyncio.create_task(self.snapshots(SNAPSHOT_EVERY))
+        try:
+            for result in await asyncio.gather(*slots, return_exceptions=True):
+                if isinstance(result, BaseException) and not isinstance(result, asyncio.CancelledError):
+                    raise result
+        finally:
+            ticker.cancel()
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                loop.remove_signal_handler(sig)
+            self.snapshot()
+
+
+def main(argv: list[str]):
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--slots", type=int, default=MAX_IN_FLIGHT)
+    ap.add_argument("--max-evals", type=int, default=MAX_EVALS)
+    ap.add_argument("--duration", type=float, default=DURATION)
+    args = ap.parse_args(argv)
+
+    lean = shutil.which("lean")
+    if not lean:
+        sys.exit("❌ Critical Error: 'lean' executable not found.")
+    if not (os.getenv("QC_USER_ID") and os.getenv("QC_API_TOKEN")):
+        sys.exit("❌ Required QuantConnect secrets QC_USER_ID / QC_API_TOKEN not set.")
+    try:
+        import firestore_db
+        db = firestore_db.client()
+    except Exception as exc:
+        print(f"⚠️  Firestore unavailable ({exc}); results go to the fitness cache only")
+        db = None
+
+    seeds = load_parents(ROOT / "survivors.json")
+    if not seeds and (ROOT / "parent_params.json").exists():
+        seeds = [json.loads((ROOT / "parent_params.json").read_text())]
+    seeds = seeds or GENOME.to_dicts(GENOME.sample(1))
+
+    driver = Driver(args.slots, Elites(), seeds, lean, args.max_evals, args.duration, db)
+    print(f"♻️  Steady-state evolution on {args.slots} slots from {len(seeds)} seed(s)")
+    asyncio.run(driver.run())
+    print(f"🏁  {driver.completed} back-tests ingested in {time.monotonic() - driver.started:.0f}s, "
+          f"node utilisation {driver.utilisation():.0%}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -3,19 +3,39 @@
 store_results.py
 Reads `backtests.json` to get a list of backtest IDs, fetches the full
 results for each from the QuantConnect API, and pushes them to Google Firestore.
+Finished statistics are also written to the fitness cache so identical params
+are never back-tested twice – only once Firestore has acknowledged the write,
+so a failed write never leaves a cache hit pointing at a missing document.
+
+Ingestion is pipelined: a thread pool fetches results (at most
+FETCH_WORKERS × 2 in memory at once) and each finished fetch is handed
+straight to a Firestore BulkWriter, so total time approaches the slowest
+fetch rather than the sum. A failed fetch or write only drops that document.
+Results wait_backtests.py already saw complete come from the shared
+response cache (response_cache.py) instead of the network.
+
+Each document carries typed `fitness` / `metrics.*` fields and the
+`generation` / `runId` tags the selectors query on (see fitness.py).
 """
 import json
 import os
 import sys
+import threading
 import time
-import requests
-import hashlib
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
-from google.cloud import firestore
+
+import firestore_db, telemetry
+from fitness import COLL, current_generation, extract_statistics, fitness_fields
+from fitness_cache import FitnessCache
+from qc_api import QCApiError, QCClient
 
 # --- Settings ---
 BACKTESTS_FILE_PATH = Path("backtests.json")
 PARAMS_DIR = Path(".tmp_children")
+FETCH_WORKERS = int(os.getenv("FETCH_WORKERS", 16))
+WRITE_RETRIES = 3
+GENERATION = current_generation()
 
 # --- Grab QC secrets ---
 try:
@@ -24,81 +44,142 @@ try:
 except KeyError as missing:
     print(f"❌ Required QuantConnect secret not set: {missing.args[0]} (Set in GitHub Secrets)")
     sys.exit(1)
+qc = QCClient(QC_USER_ID, QC_API_TOKEN)
 
 # --- Firestore auth ---
 try:
-    GCP_SA_KEY_JSON = os.environ["GCP_SA_KEY"]
-    with open("gcp_key.json", "w") as fh:
-        fh.write(GCP_SA_KEY_JSON)
-    os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = "gcp_key.json"
-    db = firestore.Client()
+    db = firestore_db.client()
     print("✅ Firestore ready")
-except KeyError as missing:
-    print(f"❌ Required env var not set: {missing.args[0]}")
-    sys.exit(1)
 except Exception as exc:
     print(f"❌ Firestore auth failed: {exc}")
     sys.exit(1)
 
 def get_backtest_results(backtest_id: str) -> dict:
     """Fetches a single backtest result from the QC API."""
-    timestamp = str(int(time.time()))
-    signature = hashlib.sha256(f"{QC_API_TOKEN}:{timestamp}".encode()).hexdigest()
-    headers = {"Accept": "application/json", "Timestamp": timestamp}
-    auth = (QC_USER_ID, signature)
-    
-    response = requests.post(
-        "https://www.quantconnect.com/api/v2/backtests/read",
-        json={"backtestId": backtest_id},
-        headers=headers,
-        auth=auth,
-    )
-    if response.status_code != 200:
-        print(f"  -> Failed to fetch {backtest_id}: {response.text}")
+    try:
+        data = qc.read_backtest(backtest_id)
+    except QCApiError as exc:
+        print(f"  -> Failed to fetch {backtest_id}: {exc}")
         return None
-        
-    data = response.json()
+
     if not data.get("success"):
         print(f"  -> API call for {backtest_id} unsuccessful: {data}")
         return None
-        
-    return data
-
-# --- Main Logic ---
-if not BACKTESTS_FILE_PATH.exists():
-    print(f"🤷 {BACKTESTS_FILE_PATH} not found. Nothing to store.")
-    sys.exit(0)
 
-with open(BACKTESTS_FILE_PATH) as f:
-    backtests_to_fetch = json.load(f)
-
-print(f"Found {len(backtests_to_fetch)} backtests to process.")
-
-for child_id, backtest_id in backtests_to_fetch.items():
-    print(f"--- Processing {child_id} (ID: {backtest_id}) ---")
-    results_json = get_backtest_results(backtest_id)
-    if not results_json:
-        continue
+    return data
 
-    # Load the parameters used for this specific run
+def load_params(child_id: str) -> dict:
+    """Load the parameters used for this specific run."""
     params_path = PARAMS_DIR / child_id / "params.json"
     try:
         with open(params_path) as f:
-            params = json.load(f)
+            return json.load(f)
     except FileNotFoundError:
         print(f"  -> WARNING: Could not find params file at {params_path}")
-        params = {}
+        return {}
 
-    # Structure the payload for Firestore
+def fetch(child_id: str, backtest_id: str):
+    """Fetch stage: returns (backtest_id, payload) or None on failure."""
+    with telemetry.span("fetch", child=child_id):
+        results_json = get_backtest_results(backtest_id)
+    if not results_json:
+        return None
+    statistics = extract_statistics(results_json)
     payload = {
         "name": results_json.get("name", "Unnamed Backtest"),
-        "createdAt": firestore.SERVER_TIMESTAMP,
-        "statistics": results_json.get("statistics", {}),
+        "createdAt": firestore_db.server_timestamp(),
+        "statistics": statistics,
         "charts": results_json.get("charts", {}),
-        "params": params  # Include the parameters that generated this result
+        "params": load_params(child_id),  # Include the parameters that generated this result
+        **fitness_fields(statistics, GENERATION),
     }
+    return backtest_id, payload
+
+class WriteStats:
+    """Counters updated from BulkWriter callback threads; acknowledged writes
+    are recorded in the fitness cache."""
+    def __init__(self, cache: FitnessCache):
+        self.lock = threading.Lock()
+        self.written = self.failed = 0
+        self.cache = cache
+        self.pending: dict[str, tuple[dict, dict]] = {}   # backtest_id → (params, statistics)
+
+    def expect(self, backtest_id: str, params: dict, statistics: dict):
+        if params:
+            with self.lock:
+                self.pending[backtest_id] = (params, statistics)
+
+    def on_result(self, reference, result, bulk_writer):
+        with self.lock:
+            self.written += 1
+            entry = self.pending.pop(reference.id, None)
+            if entry:
+                self.cache.put(entry[0], reference.id, entry[1])
+        telemetry.count("firestore_writes")
+
+    def on_error(self, error, bulk_writer) -> bool:
+        retry = error.attempts < WRITE_RETRIES
+        telemetry.count("firestore_write_retries" if retry else "firestore_write_failures")
+        if not retry:
+            with self.lock:
+                self.failed += 1
+                self.pending.pop(error.operation.reference.id, None)
+            print(f"  -> Write failed for {error.operation.reference.id}: {error.message}")
+        return retry
+
+def main():
+    if not BACKTESTS_FILE_PATH.exists():
+        print(f"🤷 {BACKTESTS_FILE_PATH} not found. Nothing to store.")
+        sys.exit(0)
+
+    with open(BACKTESTS_FILE_PATH) as f:
+        backtests_to_fetch = json.load(f)
+
+    print(f"Found {len(backtests_to_fetch)} backtests to process (generation {GENERATION}).")
+    cache = FitnessCache()
+    stats = WriteStats(cache)
+    writer = db.bulk_writer()
+    writer.on_write_result(stats.on_result)
+    writer.on_write_error(stats.on_error)
+    coll = db.collection(COLL)
+
+    started = time.monotonic()
+    fetched = fetch_failed = 0
+    todo = iter(backtests_to_fetch.items())
+    with ThreadPoolExecutor(FETCH_WORKERS) as pool:
+        in_flight = set()
+        while True:
+            # keep the fetch window full without holding more than 2×workers payloads
+            for child_id, backtest_id in todo:
+                in_flight.add(pool.submit(fetch, child_id, backtest_id))
+                if len(in_flight) >= FETCH_WORKERS * 2:
+                    break
+            if not in_flight:
+                break
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for fut in done:
+                try:
+                    item = fut.result()
+                except Exception as exc:          # isolate unexpected per-doc failures
+                    print(f"  -> Fetch crashed: {exc}")
+                    item = None
+                if item is None:
+                    fetch_failed += 1
+                    continue
+                backtest_id, payload = item
+                fetched += 1
+                stats.expect(backtest_id, payload["params"], payload["statistics"])
+                writer.set(coll.document(backtest_id), payload)
+    with telemetry.span("firestore_flush"):
+        writer.close()
 
-    print(f"  -> Uploading document {backtest_id}…")
-    db.collection("backtest_results").document(backtest_id).set(payload)
+    elapsed = time.monotonic() - started
+    rate = stats.written / elapsed if elapsed else 0.0
+    print(f"\n✅ Ingested {stats.written}/{len(backtests_to_fetch)} backtests in {elapsed:.1f}s "
+          f"({rate:.1f} docs/s); fetched {fetched}, {fetch_failed} fetch failures, "
+          f"{stats.failed} write failures.")
+    print(cache.report())
+    print(qc.report())
 
-print("\n✅ Successfully processed all backtests.")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""
+Tree-structured Parzen Estimator (TPE) proposer for algo_gen.py.
+
+Random mutation ignores every back-test already paid for. TPE fits two
+densities per schema field over historical (params, fitness) pairs:
+
+    l(x)  – Parzen estimate over the best GAMMA·√n of the n past results
+    g(x)  – the same over the rest
+
+draws N_CANDIDATES samples from l and keeps the one maximising l(x)/g(x),
+which is proportional to expected improvement under TPE's model. Choice
+fields use smoothed categorical counts, int/float fields Gaussian
+kernels clipped to the [min, max] range (ints rounded, `step` honoured).
+
+Batches stay diverse with the "constant liar": each accepted proposal is
+added to the bad set before the next draw, so later proposals move away
+from it, and exact duplicates of the history or batch are rejected.
+
+    tpe = TPE(SCHEMA).fit(history)       # [(params, fitness), ...]
+    children = tpe.propose(5)
+"""
+
+from __future__ import annotations
+import json, math
+from typing import Iterable, Iterator
+
+import numpy as np
+
+GAMMA = 0.25            # good set size = GAMMA·√n (hyperopt's rule), capped at MAX_GOOD
+MAX_GOOD = 25
+N_CANDIDATES = 64       # samples drawn from l(x) per proposal
+MIN_HISTORY = 10        # below this proposals are drawn from the uniform prior
+PRIOR_WEIGHT = 1.0      # weight of the uniform prior component
+EXPLORE = 0.1           # share of proposals drawn from the prior to escape local optima
+MIN_BANDWIDTH = 0.05    # kernel width floor, as a fraction of the field's range
+
+
+def _key(params: dict) -> str:
+    return json.dumps(params, sort_keys=True)
+
+
+class _Numeric:
+    def __init__(self, spec: dict):
+        self.lo, self.hi = float(spec["min"]), float(spec["max"])
+        self.is_int = spec["type"] == "int"
+        self.step = spec.get("step")
+
+    def _unit(self, v) -> float:
+        return (float(v) - self.lo) / ((self.hi - self.lo) or 1.0)
+
+    def fit(self, values: list) -> tuple[np.ndarray, float]:
+        mu = np.array([self._unit(v) for v in values], float)
+        if not len(mu):
+            return mu, 1.0
+        # Scott's rule, floored so a tight cluster still explores its neighbourhood
+        bw = 1.06 * (mu.std() if len(mu) > 1 else 1.0) * len(mu) ** -0.2
+        return mu, max(bw, MIN_BANDWIDTH)
+
+    def sample(self, model, n: int, rng) -> np.ndarray:
+        mu, bw = model
+        w = np.r_[np.ones(len(mu)), PRIOR_WEIGHT]
+        comp = rng.choice(len(w), size=n, p=w / w.sum())
+        u = np.where(comp == len(mu), rng.random(n),
+                     rng.normal(np.r_[mu, 0.0][comp], bw))
+        return np.clip(u, 0.0, 1.0)
+
+    def logpdf(self, model, u: np.ndarray) -> np.ndarray:
+        mu, bw = model
+        if not len(mu):
+            return np.zeros_like(u)
+        k = np.exp(-0.5 * ((u[:, None] - mu[None, :]) / bw) ** 2) / (bw * math.sqrt(2 * math.pi))
+        return np.log((k.sum(axis=1) + PRIOR_WEIGHT) / (len(mu) + PRIOR_WEIGHT))
+
+    def decode(self, u: float):
+        v = self.lo + float(u) * (self.hi - self.lo)
+        if self.step:
+            v = self.lo + round((v - self.lo) / self.step) * self.step
+        if self.is_int:
+            return int(round(min(max(v, self.lo), self.hi)))
+        return round(min(max(v, self.lo), self.hi), 4)
+
+
+class _Choice:
+    def __init__(self, spec: dict):
+        self.values = list(spec["values"])
+
+    def fit(self, values: list) -> np.ndarray:
+        counts = np.full(len(self.values), PRIOR_WEIGHT)
+        for v in values:
+            if v in self.values:
+                counts[self.values.index(v)] += 1
+        return counts / counts.sum()
+
+    def sample(self, model, n: int, rng) -> np.ndarray:
+        return rng.choice(len(self.values), size=n, p=model).astype(float)
+
+    def logpdf(self, model, u: np.ndarray) -> np.ndarray:
+        return np.log(model[u.astype(int)])
+
+    def decode(self, u: float):
+        return self.values[int(u)]
+
+
+class TPE:
+    def __init__(self, schema: dict, gamma: float = GAMMA,
+                 n_candidates: int = N_CANDIDATES, seed: int | None = None):
+        self.fields = {name: (_Choice(spec) if spec["type"] == "choice" else _Numeric(spec))
+                       for name, spec in schema.items()}
+        self.gamma, self.n_candidates = gamma, n_candidates
+        self.rng = np.random.default_rng(seed)
+        self.good: list[dict] = []
+        self.bad: list[dict] = []
+        self.seen: set[str] = set()
+        self.n_history = 0
+
+    def fit(self, history: Iterable[tuple[dict, float]]) -> "TPE":
+        pairs = [(p, f) for p, f in history if f is not None and math.isfinite(f)]
+        pairs.sort(key=lambda t: t[1], reverse=True)
+        n_good = min(max(1, math.ceil(self.gamma * math.sqrt(len(pairs)))), MAX_GOOD) if pairs else 0
+        self.good = [p for p, _ in pairs[:n_good]]
+        self.bad = [p for p, _ in pairs[n_good:]]
+        self.seen = {_key(self._project(p)) for p, _ in pairs}
+        self.n_history = len(pairs)
+        return self
+
+    def _project(self, params: dict) -> dict:
+        return {f: params[f] for f in self.fields if f in params}
+
+    def _models(self, group: list[dict]) -> dict:
+        return {name: field.fit([p[name] for p in group if name in p
+                                 and (not isinstance(field, _Choice) or p[name] in field.values)])
+                for name, field in self.fields.items()}
+
+    def propose(self, n: int, base: dict | None = None) -> list[dict]:
+        """n diverse proposals; `base` supplies fields outside the schema.
+
+        Below MIN_HISTORY observations samples come from the uniform prior
+        (space-filling start-up) rather than from a model fitted on noise;
+        after that an EXPLORE share still does, so a choice field that
+        happened to dominate the good set early cannot lock the search in.
+        """
+        warm = self.n_history >= MIN_HISTORY
+        batch: list[dict] = []
+        bad = list(self.bad)
+        good_models = self._models(self.good)
+        prior = self._models([])
+        for _ in range(n):
+            explore = not warm or self.rng.random() < EXPLORE
+            models = prior if explore else good_models
+            samples = {name: f.sample(models[name], self.n_candidates, self.rng)
+                       for name, f in self.fields.items()}
+            score = np.zeros(self.n_candidates)
+            if not explore:
+                bad_models = self._models(bad)
+                for name, f in self.fields.items():
+                    score += (f.logpdf(good_models[name], samples[name])
+                              - f.logpdf(bad_models[name], samples[name]))
+            for i in np.argsort(-score, kind="stable"):
+                child = {**(base or {}),
+                         **{name: f.decode(samples[name][i]) for name, f in self.fields.items()}}
+                key = _key(self._project(child))
+                if key not in self.seen:
+                    break
+            self.seen.add(key)
+            batch.append(child)
+            bad.append(child)                         # constant liar: push the next draw away
+        return batch
+
+
+def load_history(source: str = "warehouse", fitness: str = "fitness") -> Iterator[tuple[dict, float]]:
+    """(params, fitness) pairs from the warehouse or the Firestore collection."""
+    import ranking
+    fn = ranking.resolve(fitness)
+    if source == "warehouse":
+        from warehouse import Warehouse
+        rows = Warehouse().rows()
+    else:
+        import firestore_db
+        from fitness import COLL, PROJECTION
+        rows = firestore_db.client().collection(COLL).select(PROJECTION).stream()
+    for row in rows:
+        cand = ranking.Candidate.from_doc(row.id, row.to_dict())
+        if not cand.params:
+            continue
+        try:
+            yield cand.params, fn(cand.metrics)
+        except (KeyError, ValueError, ZeroDivisionError, OverflowError):
+            continue
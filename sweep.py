@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Exhaustive FAST×SLOW grid sweep of ema_cross_strategy over the whole
+parameter_schema.json space (46 fast × 141 slow × 4 symbols ≈ 26k points).
+
+Per symbol the EMA of every period is computed once (prescreen.ema_table);
+every (fast, slow) pair is then simulated as one params×time array pass
+with prescreen.simulate, so statistics match the pre-screen and main.py's
+window: one year ending TODAY, in-sample up to TRAINING_END, 60-day OOS.
+
+Outputs:
+    sweep.csv       one row per (symbol, fast, slow) – long format, pivot
+                    any metric into a heatmap
+    sweep.npz       the same as (symbol, fast, slow) cubes + axes
+    sweep_top.json  top-K by fitness in survivors.json shape, so
+                    `algo_gen.py --parents sweep_top.json` seeds the GA
+
+Env vars:
+    LEAN_DATA_DIR – Lean data root (default ./data)
+    SWEEP_TOP_K   – size of the seed list (default 20)
+"""
+
+from __future__ import annotations
+import argparse, csv, json, os, pathlib, sys, time
+
+import numpy as np
+
+from genome import load_schema
+from prescreen import STRATEGY, ema_table, fitness, load_daily_bars, simulate, START, TODAY
+
+ROOT   = pathlib.Path(__file__).resolve().parent
+TOP_K  = int(os.getenv("SWEEP_TOP_K", 20))
+CHUNK  = 2048               # pairs simulated per pass, bounds peak memory
+METRICS = ["fitness", "sharpeRatio", "drawdown", "netProfit",
+           "isSharpeRatio", "isNetProfit", "oosNetProfit", "trades"]
+
+
+def axis(spec: dict) -> np.ndarray:
+    return np.arange(spec["min"], spec["max"] + 1, spec.get("step", 1))
+
+
+def sweep_symbol(symbol: str, fast: np.ndarray, slow: np.ndarray) -> dict[str, np.ndarray]:
+    """Every METRIC as a (len(fast), len(slow)) grid for one symbol."""
+    dates, close = load_daily_bars(symbol)
+    periods = np.union1d(fast, slow)
+    table = ema_table(close, periods)
+    # only the back-test window matters once the EMAs are warmed up
+    window = (dates >= np.datetime64(START, "D")) & (dates <= np.datetime64(TODAY, "D"))
+    dates, close, table = dates[window], close[window], table[:, window]
+    fi = np.searchsorted(periods, fast)
+    si = np.searchsorted(periods, slow)
+    pf, ps = (g.ravel() for g in np.meshgrid(fi, si, indexing="ij"))
+
+    out = {m: np.empty(pf.size) for m in METRICS}
+    for lo in range(0, pf.size, CHUNK):
+        sl = slice(lo, lo + CHUNK)
+        stats = simulate(dates, close, table[pf[sl]], table[ps[sl]])
+        stats["fitness"] = fitness(stats)
+        for m in METRICS:
+            out[m][sl] = stats[m]
+    return {m: v.reshape(fast.size, slow.size) for m, v in out.items()}
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--schema", default=ROOT / "parameter_schema.json")
+    ap.add_argument("--top", type=int, default=TOP_K)
+    ap.add_argument("--out", default="sweep")
+    args = ap.parse_args()
+
+    schema = load_schema(args.schema)
+    fast, slow = axis(schema["FAST_PERIOD"]), axis(schema["SLOW_PERIOD"])
+    symbols = schema["SYMBOL"]["values"]
+
+    t0 = time.perf_counter()
+    cubes = {m: np.full((len(symbols), fast.size, slow.size), np.nan) for m in METRICS}
+    for s, symbol in enumerate(symbols):
+        try:
+            grids = sweep_symbol(symbol, fast, slow)
+        except (FileNotFoundError, KeyError, ValueError) as exc:
+            print(f"⚠️  no daily bars for {symbol} ({exc}); skipped")
+            continue
+        for m in METRICS:
+            cubes[m][s] = grids[m]
+    elapsed = time.perf_counter() - t0
+    points = int(np.isfinite(cubes["fitness"]).sum())
+    print(f"🧮  Swept {points} points in {elapsed:.2f}s")
+
+    base = ROOT / args.out
+    np.savez_compressed(base.with_suffix(".npz"), symbols=np.array(symbols),
+                        fast=fast, slow=slow, **cubes)
+    sym, f, sl = (g.ravel() for g in np.meshgrid(np.arange(len(symbols)), fast, slow,
+                                                  indexing="ij"))
+    flat = {m: cubes[m].ravel() for m in METRICS}
+    with open(base.with_suffix(".csv"), "w", newline="") as fh:
+        w = csv.writer(fh)
+        w.writerow(["SYMBOL", "FAST_PERIOD", "SLOW_PERIOD", *METRICS])
+        for i in np.flatnonzero(np.isfinite(flat["fitness"])):
+            w.writerow([symbols[sym[i]], f[i], sl[i],
+                        *(round(float(flat[m][i]), 6) for m in METRICS)])
+
+    order = np.argsort(-np.nan_to_num(flat["fitness"], nan=-np.inf), kind="stable")
+    top = [{
+        "id": f"sweep_{symbols[sym[i]]}_{f[i]}_{sl[i]}",
+        "score": round(float(flat["fitness"][i]), 6),
+        "params": {"STRATEGY_MODULE": STRATEGY, "SYMBOL": symbols[sym[i]],
+                   "FAST_PERIOD": int(f[i]), "SLOW_PERIOD": int(sl[i])},
+        "metrics": {m: round(float(flat[m][i]), 6) for m in METRICS if m != "fitness"},
+    } for i in order[:min(args.top, points)]]
+    pathlib.Path(f"{base}_top.json").write_text(json.dumps(top, indent=2))
+    print(f"🏆  Top {len(top)} written to {base.name}_top.json; "
+          f"heatmap table {base.name}.csv / {base.name}.npz")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
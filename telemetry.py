@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Lightweight pipeline instrumentation: spans, counters and histograms.
+
+Every pipeline script imports this module and records what it does:
+
+    with telemetry.span("lean_submit", child=child_id):   # timed span → histogram
+        ...
+    telemetry.count("firestore_writes")                   # counter
+    telemetry.observe("qc_api_latency_seconds", dt)       # histogram sample
+
+Nothing is sent anywhere at record time. At process exit (or flush()) a
+process with any records:
+
+  * appends its events as JSON lines to TELEMETRY_DIR/<generation>.jsonl,
+    one file per generation shared by all pipeline steps, plus a `stage`
+    span covering the whole process (stage = script name)
+  * writes TELEMETRY_DIR/<stage>.prom in Prometheus text format (counters,
+    histograms with fixed buckets) for node_exporter's textfile collector
+
+`python telemetry.py report [generation]` rebuilds the generation from
+the JSON lines: wall time per stage, top spans within each, and the
+critical path – the stages in order, and inside the back-test phase the
+slowest child's submit → queue → run → fetch chain.
+
+Env vars:
+    TELEMETRY      – 0 disables recording (default 1)
+    TELEMETRY_DIR  – output directory (default ./.telemetry)
+"""
+
+from __future__ import annotations
+import atexit, bisect, collections, contextlib, json, os, pathlib, sys, threading, time
+
+ROOT    = pathlib.Path(__file__).resolve().parent
+ENABLED = os.getenv("TELEMETRY", "1") != "0"
+OUT_DIR = pathlib.Path(os.getenv("TELEMETRY_DIR", ROOT / ".telemetry"))
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+FLUSH_AT = 5000                 # buffered events before an early JSON-lines flush
+INF_LABEL = 'le="+Inf"'
+
+_lock = threading.Lock()
+_events: list[dict] = []
+_counters: dict[tuple, float] = collections.defaultdict(float)
+_histograms: dict[tuple, list] = {}                 # key → [buckets…, overflow, sum, count]
+_started = time.time()
+_recorded = False
+
+
+def stage_name() -> str:
+    return pathlib.Path(sys.argv[0]).stem or "python"
+
+
+def _key(name: str, labels: dict) -> tuple:
+    return (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+
+
+def _emit(event: dict) -> None:
+    global _recorded
+    _recorded = True
+    _events.append(event)
+    if len(_events) >= FLUSH_AT:
+        _write_events()
+
+
+# ── recording ──────────────────────────────────────────────────────────────
+def count(name: str, n: float = 1, **labels) -> None:
+    if not ENABLED:
+        return
+    global _recorded
+    with _lock:
+        _counters[_key(name, labels)] += n
+        _recorded = True
+
+
+def observe(name: str, value: float, **labels) -> None:
+    """Histogram sample (seconds, bytes, …)."""
+    if not ENABLED:
+        return
+    global _recorded
+    with _lock:
+        h = _histograms.setdefault(_key(name, labels), [0] * (len(BUCKETS) + 3))
+        h[bisect.bisect_left(BUCKETS, value)] += 1
+        h[-2] += value
+        h[-1] += 1
+        _recorded = True
+
+
+def record_span(name: str, start: float, end: float, **labels) -> None:
+    """Span with explicit wall-clock bounds (epoch seconds)."""
+    if not ENABLED:
+        return
+    observe(f"{name}_seconds", end - start, **{k: v for k, v in labels.items() if k != "child"})
+    with _lock:
+        _emit({"type": "span", "name": name, "stage": stage_name(), "start": start,
+               "end": end, "duration": end - start, **labels})
+
+
+@contextlib.contextmanager
+def span(name: str, **labels):
+    start = time.time()
+    try:
+        yield
+    finally:
+        record_span(name, start, time.time(), **labels)
+
+
+# ── export ─────────────────────────────────────────────────────────────────
+def _write_events() -> None:
+    """Caller holds _lock."""
+    if not _events:
+        return
+    from fitness import current_generation
+    OUT_DIR.mkdir(parents=True, exist_ok=True)
+    with open(OUT_DIR / f"{current_generation()}.jsonl", "a") as f:
+        f.writelines(json.dumps(e, default=str) + "\n" for e in _events)
+    _events.clear()
+
+
+def _labels(pairs: tuple, extra: str = "") -> str:
+    items = [f'{k}="{v}"' for k, v in pairs] + ([extra] if extra else [])
+    return "{" + ",".join(items) + "}" if items else ""
+
+
+def prometheus() -> str:
+    lines, seen = [], set()
+    for (name, labels), value in sorted(_counters.items()):
+        metric = f"evolve_{name}_total"
+        if metric not in seen:
+            lines.append(f"# TYPE {metric} counter")
+            seen.add(metric)
+        lines.append(f"{metric}{_labels(labels)} {value:g}")
+    for (name, labels), h in sorted(_histograms.items()):
+        metric = f"evolve_{name}"
+        if metric not in seen:
+            lines.append(f"# TYPE {metric} histogram")
+            seen.add(metric)
+        cumulative = 0
+        for bound, n in zip(BUCKETS, h):
+            cumulative += n
+            le = 'le="%g"' % bound
+            lines.append(f"{metric}_bucket{_labels(labels, le)} {cumulative}")
+        lines.append(f"{metric}_bucket{_labels(labels, INF_LABEL)} {h[-1]}")
+        lines.append(f"{metric}_sum{_labels(labels)} {h[-2]:g}")
+        lines.append(f"{metric}_count{_labels(labels)} {h[-1]}")
+    return "\n".join(lines) + "\n"
+
+
+def flush(final: bool = False) -> None:
+    if not (ENABLED and _recorded):
+        return
+    if final:
+        record_span("stage", _started, time.time())
+    with _lock:
+        if final:                                   # counter totals once, at exit
+            for (name, labels), value in list(_counters.items()):
+                _emit({"type": "counter", "name": name, "stage": stage_name(), "value": value,
+                       **dict(labels)})
+        _write_events()
+        OUT_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = OUT_DIR / f".{stage_name()}.prom.{os.getpid()}"
+        tmp.write_text(prometheus())
+        tmp.replace(OUT_DIR / f"{stage_name()}.prom")   # textfile collector never sees partial files
+
+
+atexit.register(flush, final=True)
+
+
+# ── report ─────────────────────────────────────────────────────────────────
+def load(generation: str) -> list[dict]:
+    path = OUT_DIR / f"{generation}.jsonl"
+    return [json.loads(line) for line in path.read_text().splitlines() if line.strip()]
+
+
+def report(events: list[dict]) -> str:
+    spans = [e for e in events if e["type"] == "span"]
+    stages = sorted((e for e in spans if e["name"] == "stage"), key=lambda e: e["start"])
+    if not stages:
+        return "🤷 No stage spans recorded."
+    t0 = stages[0]["start"]
+    total = max(e["end"] for e in stages) - t0
+    out = [f"⏱️  {len(stages)} stages over {total:.1f}s wall"]
+
+    for st in stages:
+        inner = collections.defaultdict(list)
+        for e in spans:
+            if e["stage"] == st["stage"] and e["name"] != "stage" and st["start"] <= e["start"] <= st["end"]:
+                inner[e["name"]].append(e["duration"])
+        share = st["duration"] / total if total else 0.0
+        out.append(f"  {st['stage']:<24} +{st['start'] - t0:7.1f}s  {st['duration']:8.1f}s  {share:5.0%}")
+        for name, ds in sorted(inner.items(), key=lambda kv: -sum(kv[1]))[:4]:
+            out.append(f"      {name:<20} n={len(ds):<5} total {sum(ds):8.1f}s  max {max(ds):7.2f}s")
+
+    counters = collections.defaultdict(float)
+    for e in events:
+        if e["type"] == "counter":
+            counters[e["name"]] += e["value"]
+    if counters:
+        out.append("  counters: " + ", ".join(f"{k}={v:g}" for k, v in sorted(counters.items())))
+
+    # critical path through the back-test phase: the child that finished last
+    per_child = collections.defaultdict(dict)
+    for e in spans:
+        if "child" in e:
+            per_child[e["child"]][e["name"]] = e
+    if per_child:
+        child, parts = max(per_child.items(), key=lambda kv: max(p["end"] for p in kv[1].values()))
+        chain = sorted(parts.values(), key=lambda p: p["start"])
+        out.append(f"  critical child {child}: " + " → ".join(
+            f"{p['name']} {p['duration']:.1f}s" for p in chain))
+    return "\n".join(out)
+
+
+def main(argv: list[str]):
+    global ENABLED
+    ENABLED = False                                  # the report itself is not a stage
+    cmd = argv[0] if argv else "report"
+    if cmd != "report":
+        sys.exit(f"unknown command {cmd!r} (report)")
+    from fitness import current_generation
+    generation = argv[1] if len(argv) > 1 else current_generation()
+    print(f"📊 Generation {generation}")
+    print(report(load(generation)))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,16 @@
+import os, pathlib, sys
+
+import pytest
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("TELEMETRY", "0")             # keep test runs out of .telemetry/
+
+
+@pytest.fixture
+def completed():
+    """Build a completed backtests/read response with the given Sharpe ratio."""
+    def make(sharpe: float) -> dict:
+        return {"success": True, "backtest": {
+            "status": "Completed", "statistics": {"Sharpe Ratio": f"{sharpe}", "Drawdown": "1%"}}}
+    return make
@@ -0,0 +1,73 @@
+import zipfile
+
+import numpy as np
+
+import bar_store
+
+DAYS = np.arange("2024-01-01", "2024-03-01", dtype="datetime64[D]")
+
+
+def write_bars(data_dir, symbol="spy", shift=0):
+    """Synthetic Lean daily zip: close = 100 + day index (+ shift) dollars."""
+    rows = [f"{str(d).replace('-', '')} 00:00,{(100 + i + shift) * 10_000},"
+            f"{(101 + i + shift) * 10_000},{(99 + i + shift) * 10_000},"
+            f"{(100 + i + shift) * 10_000},{1000 + i}"
+            for i, d in enumerate(DAYS)]
+    path = data_dir / "equity" / "usa" / "daily" / f"{symbol}.zip"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr(f"{symbol}.csv", "\n".join(reversed(rows)))   # unsorted on purpose
+    return path
+
+
+def test_ingest_swaps_a_version_pointer(tmp_path):
+    data, store = tmp_path / "data", tmp_path / "store"
+    write_bars(data)
+
+    path = bar_store.ingest("spy", store, data)
+
+    assert path == store / "SPY" and path.is_symlink()
+    assert path.resolve().parent == store and path.resolve().name.startswith("SPY.")
+    assert not list(store.glob(".*"))                  # no temporary link left behind
+
+
+def test_bars_slices_read_only_views(tmp_path):
+    data, store = tmp_path / "data", tmp_path / "store"
+    write_bars(data)
+
+    full = bar_store.bars("SPY", store_dir=store, data_dir=data)
+    part = bar_store.bars("SPY", "2024-01-10", "2024-01-12", store_dir=store, data_dir=data)
+
+    assert np.array_equal(full.dates, DAYS)
+    assert list(part.close) == [109.0, 110.0, 111.0]
+    assert list(part.volume) == [1009, 1010, 1011]
+    assert np.shares_memory(part.close, full.close) and not part.close.flags.writeable
+
+
+def test_reingest_keeps_open_views_and_prunes_old_versions(tmp_path):
+    data, store = tmp_path / "data", tmp_path / "store"
+    src = write_bars(data)
+    before = bar_store.bars("SPY", store_dir=store, data_dir=data)
+    first = (store / "SPY").resolve()
+
+    for shift in (5, 7):
+        write_bars(data, shift=shift)
+        src.touch()
+        bar_store._open.clear()                        # a fresh process re-checks the source
+        after = bar_store.bars("SPY", store_dir=store, data_dir=data)
+
+    assert after.close[0] == 107.0
+    assert before.close[0] == 100.0                    # mapping of a removed version stays valid
+    versions = sorted(p.name for p in store.glob("SPY.*"))
+    assert len(versions) == 2 and first.name not in versions   # current + previous only
+    assert (store / "SPY").resolve().name in versions
+
+
+def test_legacy_directory_is_replaced_by_pointer(tmp_path):
+    data, store = tmp_path / "data", tmp_path / "store"
+    write_bars(data)
+    (store / "SPY").mkdir(parents=True)                # pre-versioning layout
+
+    path = bar_store.ingest("SPY", store, data)
+
+    assert path.is_symlink() and (path / "meta.json").exists()
@@ -0,0 +1,34 @@
+import json
+
+import pytest
+
+import ranking, result_store
+from fitness import extract_statistics, fitness_fields, metrics, score
+
+RESPONSE = {"success": True, "backtest": {
+    "name": "child_0", "status": "Completed",
+    "statistics": {"Sharpe Ratio": "1.542", "Drawdown": "4.3%", "Net Profit": "12.5%"},
+    "portfolioStatistics": {"sharpeRatio": 1.5413, "drawdown": 0.0431, "totalNetProfit": 0.125},
+    "runtimeStatistics": {"OOS Net Profit": "310.20", "Return": "12.5 %"}}}
+
+
+def test_response_and_summary_give_the_same_statistics():
+    summary = result_store.summarise(RESPONSE)
+    assert extract_statistics(summary) == extract_statistics(RESPONSE)
+    assert extract_statistics(RESPONSE)["OOS Net Profit"] == "310.20"
+
+
+def test_portfolio_statistics_only_when_display_strings_are_missing():
+    numeric = {"backtest": {"portfolioStatistics": {"sharpeRatio": 2.0, "drawdown": 0.1}}}
+    assert metrics(extract_statistics(numeric))["sharpeRatio"] == 2.0
+
+
+def test_stored_doc_and_results_source_rank_alike(tmp_path):
+    result_store.write(tmp_path / "child_0", RESPONSE)
+    (tmp_path / "child_0" / "params.json").write_text(json.dumps({"FAST_PERIOD": 5}))
+    doc = fitness_fields(extract_statistics(RESPONSE))          # what store_results writes
+
+    [candidate] = ranking.results_source(tmp_path)
+
+    assert score(candidate.metrics) == pytest.approx(doc["fitness"])
+    assert candidate.params == {"FAST_PERIOD": 5}
@@ -0,0 +1,39 @@
+import json
+
+import halving, result_store
+
+
+def test_start_then_promote_reads_results_by_backtests_key(tmp_path, completed):
+    children, culled = tmp_path / "children", tmp_path / "culled"
+    children.mkdir()
+    for i in range(3):                                  # scripts/run_parallel_backtests.py children
+        (children / f"child_{i}.json").write_text(json.dumps({"FAST_PERIOD": 5 + i}))
+    for i in range(3, 6):                               # run_backtest.py children
+        (children / f"child_{i}").mkdir()
+        (children / f"child_{i}" / "params.json").write_text(json.dumps({"FAST_PERIOD": 5 + i}))
+    ladder = halving.windows([60, 150, 365])
+
+    state = halving.start(children, culled, ladder, None)
+    assert state == {"rung": 0, "sizes": [6]}
+    assert json.loads((children / "child_0.json").read_text())["START_DATE"] == \
+        ladder[0][0].isoformat()
+
+    # what wait_backtests.py stores: children/<backtests.json key>/
+    keys = {"child_0": 0.1, "child_1": 2.0, "child_2": 0.3,
+            "child_3-1a2b3c": 0.2, "child_4-cached": 1.5, "child_5-0f0f0f": 0.0}
+    for key, sharpe in keys.items():
+        result_store.write(children / key, completed(sharpe))
+    backtests = tmp_path / "backtests.json"
+    backtests.write_text(json.dumps({k: f"bt{i}" for i, k in enumerate(keys)}))
+
+    state = halving.promote(children, culled, ladder, state, eta=3, backtests=backtests)
+
+    assert state == {"rung": 1, "sizes": [6, 2]}
+    assert sorted(p.name for p in culled.iterdir()) == \
+        ["child_0.json", "child_2.json", "child_3", "child_5"]
+    assert json.loads((children / "child_1.json").read_text())["START_DATE"] == \
+        ladder[1][0].isoformat()
+    assert json.loads((children / "child_4" / "params.json").read_text())["START_DATE"] == \
+        ladder[1][0].isoformat()
+    # stale rung-0 results are gone so the next promote only sees rung 1
+    assert not any(result_store.exists(children / key) for key in keys)
@@ -0,0 +1,65 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+import islands, prescreen
+from islands import FileStore, IslandConfig, QueueStore
+
+N = 3
+
+
+def synthetic_fitness(params):
+    """Single peak at FAST 20 / SLOW 100 on GLD, no market data needed."""
+    return np.array([-abs(int(p["FAST_PERIOD"]) - 20) - abs(int(p["SLOW_PERIOD"]) - 100) / 4
+                     + (p["SYMBOL"] == "GLD") for p in params], dtype=float)
+
+
+def run_ring(store, migrate_every, generations=12):
+    cfgs = [IslandConfig(i, rate=0.3, mode="uniform", seed=i) for i in range(N)]
+    with ThreadPoolExecutor(N) as pool:              # islands block on each other's migrants
+        futures = [pool.submit(islands.run_island, cfg, store, N, [], generations=generations,
+                               pop_size=8, migrate_every=migrate_every, migrants=2, timeout=20)
+                   for cfg in cfgs]
+        return [f.result() for f in futures]
+
+
+@pytest.fixture(autouse=True)
+def local_fitness(monkeypatch):
+    monkeypatch.setattr(prescreen, "evaluate", synthetic_fitness)
+
+
+def test_file_store_roundtrip_and_timeout(tmp_path):
+    store = FileStore(tmp_path)
+    store.send(0, 1, 5, [{"params": {"FAST_PERIOD": 9}, "fitness": 1.0}])
+
+    assert store.receive(1, 5, timeout=0) == [{"params": {"FAST_PERIOD": 9}, "fitness": 1.0}]
+    assert not list(tmp_path.glob("to_1/.*"))        # tmp file renamed into place
+    started = time.monotonic()
+    assert store.receive(1, 10, timeout=0.3) == []   # nobody sent: carry on without migrants
+    assert time.monotonic() - started < 2
+
+
+def test_queue_store_holds_early_arrivals():
+    store = QueueStore(2)
+    store.send(0, 1, 10, [{"fitness": 2.0}])           # next round's migrants arrive first
+    store.send(0, 1, 5, [{"fitness": 1.0}])
+
+    assert store.receive(1, 5, timeout=1) == [{"fitness": 1.0}]
+    assert store.receive(1, 10, timeout=0) == [{"fitness": 2.0}]
+
+
+@pytest.mark.parametrize("backend", ["file", "queue"])
+def test_migration_spreads_the_best_around_the_ring(tmp_path, backend):
+    store = FileStore(tmp_path) if backend == "file" else QueueStore(N)
+    isolated = run_ring(FileStore(tmp_path / "isolated"), migrate_every=100)
+    migrating = run_ring(store, migrate_every=1)
+
+    for r in migrating:                              # (μ + λ): an island never gets worse
+        assert r["history"] == sorted(r["history"])
+    peaks = [islands._peak(r["history"]) for r in migrating]
+    assert max(peaks) == min(peaks)                  # every island converged on the global best
+    assert min(peaks) >= max(islands._peak(r["history"]) for r in isolated)
+    best = [max(r["population"], key=lambda ind: ind["fitness"])["params"] for r in migrating]
+    assert all(b == best[0] for b in best)
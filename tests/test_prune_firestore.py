@@ -0,0 +1,88 @@
+import datetime as dt, gzip, json, pathlib, sys
+
+import pytest
+
+import fake_firestore
+from fitness import COLL
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "tools"))
+import prune_firestore
+
+
+@pytest.fixture
+def prune(tmp_path, monkeypatch):
+    module = prune_firestore
+    monkeypatch.setattr(module, "ARCHIVE_DIR", tmp_path / "archive")
+    monkeypatch.setattr(module, "STATE_FILE", tmp_path / "archive" / "prune_state.json")
+    monkeypatch.setattr(module, "PAGE_SIZE", 10)
+    return module
+
+
+def tied_db(groups: int = 3, per_group: int = 10, keep: int = 5) -> fake_firestore.Client:
+    """`groups` batches of victims sharing one createdAt each, plus `keep` recent docs."""
+    db = fake_firestore.Client()
+    coll = db.collection(COLL)
+    old = dt.datetime(2024, 1, 1, tzinfo=dt.timezone.utc)
+    for g in range(groups):
+        for i in range(per_group):
+            coll.document(f"g{g}_{i:02d}").set({"createdAt": old + dt.timedelta(hours=g),
+                                                "charts": {"x": [1, 2]}})
+    now = dt.datetime.now(dt.timezone.utc)
+    for i in range(keep):
+        coll.document(f"new_{i}").set({"createdAt": now})
+    return db
+
+
+def new_state(prune, db, keep_latest=5):
+    cutoff = dt.datetime.now(dt.timezone.utc) - dt.timedelta(days=14)
+    bound = prune.threshold(db.collection(COLL), cutoff, keep_latest)
+    return {"run": "t", "threshold": bound.isoformat(), "seen": 0, "archived": 0,
+            "deleted": 0, "failed": 0, "done": False}
+
+
+def test_tied_timestamps_across_pages_are_all_deleted(prune):
+    db = tied_db()
+    state = prune.prune(db, new_state(prune, db))
+
+    assert state["deleted"] == 30 and state["done"]
+    left = sorted(s.id for s in db.collection(COLL).stream())
+    assert left == [f"new_{i}" for i in range(5)]
+    archived = [json.loads(line)["id"] for part in sorted((prune.ARCHIVE_DIR / "t").iterdir())
+                for line in gzip.open(part, "rt")]
+    assert sorted(archived) == sorted(f"g{g}_{i:02d}" for g in range(3) for i in range(10))
+
+
+def test_dry_run_counts_tied_victims_without_deleting(prune):
+    db = tied_db()
+    state = prune.prune(db, new_state(prune, db), dry_run=True)
+
+    assert state["seen"] == 30 and state["deleted"] == 0
+    assert len(list(db.collection(COLL).stream())) == 35
+
+
+def test_interrupted_run_resumes_from_checkpoint(prune, monkeypatch):
+    db = tied_db()
+    calls = {"n": 0}
+    get_all = db.get_all
+
+    def flaky(refs):
+        calls["n"] += 1
+        if calls["n"] == 2:
+            raise KeyboardInterrupt
+        return get_all(refs)
+
+    monkeypatch.setattr(db, "get_all", flaky)
+    with pytest.raises(KeyboardInterrupt):
+        prune.prune(db, new_state(prune, db))
+    state = prune.load_state()
+    assert state["deleted"] == 10 and not state["done"]
+
+    state = prune.prune(db, state)
+    assert state["deleted"] == 30
+    assert len(list(db.collection(COLL).stream())) == 5
+
+
+def test_below_keep_latest_is_nothing_to_prune(prune):
+    db = tied_db(groups=0)
+    cutoff = dt.datetime.now(dt.timezone.utc)
+    assert prune.threshold(db.collection(COLL), cutoff, 6) is None
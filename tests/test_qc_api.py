@@ -0,0 +1,48 @@
+import pytest
+import requests
+
+import qc_api
+from qc_api import QCApiError, QCClient
+
+
+class FlakySession:
+    """Raises each queued exception in turn, then answers 200 with `body`."""
+    def __init__(self, errors, body=b'{"success": true}'):
+        self.errors, self.body, self.calls = list(errors), body, 0
+
+    def post(self, url, **kwargs):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        resp = requests.Response()
+        resp.status_code, resp._content = 200, self.body
+        return resp
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(qc_api.time, "sleep", lambda s: None)
+    return QCClient("1", "token", rate=1000, max_retries=2)
+
+
+def test_any_requests_exception_is_retried(client):
+    client.session = FlakySession([requests.exceptions.ChunkedEncodingError("cut"),
+                                   requests.exceptions.SSLError("handshake")])
+
+    assert client.post("backtests/read") == {"success": True}
+    assert client.session.calls == 3 and client.retries == 2
+
+
+def test_persistent_failure_raises_qc_api_error(client):
+    client.session = FlakySession([requests.exceptions.ContentDecodingError("gzip")] * 3)
+
+    with pytest.raises(QCApiError, match="ContentDecodingError"):
+        client.post("backtests/read")
+    assert client.failures == 1
+
+
+def test_invalid_json_raises_qc_api_error(client):
+    client.session = FlakySession([], body=b"<html>maintenance</html>")
+
+    with pytest.raises(QCApiError, match="invalid JSON"):
+        client.post("backtests/read")
@@ -0,0 +1,115 @@
+import base64, json, math, os, zlib
+
+import pytest
+import requests
+
+import result_store
+from qc_api import QCClient
+from response_cache import LOW_WATER, ResponseCache
+
+COMPLETED = {"success": True, "backtest": {"backtestId": "abc123", "status": "Completed"}}
+
+
+def completed(backtest_id: str) -> dict:
+    noise = base64.b64encode(os.urandom(3000)).decode()      # incompressible, similar sizes
+    return {"success": True, "backtest": {"backtestId": backtest_id, "status": "Completed",
+                                          "charts": noise}}
+
+
+def test_hit_after_put(tmp_path):
+    cache = ResponseCache(tmp_path)
+    assert cache.put("abc123", COMPLETED)
+
+    assert cache.get("abc123") == COMPLETED
+    assert (cache.hits, cache.misses) == (1, 0)
+
+
+@pytest.mark.parametrize("blob", [
+    result_store.ZLIB_MAGIC + b"not zlib",                  # zlib.error
+    result_store.ZLIB_MAGIC + zlib.compress(b"{truncated"),  # ValueError
+    b"????garbage",                                          # unknown encoding
+])
+def test_corrupt_entry_is_a_miss_and_removed(tmp_path, blob):
+    cache = ResponseCache(tmp_path)
+    cache.put("abc123", COMPLETED)
+    path = cache._path("abc123")
+    path.write_bytes(blob)
+
+    assert cache.get("abc123") is None
+    assert not path.exists() and cache.misses == 1
+
+
+def test_undecodable_codec_is_a_miss_and_removed(tmp_path, monkeypatch):
+    cache = ResponseCache(tmp_path)
+    cache.put("abc123", COMPLETED)
+    monkeypatch.setattr(result_store, "zstandard", None)
+    cache._path("abc123").write_bytes(result_store.ZSTD_MAGIC + b"payload")   # RuntimeError
+
+    assert cache.get("abc123") is None
+    assert not cache._path("abc123").exists()
+
+
+@pytest.mark.parametrize("response", [
+    {"success": True, "backtest": {"status": "In Progress..."}},
+    {"success": True, "backtest": {"status": "Runtime Error"}},
+    {"success": False, "backtest": {"status": "Completed"}},
+    {"success": True},
+])
+def test_only_completed_responses_are_stored(tmp_path, response):
+    cache = ResponseCache(tmp_path)
+
+    assert not cache.put("abc123", response)
+    assert cache.get("abc123") is None and not list(tmp_path.rglob("*.bin"))
+
+
+def test_eviction_drops_least_recently_used_and_hit_refreshes(tmp_path):
+    cache = ResponseCache(tmp_path, max_bytes=1 << 30)
+    for i, bt in enumerate(("aa1", "bb2", "cc3")):
+        cache.put(bt, completed(bt))
+        os.utime(cache._path(bt), (1000 * (i + 1), 1000 * (i + 1)))   # aa1 oldest
+    assert cache.get("aa1") is not None                  # hit: aa1 is now the youngest
+    size = {bt: cache._path(bt).stat().st_size for bt in ("aa1", "bb2", "cc3")}
+    last = completed("dd4")
+    # room for aa1 + cc3 + dd4 below the low-water mark, not for all four
+    cache.max_bytes = math.ceil((size["aa1"] + size["cc3"] + len(result_store.encode(last)))
+                                / LOW_WATER)
+
+    cache.put("dd4", last)
+
+    assert cache.evictions == 1 and not cache._path("bb2").exists()
+    assert all(cache._path(bt).exists() for bt in ("aa1", "cc3", "dd4"))
+
+
+class CountingSession:
+    def __init__(self, body: dict):
+        self.body, self.calls = body, 0
+
+    def post(self, url, **kwargs):
+        self.calls += 1
+        resp = requests.Response()
+        resp.status_code, resp._content = 200, json.dumps(self.body).encode()
+        return resp
+
+
+def test_read_backtest_reads_through_the_cache(tmp_path):
+    body = completed("abc123")
+    first = QCClient("1", "token", rate=1000, cache=ResponseCache(tmp_path))
+    first.session = CountingSession(body)
+
+    assert first.read_backtest("abc123") == body
+    assert first.read_backtest("abc123") == body
+    assert first.session.calls == 1
+
+    other = QCClient("1", "token", rate=1000, cache=ResponseCache(tmp_path))   # another process
+    other.session = CountingSession(body)
+    assert other.read_backtest("abc123") == body and other.session.calls == 0
+
+
+def test_read_backtest_refetches_running_backtests(tmp_path):
+    client = QCClient("1", "token", rate=1000, cache=ResponseCache(tmp_path))
+    client.session = CountingSession({"success": True, "backtest": {"status": "In Progress..."}})
+
+    client.read_backtest("abc123")
+    client.read_backtest("abc123")
+
+    assert client.session.calls == 2
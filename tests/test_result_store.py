@@ -0,0 +1,60 @@
+import json, zlib
+
+import pytest
+
+import result_store
+
+
+def response(sharpe: float, nested: float) -> dict:
+    # QC puts nested portfolioStatistics before the top-level one
+    return {"success": True, "backtest": {
+        "name": "child_0", "status": "Completed",
+        "totalPerformance": {"portfolioStatistics": {"sharpeRatio": nested}},
+        "rollingWindow": {"M1_2024": {"portfolioStatistics": {"sharpeRatio": nested}}},
+        "charts": {"Strategy Equity": {"series": {}}},
+        "portfolioStatistics": {"sharpeRatio": sharpe},
+        "statistics": {"Sharpe Ratio": str(sharpe)}}}
+
+
+def test_write_roundtrip_and_summary(tmp_path):
+    payload = response(1.2, 9.9)
+    result_store.write(tmp_path, payload)
+
+    assert result_store.read(tmp_path) == payload
+    backtest = result_store.summary(tmp_path)["backtest"]
+    assert backtest["portfolioStatistics"] == {"sharpeRatio": 1.2}
+    assert "charts" not in backtest
+
+
+def test_legacy_summary_uses_top_level_statistics(tmp_path):
+    (tmp_path / result_store.LEGACY_FILE).write_text(json.dumps(response(1.2, 9.9)))
+
+    backtest = result_store.summary(tmp_path)["backtest"]
+
+    assert backtest["portfolioStatistics"] == {"sharpeRatio": 1.2}
+    assert backtest["statistics"] == {"Sharpe Ratio": "1.2"}
+    assert (tmp_path / result_store.STATS_FILE).exists()    # parsed once, then the sidecar
+    assert result_store.summary(tmp_path)["backtest"] == backtest
+
+
+def test_result_dirs_matches_run_suffixed_keys(tmp_path):
+    for key in ("a", "b-1a2b3c", "c-cached"):
+        result_store.write(tmp_path / key, response(1.0, 0.0))
+    backtests = tmp_path / "backtests.json"
+    backtests.write_text(json.dumps({"a": "1", "b-1a2b3c": "2", "c-cached": "3"}))
+
+    dirs = result_store.result_dirs(tmp_path, ["a", "b", "c", "d"], backtests)
+
+    assert dirs == {"a": tmp_path / "a", "b": tmp_path / "b-1a2b3c", "c": tmp_path / "c-cached"}
+
+
+def test_zstd_msgpack_roundtrip_and_zlib_still_readable(tmp_path):
+    payload = response(1.2, 9.9)
+    blob = result_store.encode(payload)
+
+    assert blob[:4] == result_store.ZSTD_MAGIC            # requirements.txt build
+    assert result_store.decode(blob) == payload
+    legacy = result_store.ZLIB_MAGIC + zlib.compress(json.dumps(payload).encode())
+    assert result_store.decode(legacy) == payload
+    with pytest.raises(ValueError):
+        result_store.decode(blob[:-8])                      # truncated zstd frame
@@ -0,0 +1,104 @@
+import asyncio, json, os, signal
+
+import pytest
+
+import fake_firestore, steady_state
+from fitness import COLL
+from fitness_cache import FitnessCache, param_hash
+from genome import Genome
+
+SEED = {"STRATEGY_MODULE": "ema_cross_strategy", "SYMBOL": "SPY", "FAST_PERIOD": 5,
+        "SLOW_PERIOD": 100}
+
+
+@pytest.fixture
+def make_driver(monkeypatch, tmp_path):
+    """Driver over an 8-individual FAST_PERIOD genome with submit and Poller.watch
+    stubbed; a back-test's Sharpe ratio is FAST_PERIOD / 10."""
+    monkeypatch.chdir(tmp_path)                          # snapshots land in tmp_path
+    monkeypatch.setenv("FIRESTORE_FAKE", "1")
+    monkeypatch.setattr(steady_state, "BACKOFF", 0.0)
+    monkeypatch.setattr(steady_state, "GENOME",
+                        Genome({"FAST_PERIOD": {"type": "int", "min": 5, "max": 12}}))
+
+    def make(slots=3, max_evals=None, db=None, submit_errors=(), on_watch=None):
+        driver = steady_state.Driver(slots, steady_state.Elites(3, "fitness"), [SEED], "lean",
+                                     max_evals=max_evals, db=db, work_dir=tmp_path / "work")
+        driver.cache = FitnessCache(tmp_path / "cache", mirror=False)
+        driver.running, driver.seen = [], []
+        errors = list(submit_errors)
+
+        async def submit(name, params):
+            if errors:
+                raise errors.pop(0)
+            assert params["FAST_PERIOD"] not in driver.running, "same params in flight twice"
+            driver.running.append(params["FAST_PERIOD"])
+            driver.seen.append(params["FAST_PERIOD"])
+            return f"bt{params['FAST_PERIOD']}"
+
+        async def watch(name, backtest_id):
+            if on_watch:
+                await on_watch(driver)
+            await asyncio.sleep(0.01)
+            fast = int(backtest_id[2:])
+            driver.payloads[name] = {"success": True, "backtest": {
+                "name": name, "status": "Completed",
+                "statistics": {"Sharpe Ratio": f"{fast / 10}", "Drawdown": "1%"}}}
+            driver.poller.results[name] = "Completed"
+            driver.running.remove(fast)
+
+        driver.submit, driver.poller.watch = submit, watch
+        return driver
+    return make
+
+
+def test_breed_skips_in_flight_and_cached_params(make_driver):
+    driver = make_driver()
+    taken = [{**SEED, "FAST_PERIOD": f} for f in range(5, 12)]
+    driver.in_flight.update(param_hash(p) for p in taken[:4])
+    for i, p in enumerate(taken[4:]):
+        driver.cache.put(p, f"bt{i}", {})
+
+    assert driver.breed() == {**SEED, "FAST_PERIOD": 12}   # the one fresh individual
+    driver.in_flight.add(param_hash({**SEED, "FAST_PERIOD": 12}))
+    assert driver.breed() is None
+
+
+def test_run_updates_elites_dedups_and_snapshots(make_driver):
+    db = fake_firestore.Client()
+    driver = make_driver(db=db)
+
+    asyncio.run(driver.run())                            # stops once the genome is exhausted
+
+    assert sorted(driver.seen) == list(range(5, 13))     # every individual exactly once
+    assert (driver.submitted, driver.completed, driver.failed) == (8, 8, 0)
+    assert [c.params["FAST_PERIOD"] for c in driver.elites.items] == [12, 11, 10]
+    assert len(list(db.collection(COLL).stream())) == 8
+    champion = json.loads(open("champion.json").read())
+    assert champion["backtestId"] == "bt12" == driver.elites.best.id
+    assert [s["id"] for s in json.loads(open("survivors.json").read())] == ["bt12", "bt11", "bt10"]
+
+
+def test_signal_stops_breeding_and_drains_in_flight(make_driver):
+    async def interrupt_when_full(driver):
+        if len(driver.running) == driver.slots:
+            os.kill(os.getpid(), signal.SIGINT)
+            await asyncio.sleep(0.05)                    # let the loop run the handler
+
+    driver = make_driver(slots=2, on_watch=interrupt_when_full)
+
+    asyncio.run(driver.run())
+
+    assert driver.stopping.is_set()
+    assert (driver.submitted, driver.completed) == (2, 2)   # in-flight finished, nothing new
+    assert json.loads(open("champion.json").read())["backtestId"] == driver.elites.best.id
+
+
+def test_failed_iteration_is_counted_and_slot_keeps_going(make_driver):
+    driver = make_driver(slots=2, max_evals=6,
+                         submit_errors=[OSError("staging failed"), KeyError("QC_USER_ID")])
+
+    asyncio.run(driver.run())
+
+    assert (driver.submitted, driver.completed, driver.failed) == (6, 4, 2)
+    assert len(driver.elites.items) == 3
@@ -0,0 +1,33 @@
+import importlib, sys
+from types import SimpleNamespace
+
+import pytest
+
+from fitness_cache import FitnessCache
+
+
+@pytest.fixture
+def store_results(monkeypatch):
+    monkeypatch.setenv("QC_USER_ID", "1")
+    monkeypatch.setenv("QC_API_TOKEN", "token")
+    monkeypatch.setenv("FIRESTORE_FAKE", "1")
+    sys.modules.pop("store_results", None)
+    return importlib.import_module("store_results")
+
+
+def test_cache_is_written_only_for_acknowledged_writes(store_results, tmp_path):
+    cache = FitnessCache(tmp_path, mirror=False)
+    stats = store_results.WriteStats(cache)
+    ok, bad = {"FAST_PERIOD": 5}, {"FAST_PERIOD": 9}
+    stats.expect("bt-ok", ok, {"Sharpe Ratio": "1.0"})
+    stats.expect("bt-bad", bad, {"Sharpe Ratio": "2.0"})
+
+    assert cache.get(ok) is None                       # queued, not yet acknowledged
+    stats.on_result(SimpleNamespace(id="bt-ok"), None, None)
+    error = SimpleNamespace(attempts=store_results.WRITE_RETRIES, message="boom",
+                            operation=SimpleNamespace(reference=SimpleNamespace(id="bt-bad")))
+    assert stats.on_error(error, None) is False
+
+    assert cache.get(ok)["backtestId"] == "bt-ok"
+    assert cache.get(bad) is None
+    assert (stats.written, stats.failed, stats.pending) == (1, 1, {})
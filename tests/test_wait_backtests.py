@@ -0,0 +1,160 @@
+import asyncio, json, threading
+from types import SimpleNamespace
+
+import wait_backtests
+from qc_api import QCApiError
+
+
+def run(poller, jobs):
+    return asyncio.run(poller.run(jobs))
+
+
+def test_unknown_and_missing_backtests_end_as_error(monkeypatch, tmp_path):
+    reads = []
+
+    def read_backtest(bt_id):
+        reads.append(bt_id)
+        return {"success": False, "errors": ["No backtest found"]}
+
+    monkeypatch.setattr(wait_backtests, "read_backtest", read_backtest)
+    monkeypatch.setattr(wait_backtests, "MAX_FAILURES", 3)
+    monkeypatch.setattr(wait_backtests, "MIN_INTERVAL", 0.001)
+    monkeypatch.setattr(wait_backtests, "MAX_INTERVAL", 0.001)
+    done = []
+    poller = wait_backtests.Poller(on_complete=lambda c, b, j: done.append(c), results_dir=tmp_path)
+
+    results = run(poller, {"a": "unknown", "b": "deleted-id"})
+
+    assert results == {"a": "Error", "b": "Error"}
+    assert reads == ["deleted-id"] * 3                  # "unknown" is never polled
+    assert sorted(done) == ["a", "b"]
+
+
+def test_deadline_ends_a_job_that_never_finishes(monkeypatch, tmp_path):
+    monkeypatch.setattr(wait_backtests, "read_backtest",
+                        lambda bt_id: {"success": True, "backtest": {"status": "In Queue..."}})
+    monkeypatch.setattr(wait_backtests, "DEADLINE", 0.05)
+    monkeypatch.setattr(wait_backtests, "MIN_INTERVAL", 0.01)
+    monkeypatch.setattr(wait_backtests, "MAX_INTERVAL", 0.01)
+
+    results = run(wait_backtests.Poller(results_dir=tmp_path), {"a": "bt1"})
+
+    assert results == {"a": "Error"}
+
+
+def test_completed_result_is_stored(monkeypatch, tmp_path):
+    payload = {"success": True, "backtest": {"status": "Completed", "statistics": {}}}
+    monkeypatch.setattr(wait_backtests, "read_backtest", lambda bt_id: payload)
+
+    results = run(wait_backtests.Poller(results_dir=tmp_path), {"a": "bt1"})
+
+    assert results == {"a": "Completed"}
+    assert (tmp_path / "a" / "results.bin").exists()
+
+
+def fast_polls(monkeypatch):
+    monkeypatch.setattr(wait_backtests, "MIN_INTERVAL", 0.01)
+    monkeypatch.setattr(wait_backtests, "MAX_INTERVAL", 0.02)
+
+
+def scripted_reads(monkeypatch, script: dict[str, list[dict]]):
+    """read_backtest replays each ID's backtest dicts, repeating the last one."""
+    reads = {bt: 0 for bt in script}
+
+    def read_backtest(bt_id):
+        step = script[bt_id][min(reads[bt_id], len(script[bt_id]) - 1)]
+        reads[bt_id] += 1
+        return {"success": True, "backtest": step}
+
+    monkeypatch.setattr(wait_backtests, "read_backtest", read_backtest)
+    return reads
+
+
+def running(progress: float, ret: str) -> dict:
+    return {"status": "In Progress...", "progress": progress, "runtimeStatistics": {"Return": ret}}
+
+
+COMPLETED = {"status": "Completed", "statistics": {"Net Profit": "-5%"}}
+
+
+def test_early_cancel_against_fake_qc(monkeypatch, tmp_path):
+    from http.server import ThreadingHTTPServer
+    from bench import fake_qc
+    from qc_api import QCClient
+    from response_cache import ResponseCache
+
+    for name, value in {"FAILURE_RATE": 0.0, "LATENCY": 0.0, "QUEUE": 0.0,
+                        "RUNTIME": 2.0, "JITTER": 0.0}.items():
+        monkeypatch.setattr(fake_qc, name, value)
+    backtests = fake_qc.Backtests()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), fake_qc.handler(backtests))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        client = QCClient("1", "token", base_url=f"http://127.0.0.1:{server.server_port}",
+                          rate=1000, cache=ResponseCache(tmp_path / "cache"))
+        monkeypatch.setattr(wait_backtests, "read_backtest", client.read_backtest)
+        monkeypatch.setattr(wait_backtests, "delete_backtest", client.delete_backtest)
+        fast_polls(monkeypatch)
+        jobs = {f"child_{i}": backtests.create({"params": {"FAST_PERIOD": i}})["backtestId"]
+                for i in range(3)}
+
+        # the fake's returns top out at +40 %: none can reach a 1000 % champion
+        poller = wait_backtests.Poller(bound=wait_backtests.CancelBound(10.0, min_progress=0.25),
+                                       results_dir=tmp_path / "children")
+        results = run(poller, jobs)
+    finally:
+        server.shutdown()
+
+    assert results == {child: "Cancelled" for child in jobs}
+    assert backtests.calls["backtests/delete"] == 3
+    assert all(bt["deleted"] for bt in backtests.items.values())
+    assert all(0.25 <= rec["progress"] < 1.0 for rec in poller.cancelled.values())
+    assert not (tmp_path / "children").exists()          # nothing stored for cancelled jobs
+
+
+def test_no_cancel_below_min_progress(monkeypatch, tmp_path):
+    fast_polls(monkeypatch)
+    scripted_reads(monkeypatch, {"bt1": [running(0.1, "-50 %"), running(0.2, "-60 %"), COMPLETED]})
+    deletes = []
+    monkeypatch.setattr(wait_backtests, "delete_backtest", deletes.append)
+    poller = wait_backtests.Poller(bound=wait_backtests.CancelBound(1.0, min_progress=0.25),
+                                   results_dir=tmp_path)
+
+    assert run(poller, {"a": "bt1"}) == {"a": "Completed"}
+    assert deletes == [] and poller.cancelled == {}
+
+
+def test_failed_cancel_keeps_polling(monkeypatch, tmp_path):
+    fast_polls(monkeypatch)
+    reads = scripted_reads(monkeypatch, {"bt1": [running(0.5, "-50 %"), running(0.6, "-55 %"),
+                                                 COMPLETED]})
+    deletes = []
+
+    def delete_backtest(bt_id):
+        deletes.append(bt_id)
+        raise QCApiError("backtests/delete: HTTP 500")
+
+    monkeypatch.setattr(wait_backtests, "delete_backtest", delete_backtest)
+    poller = wait_backtests.Poller(bound=wait_backtests.CancelBound(1.0), results_dir=tmp_path)
+
+    assert run(poller, {"a": "bt1"}) == {"a": "Completed"}
+    assert deletes == ["bt1", "bt1"] and reads["bt1"] == 3
+    assert poller.cancelled == {}
+
+
+def test_main_records_cancellations_and_drops_them_from_backtests(monkeypatch, tmp_path):
+    fast_polls(monkeypatch)
+    scripted_reads(monkeypatch, {"bt1": [running(0.5, "-50 %")]})
+    monkeypatch.setattr(wait_backtests, "delete_backtest", lambda bt_id: {"success": True})
+    monkeypatch.setattr(wait_backtests, "default_client", lambda: SimpleNamespace(report=str))
+    monkeypatch.setattr(wait_backtests, "ROOT", tmp_path)
+    monkeypatch.setattr(wait_backtests, "CANCEL_ENABLED", True)
+    (tmp_path / "champion.json").write_text(json.dumps({"statistics": {"Net Profit": "20%"}}))
+    (tmp_path / "backtests.json").write_text(json.dumps({"a": "bt1", "b": "unknown"}))
+
+    wait_backtests.main()
+
+    cancelled = json.loads((tmp_path / "cancelled.json").read_text())
+    assert cancelled["a"]["backtestId"] == "bt1" and cancelled["a"]["progress"] == 0.5
+    assert json.loads((tmp_path / "backtests.json").read_text()) == {"b": "unknown"}
@@ -0,0 +1,34 @@
+import json
+
+import pytest
+
+import result_store, walk_forward
+
+
+def test_fan_out_handles_dirs_and_json_children(tmp_path):
+    (tmp_path / "a.json").write_text(json.dumps({"FAST_PERIOD": 5}))
+    (tmp_path / "b").mkdir()
+    (tmp_path / "b" / "params.json").write_text(json.dumps({"FAST_PERIOD": 7}))
+    fold_list = walk_forward.folds()
+
+    assert walk_forward.fan_out(tmp_path, fold_list) == 2 * len(fold_list)
+
+    assert not (tmp_path / "a.json").exists() and not (tmp_path / "b").exists()
+    for k, fold in enumerate(fold_list):
+        a = json.loads((tmp_path / f"a__wf{k}.json").read_text())
+        b = json.loads((tmp_path / f"b__wf{k}" / "params.json").read_text())
+        assert a == {"FAST_PERIOD": 5, **fold.params()}
+        assert b == {"FAST_PERIOD": 7, **fold.params()}
+
+
+def test_collect_parses_run_suffixed_fold_dirs(tmp_path, completed):
+    for name, sharpe in {"a__wf0": 1.0, "a__wf1": 2.0, "b__wf0-1a2b3c": 0.5,
+                         "b__wf1-cached": 1.5, "b__wf12-1a2b3c": 9.0}.items():
+        result_store.write(tmp_path / name, completed(sharpe))
+    (tmp_path / "c__wf0").mkdir()                       # fold child without a result yet
+
+    report = walk_forward.collect(tmp_path, 2)
+
+    assert set(report) == {"a", "b"}
+    assert report["a"]["folds"] == pytest.approx([0.98, 1.98])
+    assert report["b"]["folds"] == pytest.approx([0.48, 1.48])
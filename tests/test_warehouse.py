@@ -0,0 +1,49 @@
+import datetime as dt
+
+import fake_firestore
+from fitness import COLL
+from warehouse import Warehouse
+
+
+def add(db, doc_id, stats, params=None, when=None):
+    data = {"name": doc_id, "statistics": stats, "params": params or {},
+            "createdAt": when or fake_firestore.SERVER_TIMESTAMP}
+    db.collection(COLL).document(doc_id).set(data)
+
+
+def test_case_colliding_statistics_get_distinct_columns(tmp_path):
+    db = fake_firestore.Client()
+    add(db, "a", {"Net Profit": "5%", "Sharpe Ratio": "1.0"})
+    add(db, "b", {"net profit": "7%", "Net-Profit": "9%", "Sharpe Ratio": "2.0"})
+    wh = Warehouse(tmp_path / "wh.sqlite")
+
+    assert wh.sync(db) == 2
+
+    cols = {r[1] for r in wh.conn.execute("PRAGMA table_info(results)")}
+    assert {"s_Net_Profit", "s_net_profit_2", "s_Net_Profit_3"} <= cols
+    row = wh.conn.execute('SELECT "s_Net_Profit", "s_net_profit_2", "s_Net_Profit_3" '
+                          "FROM results WHERE id = 'b'").fetchone()
+    assert row == (None, 0.07, 0.09)
+    # the mapping survives a reopen
+    assert Warehouse(tmp_path / "wh.sqlite")._column("s_", "net profit") == "s_net_profit_2"
+
+
+def test_sync_is_incremental_from_the_high_water_mark(tmp_path):
+    db = fake_firestore.Client()
+    t0 = dt.datetime(2025, 1, 1, tzinfo=dt.timezone.utc)
+    for i in range(7):
+        add(db, f"d{i}", {"Sharpe Ratio": str(i)}, {"FAST_PERIOD": i}, t0 + dt.timedelta(hours=i))
+    wh = Warehouse(tmp_path / "wh.sqlite")
+
+    assert wh.sync(db, page_size=3) == 7
+    assert wh.high_water_mark() == (t0 + dt.timedelta(hours=6)).timestamp()
+
+    add(db, "d7", {"Sharpe Ratio": "9"}, {"FAST_PERIOD": 7}, t0 + dt.timedelta(hours=7))
+    reads = db.reads
+    assert wh.sync(db, page_size=3) == 2                # boundary doc re-read, then the new one
+    assert db.reads - reads == 2
+    assert wh.conn.execute("SELECT COUNT(*) FROM results").fetchone()[0] == 8
+
+    [best] = wh.top_k("statistics.Sharpe Ratio", 1)
+    assert best.id == "d7" and best.to_dict()["params"] == {"FAST_PERIOD": 7}
+    assert wh.top_k("statistics.Unknown", 1) == []
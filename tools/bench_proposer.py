@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark: back-tests needed to reach a target fitness with the
+random mutator (algo_gen's genome mutation of the current champion) vs. the TPE
+surrogate proposer, on a synthetic objective over parameter_schema.json.
+
+No cloud calls – the "back-test" is a noisy closed-form function where
+each symbol has its own edge and its own correlated FAST/SLOW optimum,
+so results are cheap and reproducible. Runs that never reach the target
+count as BUDGET back-tests.
+
+• SEEDS   – independent runs per proposer (default 30)
+• BATCH   – children per generation, as NUM_CHILDREN in the workflow (default 5)
+• BUDGET  – give up after this many back-tests (default 300)
+• TARGET  – fraction of the optimum to reach (default 0.95)
+• NOISE   – std-dev of the evaluation noise (default 0.05)
+"""
+import os, pathlib, random, statistics, sys
+
+import numpy as np
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import algo_gen, surrogate
+
+SEEDS  = int(os.getenv("SEEDS", 30))
+BATCH  = int(os.getenv("BATCH", 5))
+BUDGET = int(os.getenv("BUDGET", 300))
+TARGET = float(os.getenv("TARGET", 0.95))
+NOISE  = float(os.getenv("NOISE", 0.05))
+
+# per-symbol (edge, best FAST, best SLOW): trend lengths differ by asset
+SYMBOL_OPT = {"SPY": (0.7, 20, 100), "QQQ": (1.0, 12, 150), "GLD": (0.5, 40, 180),
+              "IWM": (0.8, 8, 70)}
+OPTIMUM = max(edge for edge, _, _ in SYMBOL_OPT.values())
+
+
+def objective(p: dict) -> float:
+    """Noise-free synthetic fitness; each symbol has its own FAST/SLOW optimum."""
+    edge, fast, slow = SYMBOL_OPT[p["SYMBOL"]]
+    df = (p["FAST_PERIOD"] - fast) / 25
+    ds = (p["SLOW_PERIOD"] - slow) / 80
+    return edge - df ** 2 - ds ** 2 - df * ds        # correlated FAST/SLOW valley
+
+
+def run(proposer: str, seed: int) -> int:
+    """Back-tests spent until a proposal's true fitness reaches the target."""
+    genome, gen_rng = algo_gen.GENOME, np.random.default_rng(seed)
+    rng = random.Random(seed + 1)
+    tpe = surrogate.TPE(algo_gen.SCHEMA, seed=seed)
+    history: list[tuple[dict, float]] = []
+    champion = genome.to_dicts(genome.sample(1, gen_rng))[0]
+    best = objective(champion) + rng.gauss(0, NOISE)
+    while len(history) < BUDGET:
+        if proposer == "surrogate":
+            batch = tpe.fit(history).propose(BATCH, base=champion)
+        else:
+            batch = genome.to_dicts(genome.breed(genome.from_dicts([champion]), BATCH, gen_rng))
+        for child in batch:
+            score = objective(child) + rng.gauss(0, NOISE)
+            history.append((child, score))
+            if score > best:
+                champion, best = child, score
+            if objective(child) >= TARGET * OPTIMUM:
+                return len(history)
+    return BUDGET
+
+
+def main():
+    print(f"📐  target {TARGET:.0%} of optimum, batch {BATCH}, budget {BUDGET}, {SEEDS} seeds")
+    results = {}
+    for proposer in ("mutate", "surrogate"):
+        spent = [run(proposer, seed) for seed in range(SEEDS)]
+        results[proposer] = spent
+        misses = sum(s >= BUDGET for s in spent)
+        print(f"{proposer:>10}: median {statistics.median(spent):6.1f}  "
+              f"mean {statistics.mean(spent):6.1f}  back-tests to target  "
+              f"({misses} runs hit the budget)")
+    ratio = statistics.mean(results["mutate"]) / statistics.mean(results["surrogate"])
+    print(f"🔮  surrogate needs {ratio:.1f}× fewer back-tests")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,35 +2,209 @@
 """
 Delete Firestore docs older than N days or outside the last K runs.
 
-• TARGET_COLL  – name of results collection
-• KEEP_DAYS    – minimum age to keep (e.g. 14)
-• KEEP_LATEST  – always keep the newest K docs, even if older than KEEP_DAYS
+The collection is never loaded whole. The boundary is fixed once: docs
+created before min(now − KEEP_DAYS, createdAt of the K-th newest doc) are
+victims. They are then paged through oldest-first, reading only the
+createdAt projection; each page is re-queried from the start because its
+predecessors are already deleted. Each page is archived (full docs
+fetched with get_all, written as gzip JSON lines) before its deletes are
+queued on a BulkWriter and flushed, so memory stays at one page however
+large the collection.
+
+After every page the boundary and counts are checkpointed to
+PRUNE_ARCHIVE_DIR/prune_state.json; an interrupted run resumes with the
+same boundary on the next invocation. Archive parts are never
+overwritten, so a page cut off between archive and delete is archived
+twice rather than lost.
+
+• KEEP_DAYS          – minimum age to keep (e.g. 14)
+• KEEP_LATEST        – always keep the newest K docs, even if older than KEEP_DAYS
+• PRUNE_PAGE_SIZE    – docs per page and per archive part (default 500)
+• PRUNE_ARCHIVE_DIR  – archives + checkpoint (default ./.prune_archive)
+
+Usage:
+    python tools/prune_firestore.py [--dry-run] [--no-archive] [--restart]
+
+Runs against the in-memory stand-in with FIRESTORE_FAKE=<file> (see
+firestore_db.py).
 """
-import os, sys, datetime as dt
-from google.cloud import firestore
-
-TARGET_COLL = "backtest_results"
-KEEP_DAYS   = int(os.getenv("KEEP_DAYS", 14))
-KEEP_LATEST = int(os.getenv("KEEP_LATEST", 200))
-
-cutoff = dt.datetime.utcnow() - dt.timedelta(days=KEEP_DAYS)
-
-db   = firestore.Client()
-coll = db.collection(TARGET_COLL)
-
-docs = list(coll.order_by("createdAt").stream())
-if len(docs) <= KEEP_LATEST:
-    print("Nothing to prune – below KEEP_LATEST threshold")
-    sys.exit(0)
-
-victims = [
-    d for d in docs[:-KEEP_LATEST]     # keep youngest KEEP_LATEST docs
-    if d.get("createdAt") and d.get("createdAt") < cutoff
-]
-
-print(f"🧹  Purging {len(victims)} docs older than {KEEP_DAYS} days…")
-batch = db.batch()
-for doc in victims:
-    batch.delete(doc.reference)
-batch.commit()
-print("✅  Prune finished")
+import argparse, datetime as dt, gzip, json, os, pathlib, sys, threading
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import firestore_db
+from fitness import COLL
+
+TARGET_COLL   = COLL
+KEEP_DAYS     = int(os.getenv("KEEP_DAYS", 14))
+KEEP_LATEST   = int(os.getenv("KEEP_LATEST", 200))
+PAGE_SIZE     = int(os.getenv("PRUNE_PAGE_SIZE", 500))
+ARCHIVE_DIR   = pathlib.Path(os.getenv("PRUNE_ARCHIVE_DIR", ROOT / ".prune_archive"))
+STATE_FILE    = ARCHIVE_DIR / "prune_state.json"
+WRITE_RETRIES = 3
+REPORT_EVERY  = 20                              # pages between progress lines
+
+
+def _json_default(value):
+    return value.isoformat() if isinstance(value, dt.datetime) else str(value)
+
+
+def threshold(coll, cutoff: dt.datetime, keep_latest: int) -> dt.datetime | None:
+    """Docs created before this are victims; None when there is nothing to prune."""
+    if keep_latest <= 0:
+        return cutoff
+    newest = list(coll.order_by("createdAt", direction="DESCENDING").select(["createdAt"])
+                  .offset(keep_latest - 1).limit(1).stream())
+    if not newest:                              # fewer than KEEP_LATEST docs
+        return None
+    return min(cutoff, newest[0].get("createdAt"))
+
+
+class DeleteStats:
+    """Counters updated from BulkWriter callback threads."""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.deleted = self.failed = 0
+        self.failed_ids: set[str] = set()
+
+    def on_result(self, reference, result, bulk_writer):
+        with self.lock:
+            self.deleted += 1
+
+    def on_error(self, error, bulk_writer) -> bool:
+        retry = error.attempts < WRITE_RETRIES
+        if not retry:
+            with self.lock:
+                self.failed += 1
+                self.failed_ids.add(error.operation.reference.id)
+            print(f"  -> Delete failed for {error.operation.reference.id}: {error.message}")
+        return retry
+
+
+def load_state() -> dict | None:
+    if not STATE_FILE.exists():
+        return None
+    state = json.loads(STATE_FILE.read_text())
+    return None if state.get("done") else state
+
+
+def save_state(state: dict) -> None:
+    STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    tmp = STATE_FILE.with_suffix(".tmp")
+    tmp.write_text(json.dumps(state, indent=2))
+    tmp.replace(STATE_FILE)                     # atomic so a kill never leaves half a checkpoint
+
+
+def archive_page(db, refs: list, run_dir: pathlib.Path) -> int:
+    """Write the full docs behind `refs` as a new gzip JSON-lines part; returns docs written."""
+    run_dir.mkdir(parents=True, exist_ok=True)
+    dest = run_dir / f"part-{len(list(run_dir.glob('part-*.jsonl.gz'))):05d}.jsonl.gz"
+    tmp = dest.with_suffix(".tmp")
+    written = 0
+    with gzip.open(tmp, "wt") as fh:
+        for snap in db.get_all(refs):
+            if snap.exists:
+                fh.write(json.dumps({"id": snap.id, **snap.to_dict()}, default=_json_default) + "\n")
+                written += 1
+    tmp.replace(dest)
+    return written
+
+
+def prune(db, state: dict, dry_run: bool = False, archive: bool = True) -> dict:
+    """Delete (or count) every victim below the checkpointed threshold; returns the final state.
+
+    Deleted docs drop out of the query, so each page is read from the start
+    again – no cursor, hence no docs lost to a createdAt tie at a page edge
+    (every write in one batch shares its SERVER_TIMESTAMP). Docs whose delete
+    failed stay at the front and are skipped by id. A dry run deletes nothing
+    and pages with a snapshot cursor (createdAt + document id) instead.
+    """
+    coll = db.collection(TARGET_COLL)
+    query = (coll.where("createdAt", "<", dt.datetime.fromisoformat(state["threshold"]))
+             .order_by("createdAt").select(["createdAt"]))
+    run_dir = ARCHIVE_DIR / state["run"]
+    stats = DeleteStats()
+    writer = None
+    if not dry_run:
+        writer = db.bulk_writer()
+        writer.on_write_result(stats.on_result)
+        writer.on_write_error(stats.on_error)
+
+    failed = stats.failed_ids                   # ids whose delete gave up this run
+    last, pages = None, 0
+    while True:
+        if dry_run:
+            page = list((query.start_after(last) if last else query).limit(PAGE_SIZE).stream())
+            full = len(page) == PAGE_SIZE
+        else:
+            rows = list(query.limit(PAGE_SIZE + len(failed)).stream())
+            full = len(rows) == PAGE_SIZE + len(failed)
+            page = [snap for snap in rows if snap.id not in failed]
+        if not page:
+            break
+        state["seen"] += len(page)
+        if dry_run:
+            last = page[-1]
+        else:
+            refs = [snap.reference for snap in page]
+            if archive:
+                state["archived"] += archive_page(db, refs, run_dir)
+            for ref in refs:
+                writer.delete(ref)
+            writer.flush()
+            state["deleted"] += stats.deleted
+            state["failed"] += stats.failed
+            stats.deleted = stats.failed = 0
+            save_state(state)
+        pages += 1
+        if pages % REPORT_EVERY == 0:
+            print(f"  … {state['seen']} victims, {state['deleted']} deleted")
+        if not full:
+            break
+
+    if writer is not None:
+        writer.close()
+    state["done"] = True
+    if not dry_run:
+        save_state(state)
+    return state
+
+
+def main(argv: list[str]):
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--dry-run", action="store_true", help="count victims, delete nothing")
+    ap.add_argument("--no-archive", action="store_true", help="delete without archiving")
+    ap.add_argument("--restart", action="store_true", help="ignore an unfinished checkpoint")
+    args = ap.parse_args(argv)
+
+    db = firestore_db.client()
+    state = None if args.restart or args.dry_run else load_state()
+    if state:
+        print(f"⏯️  Resuming prune of docs before {state['threshold']} "
+              f"({state['deleted']} deleted so far)")
+    else:
+        cutoff = dt.datetime.now(dt.timezone.utc) - dt.timedelta(days=KEEP_DAYS)
+        bound = threshold(db.collection(TARGET_COLL), cutoff, KEEP_LATEST)
+        if bound is None:
+            print("Nothing to prune – below KEEP_LATEST threshold")
+            sys.exit(0)
+        now = dt.datetime.now(dt.timezone.utc)
+        state = {"run": now.strftime("%Y%m%dT%H%M%SZ"), "threshold": bound.isoformat(),
+                 "seen": 0, "archived": 0, "deleted": 0, "failed": 0,
+                 "done": False}
+        print(f"🧹  Purging docs created before {state['threshold']} (older than {KEEP_DAYS} "
+              f"days, outside the newest {KEEP_LATEST})…")
+
+    state = prune(db, state, dry_run=args.dry_run, archive=not args.no_archive)
+    if args.dry_run:
+        print(f"🔍  {state['seen']} docs would be purged")
+        return
+    where = f" to {(ARCHIVE_DIR / state['run']).relative_to(ROOT)}" \
+        if state["archived"] and ARCHIVE_DIR.is_relative_to(ROOT) else ""
+    print(f"✅  Prune finished: {state['deleted']} deleted, {state['failed']} failed, "
+          f"{state['archived']} archived{where}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
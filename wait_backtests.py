@@ -1,30 +1,248 @@
 #!/usr/bin/env python3
 """
 Poll QuantConnect API until every back-test in backtests.json
-finishes; dump final JSON into each child folder as 'results.json'.
+finishes; store each final response in its child folder through
+result_store (compressed results.bin + stats.json sidecar).
+
+Every back-test is watched by its own coroutine. Polls share a concurrency
+cap and a token-bucket rate limit, and each job backs off adaptively: it is
+polled rarely while far from its expected finish and every
+POLL_MIN_INTERVAL seconds once close. The result is written the moment a
+job completes and the child name is handed to `on_complete` / the optional
+queue so later stages can start early. Requests go through the shared
+qc_api client, which owns the rate limit (QC_RATE_LIMIT) and retries.
+A job whose ID is "unknown", whose polls keep failing (e.g. a deleted
+back-test answers success: false) or that outlives POLL_DEADLINE ends as
+Error instead of being polled forever.
+
+Detection latency is bounded by the rate limit, not the backoff: every job
+needs one read before its progress is known, so the first sweep alone
+takes jobs / QC_RATE_LIMIT seconds. Against bench/fake_qc.py with 500 jobs
+finishing over ~3 min, median completion-to-detection was 0.5 s (p95
+0.6 s) at 100 req/s but 18 s (p95 48 s) at the default 8 req/s – there
+only jobs finishing after the first sweep are seen within a second.
+
+Early cancellation: when champion.json exists, each in-progress poll
+compares the partial return (runtimeStatistics "Return") with a bound
+derived from the champion's net profit. A back-test past
+EARLY_CANCEL_MIN_PROGRESS whose partial return plus EARLY_CANCEL_UPSIDE
+scaled by the fraction still to run cannot reach the champion is
+cancelled through backtests/delete. Cancellations and the node-minutes
+they saved are logged, recorded in cancelled.json and dropped from
+backtests.json so store_results.py does not fetch them.
+
+Env vars:
+    POLL_CONCURRENCY  – max simultaneous API requests   (default 16)
+    POLL_MIN_INTERVAL – seconds between polls near ETA  (default 2)
+    POLL_MAX_INTERVAL – seconds between polls far away  (default 60)
+    EXPECTED_RUNTIME  – prior back-test duration, secs  (default 180)
+    POLL_MAX_FAILURES – consecutive failed polls before
+                        a job ends as Error             (default 10)
+    POLL_DEADLINE     – seconds before a job still not
+                        finished ends as Error          (default 21600)
+    EARLY_CANCEL               – 0 disables cancellation    (default 1)
+    EARLY_CANCEL_MIN_PROGRESS  – never cancel before this   (default 0.25)
+    EARLY_CANCEL_UPSIDE        – best plausible return over
+                                 a whole back-test           (default 0.5)
 """
-import time, json, os, pathlib, requests
-
-QC_TOKEN = os.environ["QC_API_TOKEN"]
-HEADERS = {"Authorization": f"Bearer {QC_TOKEN}"}
-
-ROOT  = pathlib.Path(__file__).parent
-with open(ROOT / "backtests.json") as f:
-    jobs = json.load(f)
-
-pending = dict(jobs)
-while pending:
-    for child, bt_id in list(pending.items()):
-        url = f"https://www.quantconnect.com/api/v2/backtests/read?id={bt_id}"
-        r   = requests.get(url, headers=HEADERS)
-        j   = r.json()
-        status = j["backtest"]["status"]
-        if status == "Completed":
-            (ROOT / "children" / child / "results.json").write_text(json.dumps(j, indent=2))
-            print(f"✅ {child} finished")
-            pending.pop(child)
-        elif status == "Error":
-            print(f"❌ {child} errored: {j}")
-            pending.pop(child)
-    if pending:
-        time.sleep(30)
+from __future__ import annotations
+import asyncio, json, os, pathlib, statistics, time
+from typing import Callable
+
+import result_store, telemetry
+from fitness import STAT_KEYS, parse_stat
+from qc_api import QCApiError, default_client
+
+ROOT = pathlib.Path(__file__).parent
+
+CONCURRENCY      = int(os.getenv("POLL_CONCURRENCY", 16))
+MIN_INTERVAL     = float(os.getenv("POLL_MIN_INTERVAL", 2))
+MAX_INTERVAL     = float(os.getenv("POLL_MAX_INTERVAL", 60))
+EXPECTED_RUNTIME = float(os.getenv("EXPECTED_RUNTIME", 180))
+MAX_FAILURES     = int(os.getenv("POLL_MAX_FAILURES", 10))
+DEADLINE         = float(os.getenv("POLL_DEADLINE", 6 * 3600))
+ETA_MARGIN       = 0.5                      # seconds past the extrapolated finish to poll
+
+CANCEL_ENABLED      = os.getenv("EARLY_CANCEL", "1") == "1"
+CANCEL_MIN_PROGRESS = float(os.getenv("EARLY_CANCEL_MIN_PROGRESS", 0.25))
+CANCEL_UPSIDE       = float(os.getenv("EARLY_CANCEL_UPSIDE", 0.5))
+CASH                = 100_000                   # main.py's SetCash
+
+
+def read_backtest(bt_id: str) -> dict:
+    return default_client().read_backtest(bt_id)
+
+
+def delete_backtest(bt_id: str) -> dict:
+    return default_client().delete_backtest(bt_id)
+
+
+def partial_return(backtest: dict) -> float | None:
+    """Return so far of an in-progress back-test, from its runtime statistics."""
+    rs = backtest.get("runtimeStatistics") or {}
+    ret = parse_stat(rs.get("Return"))
+    if ret is not None:
+        return ret
+    equity = parse_stat(rs.get("Equity"))
+    return equity / CASH - 1.0 if equity is not None else None
+
+
+class CancelBound:
+    """Cancel once partial + UPSIDE·(1 − progress) < champion net profit."""
+
+    def __init__(self, champion: float, upside: float = CANCEL_UPSIDE,
+                 min_progress: float = CANCEL_MIN_PROGRESS):
+        self.champion, self.upside, self.min_progress = champion, upside, min_progress
+
+    @classmethod
+    def from_champion(cls, path: pathlib.Path = ROOT / "champion.json") -> "CancelBound | None":
+        if not path.exists():
+            return None
+        stats = json.loads(path.read_text()).get("statistics") or {}
+        profit = next((v for v in (parse_stat(stats.get(k)) for k in STAT_KEYS["netProfit"])
+                       if v is not None), None)
+        return cls(profit) if profit is not None else None
+
+    def bound(self, progress: float) -> float:
+        return self.champion - self.upside * (1.0 - progress)
+
+    def hopeless(self, progress: float, partial: float | None) -> bool:
+        return (partial is not None and self.min_progress <= progress < 1.0
+                and partial < self.bound(progress))
+
+
+class Poller:
+    def __init__(self, on_complete: Callable[[str, str, dict], None] | None = None,
+                 queue: asyncio.Queue | None = None, bound: CancelBound | None = None,
+                 results_dir: pathlib.Path = ROOT / "children"):
+        self.on_complete, self.queue, self.bound = on_complete, queue, bound
+        self.results_dir = results_dir
+        self.sem = asyncio.Semaphore(CONCURRENCY)
+        self.durations: list[float] = []           # observed run times → ETA prior
+        self.polls = 0
+        self.results: dict[str, str] = {}           # child → final status
+        self.cancelled: dict[str, dict] = {}        # child → cancellation record
+        self.saved_minutes = 0.0
+
+    def next_interval(self, elapsed: float, progress: float, rate: float = 0.0) -> float:
+        """Time to the next poll, clamped to [MIN, MAX].
+
+        Once progress is reported the finish is extrapolated – from the
+        progress rate between two polls when known (queue time does not skew
+        it), else from `elapsed` – and polled just before it: progress is
+        close to linear, and every poll saved is rate-limit budget for a job
+        that is about to finish. Without progress, half the time left to the
+        expected run time."""
+        if progress > 0:
+            remaining = (1 - progress) / rate if rate > 0 else elapsed * (1 - progress) / progress
+            return min(MAX_INTERVAL, max(MIN_INTERVAL, remaining + ETA_MARGIN))
+        expected = statistics.median(self.durations) if self.durations else EXPECTED_RUNTIME
+        return min(MAX_INTERVAL, max(MIN_INTERVAL, (expected - elapsed) / 2))
+
+    async def watch(self, child: str, bt_id: str) -> None:
+        started, wall_start = time.monotonic(), time.time()
+        running_since = None                        # wall time the node picked it up
+        if not bt_id or bt_id == "unknown":         # run_backtest.py couldn't scrape the ID
+            print(f"❌ {child} has no backtest ID")
+            return await self._done(child, bt_id, "Error", {})
+        failures, last = 0, None                    # last: (elapsed, progress) of the previous poll
+        while True:
+            async with self.sem:
+                self.polls += 1
+                telemetry.count("polls")
+                try:
+                    j = await asyncio.to_thread(read_backtest, bt_id)
+                    backtest = j["backtest"]
+                    failures = 0
+                except (QCApiError, ValueError, KeyError) as exc:
+                    # success: false (unknown / deleted ID) has no "backtest" → KeyError
+                    failures += 1
+                    print(f"⚠️  {child} poll failed ({failures}/{MAX_FAILURES}): {exc}")
+                    j, backtest = {}, {"status": "Unknown"}
+
+            status = backtest.get("status")
+            elapsed = time.monotonic() - started
+            if failures >= MAX_FAILURES or elapsed > DEADLINE:
+                reason = "polls failed" if failures >= MAX_FAILURES else "deadline passed"
+                print(f"❌ {child} given up after {elapsed:.0f}s: {reason}")
+                telemetry.count("poll_give_ups")
+                return await self._done(child, bt_id, "Error", j)
+            if running_since is None and (backtest.get("progress") or status == "Completed"):
+                running_since = time.time()
+                telemetry.record_span("queue_wait", wall_start, running_since, child=child)
+            if status in ("Completed", "Error") or str(status).startswith("Runtime Error"):
+                telemetry.record_span("run", running_since or wall_start, time.time(), child=child)
+            if status == "Completed":
+                await asyncio.to_thread(result_store.write, self.results_dir / child, j)
+                self.durations.append(elapsed)
+                print(f"✅ {child} finished")
+                return await self._done(child, bt_id, status, j)
+            if status == "Error" or str(status).startswith("Runtime Error"):
+                print(f"❌ {child} errored: {j}")
+                return await self._done(child, bt_id, "Error", j)
+
+            progress = float(backtest.get("progress") or 0)
+            if self.bound and self.bound.hopeless(progress, partial_return(backtest)):
+                if await self._cancel(child, bt_id, progress, partial_return(backtest), elapsed):
+                    return await self._done(child, bt_id, "Cancelled", j)
+            rate = 0.0
+            if last and progress > last[1] and elapsed > last[0]:
+                rate = (progress - last[1]) / (elapsed - last[0])
+            if progress > 0:
+                last = (elapsed, progress)
+            await asyncio.sleep(self.next_interval(elapsed, progress, rate))
+
+    async def _cancel(self, child: str, bt_id: str, progress: float,
+                      partial: float, elapsed: float) -> bool:
+        try:
+            async with self.sem:
+                await asyncio.to_thread(delete_backtest, bt_id)
+        except QCApiError as exc:
+            print(f"⚠️  {child} cancel failed: {exc}")
+            return False
+        saved = elapsed * (1 - progress) / progress / 60 if progress > 0 else 0.0
+        self.saved_minutes += saved
+        telemetry.count("early_cancellations")
+        telemetry.count("node_minutes_saved", saved)
+        self.cancelled[child] = {"backtestId": bt_id, "progress": progress,
+                                 "partialReturn": partial, "bound": self.bound.bound(progress),
+                                 "savedNodeMinutes": round(saved, 2)}
+        print(f"🛑 {child} cancelled at {progress:.0%}: return {partial:.2%} < bound "
+              f"{self.bound.bound(progress):.2%} (~{saved:.1f} node-min saved)")
+        return True
+
+    async def _done(self, child: str, bt_id: str, status: str, payload: dict) -> None:
+        self.results[child] = status
+        if self.on_complete:
+            self.on_complete(child, bt_id, payload)
+        if self.queue is not None:
+            await self.queue.put((child, status))
+
+    async def run(self, jobs: dict[str, str]) -> dict[str, str]:
+        await asyncio.gather(*(self.watch(c, b) for c, b in jobs.items()))
+        return self.results
+
+
+def main():
+    with open(ROOT / "backtests.json") as f:
+        jobs = json.load(f)
+    started = time.monotonic()
+    bound = CancelBound.from_champion(ROOT / "champion.json") if CANCEL_ENABLED else None
+    if bound:
+        print(f"🎯 Early cancellation against champion net profit {bound.champion:.2%}")
+    poller = Poller(bound=bound, results_dir=ROOT / "children")
+    results = asyncio.run(poller.run(jobs))
+    done = sum(s == "Completed" for s in results.values())
+    print(f"📊 {done}/{len(jobs)} completed with {poller.polls} polls "
+          f"in {time.monotonic() - started:.0f}s")
+    if poller.cancelled:
+        print(f"🛑 {len(poller.cancelled)} cancelled early, ~{poller.saved_minutes:.1f} "
+              f"node-minutes saved")
+        (ROOT / "cancelled.json").write_text(json.dumps(poller.cancelled, indent=2))
+        with open(ROOT / "backtests.json", "w") as f:
+            json.dump({c: b for c, b in jobs.items() if c not in poller.cancelled}, f, indent=2)
+    print(default_client().report())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Walk-forward evaluation: every candidate on K rolling train/OOS folds.
+
+A champion picked on main.py's single split (one year to TODAY, last 60
+days OOS) is noisy. Walk-forward slides that window back in STEP-day
+increments, scores each fold separately and aggregates the per-fold
+fitness into a robust one (mean − WF_PENALTY·std by default), so a
+parameter set has to work across regimes, not on one lucky year.
+
+    fold k:  [end_k − TRAIN − OOS, end_k − OOS) train   [end_k − OOS, end_k] OOS
+             end_k = TODAY − k·STEP
+
+Local mode (default) replays ema_cross_strategy children with prescreen's
+vectorised simulator in a ProcessPoolExecutor. Work is split into
+(symbol, chunk of candidates) tasks; each worker maps the bars from
+bar_store (pages shared between processes), builds the EMA table once and
+runs all folds, so throughput scales with cores.
+
+Cloud mode fans each child out into <child>__wf<k> children (folders for
+run_backtest.py, .json files for run_parallel_backtests.py) whose params
+carry START_DATE / END_DATE / TRAINING_END (honoured by main.py), to be
+submitted like any other children; `collect` then folds
+their stored results back into one score per child.
+
+Usage:
+    python walk_forward.py [--children children] [--workers N]
+    python walk_forward.py fan-out      # cloud: write fold children
+    python walk_forward.py collect      # cloud: aggregate fold results
+
+Env vars:
+    WF_FOLDS       – number of folds K (default 4)
+    WF_TRAIN_DAYS  – in-sample days per fold (default 305, main.py's split)
+    WF_OOS_DAYS    – OOS days per fold (default 60)
+    WF_STEP_DAYS   – shift between folds (default WF_OOS_DAYS)
+    WF_PENALTY     – std-dev penalty in the robust fitness (default 1.0)
+    WF_WORKERS     – process-pool size (default os.cpu_count())
+"""
+
+from __future__ import annotations
+import argparse, json, os, pathlib, re, shutil, sys, time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+import numpy as np
+
+import prescreen
+
+ROOT       = pathlib.Path(__file__).resolve().parent
+FOLDS      = int(os.getenv("WF_FOLDS", 4))
+TRAIN_DAYS = int(os.getenv("WF_TRAIN_DAYS", 305))
+OOS_DAYS   = int(os.getenv("WF_OOS_DAYS", 60))
+STEP_DAYS  = int(os.getenv("WF_STEP_DAYS", OOS_DAYS))
+PENALTY    = float(os.getenv("WF_PENALTY", 1.0))
+WORKERS    = int(os.getenv("WF_WORKERS", os.cpu_count() or 1))
+CHUNK      = 512                 # candidates per task
+OUT_FILE   = ROOT / "walk_forward.json"
+FOLD_SEP   = "__wf"
+# result dir of a fold run: <child>__wf<k>, plus run_backtest.py's -<hex6> / -cached
+FOLD_RE    = re.compile(rf"^(?P<child>.+){FOLD_SEP}(?P<fold>\d+)(?:-(?:[0-9a-f]{{6}}|cached))?$")
+
+
+@dataclass(frozen=True)
+class Fold:
+    start: date
+    training_end: date
+    end: date
+
+    def params(self) -> dict[str, str]:
+        """Window overrides main.py reads from params.json."""
+        return {"START_DATE": self.start.isoformat(), "END_DATE": self.end.isoformat(),
+                "TRAINING_END": self.training_end.isoformat()}
+
+
+def folds(k: int = FOLDS, train_days: int = TRAIN_DAYS, oos_days: int = OOS_DAYS,
+          step_days: int = STEP_DAYS, end: date = prescreen.TODAY) -> list[Fold]:
+    """K folds, most recent first; fold 0 is main.py's own window."""
+    out = []
+    for i in range(k):
+        fold_end = end - timedelta(days=i * step_days)
+        training_end = fold_end - timedelta(days=oos_days)
+        out.append(Fold(training_end - timedelta(days=train_days), training_end, fold_end))
+    return out
+
+
+def robust_fitness(per_fold: np.ndarray, penalty: float = PENALTY) -> np.ndarray:
+    """(N, K) per-fold fitness → mean − penalty·std across the folds present."""
+    return np.nanmean(per_fold, axis=1) - penalty * np.nanstd(per_fold, axis=1)
+
+
+# ── local evaluation ───────────────────────────────────────────────────────
+def _evaluate_chunk(symbol: str, fast: np.ndarray, slow: np.ndarray,
+                    fold_list: list[Fold]) -> dict[str, np.ndarray]:
+    """Worker: per-fold statistics, each an (n, K) array, for one symbol chunk."""
+    dates, close = prescreen.load_daily_bars(symbol)
+    periods, inv = np.unique(np.concatenate([fast, slow]), return_inverse=True)
+    table = prescreen.ema_table(close, periods)
+    fast_ema, slow_ema = table[inv[:fast.size]], table[inv[fast.size:]]
+    per_fold = [prescreen.simulate(dates, close, fast_ema, slow_ema,
+                                   f.start, f.training_end, f.end) for f in fold_list]
+    out = {m: np.stack([s[m] for s in per_fold], axis=1) for m in per_fold[0]}
+    out["fitness"] = np.stack([prescreen.fitness(s) for s in per_fold], axis=1)
+    return out
+
+
+def evaluate(params: list[dict], fold_list: list[Fold] | None = None,
+             workers: int = WORKERS) -> dict[str, np.ndarray]:
+    """Per-fold statistics for every params dict: {metric: (N, K)}, NaN where
+    the child can't be replayed locally."""
+    fold_list = fold_list or folds()
+    n, k = len(params), len(fold_list)
+    by_symbol: dict[str, list[int]] = {}
+    for i, p in enumerate(params):
+        if p.get("STRATEGY_MODULE", prescreen.STRATEGY) == prescreen.STRATEGY:
+            by_symbol.setdefault(p.get("SYMBOL", "SPY"), []).append(i)
+
+    tasks = []
+    for symbol, rows in by_symbol.items():
+        for lo in range(0, len(rows), CHUNK):
+            idx = np.array(rows[lo:lo + CHUNK])
+            fast = np.array([int(params[i]["FAST_PERIOD"]) for i in idx])
+            slow = np.array([int(params[i]["SLOW_PERIOD"]) for i in idx])
+            tasks.append((symbol, idx, fast, slow))
+
+    result: dict[str, np.ndarray] = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [(t, pool.submit(_evaluate_chunk, t[0], t[2], t[3], fold_list)) for t in tasks]
+        for (symbol, idx, _, _), fut in futures:
+            try:
+                stats = fut.result()
+            except (FileNotFoundError, KeyError, ValueError) as exc:
+                print(f"⚠️  no daily bars for {symbol} ({exc}); passing through")
+                continue
+            for m, arr in stats.items():
+                result.setdefault(m, np.full((n, k), np.nan))[idx] = arr
+    return result
+
+
+# ── cloud fan-out ──────────────────────────────────────────────────────────
+def fan_out(children: pathlib.Path, fold_list: list[Fold]) -> int:
+    """Replace each child with one <child>__wf<k> child per fold, in the same
+    form: a dir for run_backtest.py, a .json file for run_parallel_backtests.py."""
+    written = 0
+    for entry, params_file in prescreen.discover(children):
+        name = entry.name.removesuffix(".json")
+        if FOLD_SEP in name:
+            continue
+        params = json.loads(params_file.read_text())
+        for k, fold in enumerate(fold_list):
+            fold_params = json.dumps({**params, **fold.params()}, indent=2)
+            if entry.is_dir():
+                d = children / f"{name}{FOLD_SEP}{k}"
+                d.mkdir(exist_ok=True)
+                (d / "params.json").write_text(fold_params)
+            else:
+                (children / f"{name}{FOLD_SEP}{k}.json").write_text(fold_params)
+            written += 1
+        shutil.rmtree(entry) if entry.is_dir() else entry.unlink()
+    return written
+
+
+def collect(children: pathlib.Path, k: int) -> dict[str, dict]:
+    """Aggregate fold children's stored results into one robust score per child."""
+    import result_store
+    from fitness import extract_statistics, metrics, score
+    per_child: dict[str, list[float]] = {}
+    for d in sorted(children.glob(f"*{FOLD_SEP}*")):
+        match = FOLD_RE.match(d.name)
+        summary = result_store.summary(d) if match and d.is_dir() else None
+        if not summary or int(match["fold"]) >= k:
+            continue
+        fits = per_child.setdefault(match["child"], [np.nan] * k)
+        fits[int(match["fold"])] = score(metrics(extract_statistics(summary)))
+    return {name: {"folds": [None if np.isnan(f) else f for f in fits],   # None: fold missing
+                   "fitness": float(robust_fitness(np.array([fits]))[0])}
+            for name, fits in per_child.items()}
+
+
+def main(argv: list[str]):
+    ap = argparse.ArgumentParser()
+    ap.add_argument("cmd", nargs="?", default="local", choices=("local", "fan-out", "collect"))
+    ap.add_argument("--children", default="children")
+    ap.add_argument("--workers", type=int, default=WORKERS)
+    args = ap.parse_args(argv)
+
+    children = ROOT / args.children
+    fold_list = folds()
+    for k, f in enumerate(fold_list):
+        print(f"📅  fold {k}: train {f.start} → {f.training_end}, OOS → {f.end}")
+
+    if args.cmd == "fan-out":
+        print(f"🪭  Wrote {fan_out(children, fold_list)} fold children")
+        return
+    if args.cmd == "collect":
+        report = collect(children, len(fold_list))
+    else:
+        entries = prescreen.discover(children)
+        params = [json.load(open(p)) for _, p in entries]
+        t0 = time.perf_counter()
+        stats = evaluate(params, fold_list, args.workers)
+        elapsed = time.perf_counter() - t0
+        print(f"⚙️  {len(params)} children × {len(fold_list)} folds in {elapsed:.2f}s "
+              f"on {args.workers} workers")
+        if not stats:
+            print("🤷 Nothing could be replayed locally.")
+            return
+        robust = robust_fitness(stats["fitness"])
+        report = {entries[i][0].stem: {"folds": stats["fitness"][i].round(6).tolist(),
+                                       "fitness": round(float(robust[i]), 6)}
+                  for i in np.flatnonzero(~np.isnan(robust))}
+
+    OUT_FILE.write_text(json.dumps(dict(sorted(report.items(), key=lambda kv: -kv[1]["fitness"])),
+                                   indent=2))
+    print(f"🏁  Robust fitness for {len(report)} children written to {OUT_FILE.name}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Local SQLite warehouse mirroring the Firestore `backtest_results` collection.
+
+One row per back-test with typed columns for fitness, metrics, generation
+and runId, every statistic flattened into an `s_<name>` column and every
+parameter into a `p_<name>` column (new keys add columns on the fly). The
+raw statistics/params maps are kept as JSON so rows round-trip to the
+Firestore document shape selectors expect; charts are never copied.
+
+`sync()` is incremental: it pages through docs ordered by createdAt from
+the stored high-water mark, so each run only reads what is new. Selectors
+use the warehouse instead of Firestore when RESULTS_SOURCE=warehouse
+(see ranking.warehouse_source).
+
+Usage:
+    python warehouse.py sync            # pull new docs from Firestore
+    python warehouse.py top [k] [field] # rank locally
+
+Env vars:
+    WAREHOUSE_PATH – SQLite file (default ./warehouse.sqlite)
+"""
+
+from __future__ import annotations
+import datetime as dt, json, os, pathlib, re, sqlite3, sys
+from typing import Iterator
+
+from fitness import COLL, fitness_fields, parse_stat
+
+ROOT = pathlib.Path(__file__).resolve().parent
+DB_PATH = pathlib.Path(os.getenv("WAREHOUSE_PATH", ROOT / "warehouse.sqlite"))
+PAGE_SIZE = 500
+SYNC_FIELDS = ["name", "createdAt", "generation", "runId", "fitness", "metrics",
+               "statistics", "params"]
+METRIC_COLUMNS = ["sharpeRatio", "drawdown", "netProfit", "oosNetProfit"]
+ROW_COLUMNS = ("id, created_at, generation, run_id, name, fitness, "
+               + ", ".join(f"m_{m}" for m in METRIC_COLUMNS) + ", statistics, params")
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS results (
+    id          TEXT PRIMARY KEY,
+    created_at  REAL,
+    generation  TEXT,
+    run_id      TEXT,
+    name        TEXT,
+    fitness     REAL,
+    {", ".join(f"m_{m} REAL" for m in METRIC_COLUMNS)},
+    statistics  TEXT,
+    params      TEXT
+);
+CREATE INDEX IF NOT EXISTS results_gen_fitness ON results (generation, fitness DESC);
+CREATE INDEX IF NOT EXISTS results_fitness     ON results (fitness DESC);
+CREATE INDEX IF NOT EXISTS results_created     ON results (created_at);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS columns (key TEXT PRIMARY KEY, name TEXT);
+"""
+
+
+def column(prefix: str, key: str) -> str:
+    return prefix + re.sub(r"\W+", "_", key).strip("_")
+
+
+class Row:
+    """Quacks like a Firestore DocumentSnapshot for the selector scripts."""
+
+    def __init__(self, doc_id: str, data: dict):
+        self.id, self._data = doc_id, data
+
+    def to_dict(self) -> dict:
+        return dict(self._data)
+
+    def get(self, field: str):
+        node = self._data
+        for part in field.split("."):
+            node = node[part]
+        return node
+
+
+class Warehouse:
+    def __init__(self, path: pathlib.Path | str = DB_PATH):
+        self.conn = sqlite3.connect(str(path))
+        self.conn.executescript(SCHEMA)
+        # SQLite column names are case-insensitive, so everything is tracked lower-cased
+        self._columns = {r[1].lower() for r in self.conn.execute("PRAGMA table_info(results)")}
+        self._names = dict(self.conn.execute("SELECT key, name FROM columns"))
+        self._claimed = {name.lower() for name in self._names.values()}
+
+    # ── write ─────────────────────────────────────────────────────────────
+    def _column(self, prefix: str, key: str, create: bool = True) -> str | None:
+        """Stable column for a statistic / parameter key. Keys that collide
+        after sanitising or case-folding ("Net Profit" / "net profit") get a
+        numbered suffix; the mapping is stored in the `columns` table."""
+        name = self._names.get(prefix + key)
+        if name is not None:
+            return name
+        base = column(prefix, key)
+        if not create:
+            return base if base.lower() in self._columns else None
+        name, n = base, 2
+        while name.lower() in self._claimed:
+            name, n = f"{base}_{n}", n + 1
+        self.conn.execute("INSERT INTO columns VALUES (?, ?)", (prefix + key, name))
+        self._names[prefix + key] = name
+        self._claimed.add(name.lower())
+        return name
+
+    def _ensure_columns(self, names) -> None:
+        for name in names:
+            if name.lower() not in self._columns:
+                affinity = "TEXT" if name.startswith("p_") else "REAL"
+                self.conn.execute(f'ALTER TABLE results ADD COLUMN "{name}" {affinity}')
+                self._columns.add(name.lower())
+
+    def upsert(self, doc_id: str, data: dict) -> None:
+        stats, params = data.get("statistics") or {}, data.get("params") or {}
+        if "fitness" not in data:                    # docs written before typed fields
+            data = {**fitness_fields(stats), "generation": None, "runId": None, **data}
+        created = data.get("createdAt")
+        row = {
+            "id": doc_id,
+            "created_at": created.timestamp() if isinstance(created, dt.datetime) else created,
+            "generation": data.get("generation"),
+            "run_id": data.get("runId"),
+            "name": data.get("name"),
+            "fitness": data.get("fitness"),
+            **{f"m_{m}": (data.get("metrics") or {}).get(m) for m in METRIC_COLUMNS},
+            "statistics": json.dumps(stats),
+            "params": json.dumps(params),
+        }
+        for key, val in stats.items():
+            row[self._column("s_", key)] = parse_stat(val)
+        for key, val in params.items():
+            row[self._column("p_", key)] = val if isinstance(val, (int, float, str)) else json.dumps(val)
+        self._ensure_columns(row)
+        cols = ", ".join(f'"{c}"' for c in row)
+        marks = ", ".join("?" for _ in row)
+        self.conn.execute(f"INSERT OR REPLACE INTO results ({cols}) VALUES ({marks})",
+                          list(row.values()))
+
+    # ── sync ──────────────────────────────────────────────────────────────
+    def high_water_mark(self) -> float | None:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'createdAt'").fetchone()
+        return float(row[0]) if row else None
+
+    def sync(self, db, page_size: int = PAGE_SIZE) -> int:
+        """Copy docs with createdAt ≥ the high-water mark; returns rows upserted."""
+        hwm = self.high_water_mark()
+        query = db.collection(COLL).order_by("createdAt").select(SYNC_FIELDS)
+        if hwm is not None:
+            # ≥ rather than > so docs sharing the boundary timestamp are not lost;
+            # re-reading them is harmless because upsert replaces by id
+            query = query.where("createdAt", ">=",
+                                dt.datetime.fromtimestamp(hwm, dt.timezone.utc))
+        copied, last = 0, None
+        while True:
+            page = list((query.start_after(last) if last else query).limit(page_size).stream())
+            for snap in page:
+                self.upsert(snap.id, snap.to_dict())
+            copied += len(page)
+            if page:
+                last = page[-1]
+                created = last.to_dict().get("createdAt")
+                if isinstance(created, dt.datetime):
+                    self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('createdAt', ?)",
+                                      (str(created.timestamp()),))
+            self.conn.commit()
+            if len(page) < page_size:
+                return copied
+
+    # ── read ──────────────────────────────────────────────────────────────
+    def top_k(self, order_field: str = "fitness", k: int = 1,
+              generation: str | None = None) -> list[Row]:
+        """Best `k` rows (optionally of one generation) as snapshot-like Rows."""
+        col = "fitness" if order_field == "fitness" else "m_" + order_field.split(".")[-1]
+        if col.lower() not in self._columns:
+            col = self._column("s_", order_field.split(".")[-1], create=False)
+            if col is None:                          # statistic never seen
+                return []
+        sql = f'SELECT {ROW_COLUMNS} FROM results WHERE "{col}" IS NOT NULL'
+        args: list = []
+        if generation:
+            sql += " AND generation = ?"
+            args.append(generation)
+        sql += f' ORDER BY "{col}" DESC LIMIT ?'
+        args.append(k)
+        return [self._row(r) for r in self.conn.execute(sql, args)]
+
+    def rows(self, generation: str | None = None) -> Iterator[Row]:
+        """Stream every row (optionally of one generation) without materialising them."""
+        sql, args = f"SELECT {ROW_COLUMNS} FROM results", []
+        if generation:
+            sql += " WHERE generation = ?"
+            args.append(generation)
+        for r in self.conn.execute(sql, args):
+            yield self._row(r)
+
+    @staticmethod
+    def _row(r) -> Row:
+        doc_id, created, generation, run_id, name, fit = r[:6]
+        metrics = dict(zip(METRIC_COLUMNS, r[6:6 + len(METRIC_COLUMNS)]))
+        stats, params = json.loads(r[-2]), json.loads(r[-1])
+        return Row(doc_id, {
+            "createdAt": dt.datetime.fromtimestamp(created, dt.timezone.utc) if created else None,
+            "generation": generation, "runId": run_id, "name": name,
+            "fitness": fit, "metrics": metrics, "statistics": stats, "params": params,
+        })
+
+    def frame(self, columns: str = "*"):
+        """Whole table as a pandas DataFrame for vectorised analysis."""
+        import pandas as pd
+        return pd.read_sql_query(f"SELECT {columns} FROM results", self.conn)
+
+
+def main(argv: list[str]):
+    cmd = argv[0] if argv else "sync"
+    wh = Warehouse()
+    if cmd == "sync":
+        import firestore_db
+        n = wh.sync(firestore_db.client())
+        print(f"🗄️  Synced {n} docs into {DB_PATH.name}")
+    elif cmd == "top":
+        k = int(argv[1]) if len(argv) > 1 else 10
+        field = argv[2] if len(argv) > 2 else "fitness"
+        for row in wh.top_k(field, k):
+            d = row.to_dict()
+            print(f"{row.id:>24}  {d['generation'] or '-':>20}  fitness={d['fitness']:.3f}  {d['params']}")
+    else:
+        sys.exit(f"unknown command {cmd!r} (sync | top)")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])